@@ -0,0 +1,204 @@
+# Glyph and Sprite Atlas for Chicago Transit Board
+# Loads the pre-rasterized font/icons built by host/build_atlas.py and draws
+# them as horizontal pixel spans instead of per-pixel or per-string calls
+
+import struct
+import time
+from array import array
+
+ATLAS_FILE = "atlas.bin"
+MAGIC = b"CTBA"
+VERSION = 1
+MAX_CACHED_STRINGS = 32
+# What calibrate() times: a typical arrival line
+CALIBRATION_TEXT = "UP-N 12 min"
+CALIBRATION_REPEAT = 10
+
+def _runs_from_bitmap(data, offset, width, height, x0, runs):
+    """Append (x, y, length) runs for a 1-bit bitmap (rows MSB first)"""
+    stride = (width + 7) // 8
+    for y in range(height):
+        row = offset + y * stride
+        x = 0
+        while x < width:
+            if data[row + (x >> 3)] & (0x80 >> (x & 7)):
+                start = x
+                while x < width and data[row + (x >> 3)] & (0x80 >> (x & 7)):
+                    x += 1
+                runs.append(x0 + start)
+                runs.append(y)
+                runs.append(x - start)
+            else:
+                x += 1
+
+class Atlas:
+    """Pre-rendered glyphs, sprites and a cache of rendered strings"""
+
+    def __init__(self, display, pens, data):
+        self.display = display
+        self.pens = pens  # Atlas color index -> display pen
+        self.height = 0
+        self.glyphs = {}    # char -> (advance, runs)
+        self.sprites = {}   # name -> [(color index, runs), ...]
+        self._strings = {}  # text -> (width, runs)
+        self.hits = 0
+        self.misses = 0
+        # A string is one native display.text call but one pixel_span per run
+        # here, so strings only come from the atlas if calibrate() finds it faster
+        self.draw_strings = True
+        self.calibration = None
+        self._parse(data)
+
+    def _parse(self, data):
+        magic, version, height, n_glyphs, n_sprites = struct.unpack_from("<4sBBBB", data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a v1 atlas")
+        self.height = height
+        pos = 8
+        for _ in range(n_glyphs):
+            code, width, offset = struct.unpack_from("<BBH", data, pos)
+            pos += 4
+            runs = array("H")
+            _runs_from_bitmap(data, offset, width, height, 0, runs)
+            self.glyphs[chr(code)] = (width, runs)
+        for _ in range(n_sprites):
+            name, width, h, n_layers = struct.unpack_from("<8sBBB", data, pos)
+            pos += 11
+            layers = []
+            for _ in range(n_layers):
+                color, offset = struct.unpack_from("<BH", data, pos)
+                pos += 3
+                runs = array("H")
+                _runs_from_bitmap(data, offset, width, h, 0, runs)
+                layers.append((color, runs))
+            self.sprites[name.rstrip(b"\0").decode()] = layers
+
+    def _render(self, text):
+        """Get (width, runs) for a string, building and caching it on first use"""
+        cached = self._strings.get(text)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        glyphs = self.glyphs
+        for ch in text:
+            if ch not in glyphs:
+                return None
+        self.misses += 1
+        runs = array("H")
+        x = 0
+        for ch in text:
+            advance, glyph_runs = glyphs[ch]
+            for i in range(0, len(glyph_runs), 3):
+                runs.append(x + glyph_runs[i])
+                runs.append(glyph_runs[i + 1])
+                runs.append(glyph_runs[i + 2])
+            x += advance
+        if len(self._strings) >= MAX_CACHED_STRINGS:
+            del self._strings[next(iter(self._strings))]
+        cached = (x, runs)
+        self._strings[text] = cached
+        return cached
+
+    def blit(self, runs, x, y):
+        """Draw a run list with the current pen"""
+        span = self.display.pixel_span
+        for i in range(0, len(runs), 3):
+            span(x + runs[i], y + runs[i + 1], runs[i + 2])
+
+    def text(self, text, x, y):
+        """Draw text with the current pen. Returns False if a glyph is missing
+        (or strings are drawn with display.text, see calibrate())."""
+        if not self.draw_strings:
+            return False
+        rendered = self._render(text)
+        if rendered is None:
+            return False
+        self.blit(rendered[1], x, y)
+        return True
+
+    def measure(self, text):
+        """Width of text in pixels, or None if a glyph is missing (or text()
+        would leave the string to display.text).
+
+        Doesn't render or cache the string, so it's cheap to call while
+        word-wrapping.
+        """
+        if not self.draw_strings:
+            return None
+        glyphs = self.glyphs
+        width = 0
+        for ch in text:
+            glyph = glyphs.get(ch)
+            if glyph is None:
+                return None
+            width += glyph[0]
+        return width
+
+    def sprite(self, name, x, y):
+        """Draw a named sprite. Returns False if the atlas doesn't have it."""
+        layers = self.sprites.get(name)
+        if layers is None:
+            return False
+        for color, runs in layers:
+            self.display.set_pen(self.pens[color])
+            self.blit(runs, x, y)
+        return True
+
+    def compare(self, text, x=0, y=0, repeat=CALIBRATION_REPEAT):
+        """Best time (us) to draw text from the atlas (cached) and with
+        display.text, with the current pen. None if a glyph is missing."""
+        rendered = self._render(text)
+        if rendered is None:
+            return None
+        runs = rendered[1]
+        display = self.display
+        best_atlas = best_text = None
+        for _ in range(repeat):
+            start = time.ticks_us()
+            self.blit(runs, x, y)
+            elapsed = time.ticks_diff(time.ticks_us(), start)
+            if best_atlas is None or elapsed < best_atlas:
+                best_atlas = elapsed
+            start = time.ticks_us()
+            display.text(text, x, y, scale=1)
+            elapsed = time.ticks_diff(time.ticks_us(), start)
+            if best_text is None or elapsed < best_text:
+                best_text = elapsed
+        return {"atlas_us": best_atlas, "text_us": best_text, "runs": len(runs) // 3}
+
+    def calibrate(self, text=CALIBRATION_TEXT):
+        """Time CALIBRATION_TEXT both ways and draw strings from the atlas
+        only if it wins. Draws with the current pen; redraw afterwards."""
+        if not self.glyphs:
+            self.draw_strings = False
+            return None
+        timing = self.compare(text)
+        if timing is not None:
+            self.draw_strings = timing["atlas_us"] < timing["text_us"]
+            self.calibration = timing
+        return timing
+
+    def get_stats(self):
+        """String cache statistics for /api/status"""
+        return {
+            "glyphs": len(self.glyphs),
+            "sprites": len(self.sprites),
+            "draw_strings": self.draw_strings,
+            "calibration": self.calibration,
+            "cached_strings": len(self._strings),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+def load(display, pens, path=ATLAS_FILE):
+    """Load the atlas from flash. Returns None if it isn't there or is invalid."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        return Atlas(display, pens, data)
+    except Exception as e:
+        print(f"Could not load {path}: {e}")
+        return None
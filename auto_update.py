@@ -4,6 +4,14 @@
 import urequests
 import time
 
+# Share the DNS cache with main.py (raw.githubusercontent.com is looked up
+# once per file otherwise)
+try:
+    import dns_cache
+    dns_cache.install(urequests)
+except ImportError:
+    pass
+
 # GitHub Configuration - Two URL patterns to check (CDN caching varies)
 GITHUB_RAW_URLS = [
     "https://raw.githubusercontent.com/sammcanany/ChicagoTransitBoard/main",
@@ -15,7 +23,21 @@ UPDATE_FILES = [
     "main.py",
     "auto_update.py",
     "setup_portal.py",
+    "setup_portal.html",
+    "setup_success.html",
+    "loader.html",
     "config_portal.py",
+    "dns_cache.py",
+    "scene.py",
+    "atlas.py",
+    "handoff.py",
+    "bench.py",
+    "metrics.py",
+    "tracing.py",
+    "log.py",
+    "supervisor.py",
+    "httpd.py",
+    "webassets.py",
     "version.txt"
 ]
 
@@ -27,6 +49,16 @@ PROTECTED_FILES = [
 # Track which URL base worked best for downloads
 _working_url_base = None
 
+# Socket timeouts in seconds. main.py lowers them to fit under the watchdog
+# timeout and sets checkpoint() to keep the watchdog fed between requests.
+VERSION_TIMEOUT = 10
+DOWNLOAD_TIMEOUT = 30
+checkpoint = None
+
+def _checkpoint():
+    if checkpoint is not None:
+        checkpoint()
+
 def get_github_raw_url(filename):
     """Get the raw GitHub URL for a file."""
     global _working_url_base
@@ -74,7 +106,8 @@ def get_remote_version():
     for url_base in GITHUB_RAW_URLS:
         try:
             url = f"{url_base}/version.txt"
-            response = urequests.get(url, timeout=10)
+            _checkpoint()
+            response = urequests.get(url, timeout=VERSION_TIMEOUT)
             if response.status_code == 200:
                 version = response.text.strip()
                 version_tuple = parse_version(version)
@@ -107,7 +140,8 @@ def download_file(filename, temp=False):
         url = get_github_raw_url(filename)
         print(f"Downloading {filename}...")
 
-        response = urequests.get(url, timeout=30)
+        _checkpoint()
+        response = urequests.get(url, timeout=DOWNLOAD_TIMEOUT)
         if response.status_code == 200:
             # Save to temporary file first for atomic update
             target = f"{filename}.tmp" if temp else filename
@@ -177,6 +211,7 @@ def check_for_updates():
                 # Rename .tmp to actual file
                 os.rename(f"{filename}.tmp", filename)
                 print(f"Updated {filename}")
+                _checkpoint()
             except Exception as e:
                 print(f"Error replacing {filename}: {e}")
                 # At this point, some files are updated - best to continue
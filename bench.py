@@ -0,0 +1,265 @@
+# Benchmarks for Chicago Transit Board
+# Timing and memory measurement that works on MicroPython and CPython, plus
+# built-in feed fixtures so the parsers can be benchmarked without a network
+
+import gc
+import json
+import time
+
+try:
+    import tracemalloc  # CPython
+except ImportError:
+    tracemalloc = None
+
+MICROPYTHON = hasattr(gc, "mem_alloc")
+
+# name -> (trips, stops per trip, alerts, CTA arrivals)
+FIXTURES = {
+    "small": (20, 10, 2, 6),          # Late night, a quiet feed
+    "rush_hour": (160, 25, 8, 30),    # Typical weekday peak
+    "worst_case": (400, 40, 30, 120), # Every line running, long alert list
+}
+
+# ===== PROTOBUF ENCODING =====
+
+def pb_varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def pb_uint(field, value):
+    return pb_varint(field << 3) + pb_varint(value)
+
+def pb_bytes(field, data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return pb_varint((field << 3) | 2) + pb_varint(len(data)) + data
+
+def pb_translated(text):
+    """TranslatedString with one English translation"""
+    return pb_bytes(1, pb_bytes(1, text) + pb_bytes(2, "en"))
+
+def pb_feed_header(now):
+    return pb_bytes(1, pb_bytes(1, "2.0") + pb_uint(2, 0) + pb_uint(3, int(now)))
+
+# ===== FIXTURES =====
+
+OTHER_ROUTES = ("UP-NW", "UP-W", "BNSF", "MD-N", "MD-W", "NCS", "HC", "RI", "SWS", "ME")
+
+def trip_feed(trips, stops, now, line="UP-N", station="RAVENSWOOD"):
+    """GTFS-RT trip updates: every 4th trip is on `line` and calls at `station`"""
+    out = bytearray(pb_feed_header(now))
+    for k in range(trips):
+        ours = k % 4 == 0
+        route = line if ours else OTHER_ROUTES[k % len(OTHER_ROUTES)]
+        departs = int(now) + (k // 8) * 600 + (k % 8) * 90 - 1200
+        trip = pb_bytes(1, "%s_%03d_%d" % (route, k, departs)) + pb_bytes(5, route)
+        updates = bytearray()
+        for seq in range(1, stops + 1):
+            stop_id = station if ours and seq == stops // 2 else "STOP%d_%d" % (k % 7, seq)
+            updates += pb_bytes(2, pb_uint(1, seq) + pb_bytes(2, pb_uint(2, departs + seq * 180)) + pb_bytes(4, stop_id))
+        out += pb_bytes(2, pb_bytes(1, str(k)) + pb_bytes(3, pb_bytes(1, trip) + updates))
+    return bytes(out)
+
+def alert_feed(count, now, line="UP-N"):
+    """GTFS-RT service alerts with realistic header/description lengths"""
+    out = bytearray(pb_feed_header(now))
+    for i in range(count):
+        route = line if i % 3 == 0 else OTHER_ROUTES[i % len(OTHER_ROUTES)]
+        alert = (pb_bytes(5, pb_bytes(1, "METRA") + pb_bytes(4, route))
+                 + pb_uint(6, 1) + pb_uint(7, 2)
+                 + pb_bytes(10, pb_translated("%s trains operating with delays of up to %d minutes" % (route, 5 + i)))
+                 + pb_bytes(11, pb_translated("Due to signal problems, inbound and outbound trains are "
+                                              "delayed. Please allow extra travel time. Ref %d." % i)))
+        out += pb_bytes(2, pb_bytes(1, "alert%d" % i) + pb_bytes(2, alert))
+    return bytes(out)
+
+def _chicago_iso(ts):
+    t = time.gmtime(int(ts) - 21600)  # The board treats Chicago as UTC-6
+    return "%04d-%02d-%02dT%02d:%02d:%02d" % (t[0], t[1], t[2], t[3], t[4], t[5])
+
+def cta_json(count, now, route="Brn"):
+    """Train Tracker ttarrivals response text"""
+    etas = []
+    for i in range(count):
+        etas.append({
+            "staNm": "Bench Station",
+            "rt": route,
+            "destNm": "Loop" if i % 2 == 0 else "Kimball",
+            "trDr": "5" if i % 2 == 0 else "1",
+            "arrT": _chicago_iso(now + 120 + i * 45),
+        })
+    return json.dumps({"ctatt": {"tmst": _chicago_iso(now), "errCd": "0", "errNm": None, "eta": etas}})
+
+def make_fixture(name, now=None):
+    """{"trips": bytes, "alerts": bytes, "cta": str} plus entity counts"""
+    trips, stops, alerts, arrivals = FIXTURES[name]
+    now = int(time.time() if now is None else now)
+    return {
+        "trips": trip_feed(trips, stops, now),
+        "alerts": alert_feed(alerts, now),
+        "cta": cta_json(arrivals, now),
+        "entities": {"trips": trips, "alerts": alerts, "cta": arrivals},
+        "now": now,
+    }
+
+# ===== MEASUREMENT =====
+
+class Timing:
+    """Run times of one function, collected a call at a time so the caller
+    can yield (or sleep) between calls"""
+
+    def __init__(self):
+        self.runs = 0
+        self.best = None
+        self.total = 0
+
+    def run(self, func, args=()):
+        """Time one call of func(*args); returns its microseconds"""
+        start = time.ticks_us()
+        func(*args)
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        self.total += elapsed
+        self.runs += 1
+        if self.best is None or elapsed < self.best:
+            self.best = elapsed
+        return elapsed
+
+    def stats(self, alloc=0, peak=0):
+        """measure()-style stats with the given memory figures"""
+        return {
+            "runs": self.runs,
+            "best_us": self.best or 0,
+            "avg_us": self.total // self.runs if self.runs else 0,
+            "alloc_bytes": alloc,
+            "peak_bytes": peak,
+        }
+
+# Lowest gc.mem_free() seen by sample_memory() during measure_memory()
+_low_water = None
+
+def sample_memory():
+    """Note free heap for measure_memory()'s peak; long loops call this via
+    Supervisor.checkpoint_hook while a measurement is running"""
+    global _low_water
+    if _low_water is not None:
+        free = gc.mem_free()
+        if free < _low_water:
+            _low_water = free
+
+def measure_memory(func, args=()):
+    """(alloc_bytes, peak_bytes) of one call of func(*args).
+
+    alloc_bytes is what is still held when it returns (the result).
+    peak_bytes is the tracemalloc peak on CPython. On MicroPython the
+    collector stays on (pausing it could run the heap out, on either core),
+    so it is the drop in free heap at its lowest sample_memory() point: a
+    lower bound, and just alloc_bytes if func never samples.
+    """
+    global _low_water
+    gc.collect()
+    if MICROPYTHON:
+        before = gc.mem_alloc()
+        free = _low_water = gc.mem_free()
+        try:
+            result = func(*args)
+            alloc = gc.mem_alloc() - before
+            sample_memory()
+            peak = max(alloc, free - _low_water)
+        finally:
+            _low_water = None
+    elif tracemalloc is not None:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = func(*args)
+        current, peak_total = tracemalloc.get_traced_memory()
+        alloc = current - before
+        peak = peak_total - before
+        if not tracing:
+            tracemalloc.stop()
+    else:
+        result = None
+        alloc = peak = 0
+    del result
+    return alloc, peak
+
+def measure(func, args=(), repeat=5, min_us=0):
+    """Time func(*args) `repeat` times (and for at least min_us), then
+    measure one call's memory (see measure_memory())"""
+    gc.collect()
+    timing = Timing()
+    while timing.runs < repeat or timing.total < min_us:
+        timing.run(func, args)
+    return timing.stats(*measure_memory(func, args))
+
+def rates(stats, entities, size):
+    """Add entity and byte throughput (from the best run) to measure() stats"""
+    us = max(1, stats["best_us"])
+    stats["entities"] = entities
+    stats["bytes"] = size
+    stats["entities_per_s"] = int(entities * 1000000 / us)
+    stats["mb_per_s"] = round(size / us, 3)  # bytes/us == MB/s
+    return stats
+
+def parser_jobs(parse_trips, parse_alerts, parse_cta, data):
+    """(name, func, input, entities) for each parser over a make_fixture() result.
+
+    parse_cta takes the decoded JSON (like main.parse_cta_arrivals); the
+    json.loads is timed with it, since that is where most CTA time goes.
+    """
+    entities = data["entities"]
+
+    def cta(text):
+        return parse_cta(json.loads(text), None, data["now"])
+
+    return [
+        ("metra_trips", parse_trips, data["trips"], entities["trips"]),
+        ("metra_alerts", parse_alerts, data["alerts"], entities["alerts"]),
+        ("cta_json", cta, data["cta"], entities["cta"]),
+    ]
+
+def run_parsers(parse_trips, parse_alerts, parse_cta, fixture="small", repeat=5, now=None, min_us=0):
+    """Benchmark the three parsers on a built-in fixture"""
+    data = make_fixture(fixture, now)
+    results = {}
+    for name, func, arg, entities in parser_jobs(parse_trips, parse_alerts, parse_cta, data):
+        results[name] = rates(measure(func, (arg,), repeat, min_us), entities, len(arg))
+    return results
+
+def heap_churn(objects=200, size=64):
+    """Allocate and drop `objects` small buffers and strings, then collect.
+
+    Returns the allocation time, the gc.collect() time that follows and
+    free heap before/after, which shows how fast the allocator and GC are
+    on this firmware and whether the churn left the heap fragmented.
+    """
+    gc.collect()
+    free_before = gc.mem_free() if MICROPYTHON else 0
+    start = time.ticks_us()
+    keep = []
+    for i in range(objects):
+        keep.append(bytearray(size))
+        keep.append("churn %d" % i)
+        if len(keep) > 32:
+            keep = keep[16:]  # Drop the oldest half, like parser temporaries
+    alloc_us = time.ticks_diff(time.ticks_us(), start)
+    keep = None
+    start = time.ticks_us()
+    gc.collect()
+    collect_us = time.ticks_diff(time.ticks_us(), start)
+    return {
+        "objects": objects * 2,
+        "alloc_us": alloc_us,
+        "collect_us": collect_us,
+        "free_before": free_before,
+        "free_after": gc.mem_free() if MICROPYTHON else 0,
+    }
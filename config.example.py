@@ -123,8 +123,14 @@ CHECK_UPDATE_INTERVAL = 604800  # Check for updates every 7 days/weekly (in seco
 # System Reliability
 # ========================================
 ENABLE_WATCHDOG = True       # Enable watchdog timer (recommended)
-WATCHDOG_TIMEOUT = 8000      # Timeout in milliseconds (8 seconds default)
-# System will auto-reboot if it doesn't respond within this time
+WATCHDOG_TIMEOUT = 8000      # Timeout in milliseconds (8 seconds default, 8388 max on the RP2350)
+# System will auto-reboot if it doesn't respond within this time. The watchdog
+# starts once the board is up and is only fed while every task (drawing,
+# fetches, WiFi) keeps to its budget; network timeouts are capped to
+# fit. /api/status shows each task's max_stall_ms against its budget_ms.
+PARSE_DEADLINE_MS = None     # Longest a feed parse may run in ms (None = its watchdog budget)
+# A parse that runs longer is abandoned and the board keeps showing the last
+# good data; /api/logs names the feed. Raise it if a big feed keeps timing out.
 
 # ========================================
 # Weather
@@ -144,6 +150,32 @@ ENABLE_STATUS_LED = True  # Show status on onboard RGB LED
 # Green = connected and running, Red = error, Blue = connecting
 # Set to False if the light is distracting
 
+# ========================================
+# Display Refresh
+# ========================================
+RENDER_FPS = 10  # How often the display is redrawn (frames per second)
+# Only regions that changed are pushed to the panel, so higher values mainly
+# make the alert marquee smoother. 5-20 is a sensible range.
+
+ENABLE_DUAL_CORE = False  # Fetch and parse on the second core (experimental)
+# Keeps the display and web portal responsive during slow API requests.
+# If the fetch thread fails the board goes back to fetching on one core.
+
+ENABLE_TRACING = False  # Record timing spans (download from /api/trace)
+TRACE_BUFFER_SIZE = 512  # Most recent spans kept (about 14 bytes each)
+# Open the downloaded trace.json in chrome://tracing or ui.perfetto.dev.
+# When off, nothing is recorded and traced functions run unwrapped.
+
+LOG_LEVEL = "info"  # "debug", "info", "warning" or "error"; lower levels are dropped
+LOG_ECHO = True  # Also print log lines to the USB serial console
+LOG_FILE = None  # e.g. "board.log" to keep a copy in flash (written once a minute)
+LOG_BUFFER_SIZE = 100  # Most recent log records kept in RAM (read from /api/logs)
+# "debug" adds a line per fetch, rotation and display change.
+
+# UPSTREAM_OVERRIDE = "http://192.168.1.50:8080"  # Development only
+# Sends every Metra/CTA/weather request to this server (e.g. host/mock_upstream.py)
+# instead of the real APIs. Not kept when settings are saved from the web portal.
+
 # ========================================
 # Power Management
 # ========================================
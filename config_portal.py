@@ -77,6 +77,14 @@ def get_current_config():
             'enable_watchdog': getattr(config, 'ENABLE_WATCHDOG', True),
             'watchdog_timeout': getattr(config, 'WATCHDOG_TIMEOUT', 8000),
             'enable_status_led': getattr(config, 'ENABLE_STATUS_LED', True),
+            'render_fps': getattr(config, 'RENDER_FPS', 10),
+            'enable_dual_core': getattr(config, 'ENABLE_DUAL_CORE', False),
+            'enable_tracing': getattr(config, 'ENABLE_TRACING', False),
+            'trace_buffer_size': getattr(config, 'TRACE_BUFFER_SIZE', 512),
+            'log_level': getattr(config, 'LOG_LEVEL', 'info'),
+            'log_echo': getattr(config, 'LOG_ECHO', True),
+            'log_file': getattr(config, 'LOG_FILE', None) or '',
+            'log_buffer_size': getattr(config, 'LOG_BUFFER_SIZE', 100),
             'enable_weather': getattr(config, 'ENABLE_WEATHER', False),
             'weather_api_service': getattr(config, 'WEATHER_API_SERVICE', 'weathergov'),
             'weather_api_key': getattr(config, 'WEATHER_API_KEY', ''),
@@ -168,9 +176,9 @@ def get_system_status():
     wifi_connected = wlan.isconnected()
     ip_address = wlan.ifconfig()[0] if wifi_connected else "Not connected"
     
-    # Get memory info
-    free_mem = gc.mem_free()
-    used_mem = gc.mem_alloc()
+    # Get memory info (MicroPython only)
+    free_mem = gc.mem_free() if hasattr(gc, 'mem_free') else 0
+    used_mem = gc.mem_alloc() if hasattr(gc, 'mem_alloc') else 0
     total_mem = free_mem + used_mem
     
     # Get version
@@ -236,6 +244,26 @@ def parse_form_data(data):
             params[key] = decoded
     return params
 
+def kept_setting(params, key, name, default):
+    """params[key] if it was posted, else the value config.py has now.
+
+    For settings the portal form has no input for yet, so saving the form
+    doesn't reset them to their defaults.
+    """
+    if key in params:
+        return params[key]
+    try:
+        import config
+        return getattr(config, name, default)
+    except ImportError:
+        return default
+
+def is_on(value):
+    """A posted ('true', 'off', ...) or kept (bool) flag as a bool"""
+    if isinstance(value, str):
+        return value.lower() not in ('', 'false', '0', 'off', 'no')
+    return bool(value)
+
 def save_config(params):
     """Save configuration to config.py"""
     # Handle checkboxes (checkboxes only send data if checked)
@@ -248,6 +276,17 @@ def save_config(params):
     enable_weather = 'enable_weather' in params or 'enable-weather' in params
     enable_sleep_mode = 'enable_sleep_mode' in params or 'enable-sleep' in params
     enable_adaptive_brightness = 'enable_adaptive_brightness' in params or 'enable-adaptive' in params
+    # No inputs for these in the portal yet: keep what config.py has
+    # unless the request sets them
+    render_fps = kept_setting(params, 'render_fps', 'RENDER_FPS', 10)
+    enable_dual_core = is_on(kept_setting(params, 'enable_dual_core', 'ENABLE_DUAL_CORE', False))
+    enable_tracing = is_on(kept_setting(params, 'enable_tracing', 'ENABLE_TRACING', False))
+    trace_buffer_size = kept_setting(params, 'trace_buffer_size', 'TRACE_BUFFER_SIZE', 512)
+    log_level = kept_setting(params, 'log_level', 'LOG_LEVEL', 'info')
+    log_echo = is_on(kept_setting(params, 'log_echo', 'LOG_ECHO', True))
+    log_file = kept_setting(params, 'log_file', 'LOG_FILE', None)
+    log_buffer_size = kept_setting(params, 'log_buffer_size', 'LOG_BUFFER_SIZE', 100)
+    parse_deadline_ms = kept_setting(params, 'parse_deadline_ms', 'PARSE_DEADLINE_MS', None)
 
     # Handle API keys - only update if not masked
     metra_token = params.get('metra_token', '')
@@ -351,10 +390,23 @@ CHECK_UPDATE_INTERVAL = {params.get('check_update_interval', '604800')}
 # System Reliability
 ENABLE_WATCHDOG = {enable_watchdog}
 WATCHDOG_TIMEOUT = {params.get('watchdog_timeout', '8000')}
+PARSE_DEADLINE_MS = {parse_deadline_ms or None}
 
 # Status LED
 ENABLE_STATUS_LED = {enable_status_led}
 
+# Display Refresh
+RENDER_FPS = {render_fps}
+ENABLE_DUAL_CORE = {enable_dual_core}
+ENABLE_TRACING = {enable_tracing}
+TRACE_BUFFER_SIZE = {trace_buffer_size}
+
+# Logging
+LOG_LEVEL = "{log_level}"
+LOG_ECHO = {log_echo}
+LOG_FILE = {repr(log_file) if log_file else None}
+LOG_BUFFER_SIZE = {log_buffer_size}
+
 # Weather
 ENABLE_WEATHER = {enable_weather}
 WEATHER_API_SERVICE = "{params.get('weather_api_service', 'weathergov')}"
@@ -0,0 +1,215 @@
+# DNS Resolution Cache for Chicago Transit Board
+# Remembers socket.getaddrinfo results for the API hosts so every HTTP
+# request doesn't have to go back to the (often flaky) home router
+
+import socket
+import time
+import _thread
+import tracing
+
+# Cache timing (seconds)
+# getaddrinfo doesn't expose the record TTL, so we use a fixed one
+DEFAULT_TTL = 300       # Trust a successful lookup for 5 minutes
+NEGATIVE_TTL = 30       # Remember a failed lookup for 30 seconds
+REFRESH_AHEAD = 60      # Re-resolve in the background this long before expiry
+MAX_STALE = 3600        # Serve an expired address for up to 1 hour if DNS is down
+MAX_ENTRIES = 16
+
+# Hosts the board talks to - resolved right after WiFi connects
+API_HOSTS = [
+    ("gtfspublic.metrarr.com", 443),
+    ("lapi.transitchicago.com", 80),
+    ("api.weather.gov", 443),
+    ("raw.githubusercontent.com", 443),
+]
+
+# (host, port, type) -> [addrinfo or None, resolved_ms, expires_ms, refresh_ms]
+# refresh_ms is when refresh_due() may next re-resolve the entry.
+# Both cores look hosts up in dual-core mode; inserts and deletes (which
+# may resize the dict) and reads take _lock. Lookups happen outside it.
+_cache = {}
+_lock = _thread.allocate_lock()
+_refresh_next = 0  # Where refresh_due() starts, so every host gets its turn
+
+stats = {
+    "hits": 0,            # Served a fresh cached address
+    "misses": 0,          # Had to resolve during a request
+    "negative_hits": 0,   # Failed fast on a remembered failure
+    "stale_hits": 0,      # Resolver failed, served an expired address
+    "refreshes": 0,       # Background re-resolutions
+    "failures": 0,        # Resolver errors
+    "lookups": 0,         # Real getaddrinfo calls
+    "lookup_ms_total": 0,
+    "lookup_ms_max": 0,
+    "lookup_ms_last": 0,
+}
+
+_real_getaddrinfo = socket.getaddrinfo
+_SPAN = tracing.name("dns")
+
+def _lookup(host, port, af, type, proto, flags):
+    """Call the real resolver and record its latency"""
+    start = time.ticks_ms()
+    span = tracing.begin()
+    try:
+        return _real_getaddrinfo(host, port, af, type, proto, flags)
+    finally:
+        tracing.end(_SPAN, span)
+        elapsed = time.ticks_diff(time.ticks_ms(), start)
+        stats["lookups"] += 1
+        stats["lookup_ms_total"] += elapsed
+        stats["lookup_ms_last"] = elapsed
+        if elapsed > stats["lookup_ms_max"]:
+            stats["lookup_ms_max"] = elapsed
+
+def _store(key, addrinfo, ttl):
+    """Save a lookup result, evicting the oldest entry when full"""
+    now = time.ticks_ms()
+    with _lock:
+        if key not in _cache and len(_cache) >= MAX_ENTRIES:
+            oldest = None
+            for k, entry in _cache.items():
+                if oldest is None or time.ticks_diff(entry[1], _cache[oldest][1]) < 0:
+                    oldest = k
+            del _cache[oldest]
+        expires = time.ticks_add(now, ttl * 1000)
+        _cache[key] = [addrinfo, now, expires, time.ticks_add(expires, -REFRESH_AHEAD * 1000)]
+
+def _retry_later(entry):
+    """Keep serving a stale entry, and leave the resolver alone for NEGATIVE_TTL"""
+    retry = time.ticks_add(time.ticks_ms(), NEGATIVE_TTL * 1000)
+    entry[2] = retry
+    entry[3] = retry
+
+def _servable(entry, now):
+    """Whether a failed re-resolve may still fall back to this entry's address"""
+    return entry[0] is not None and time.ticks_diff(now, entry[1]) < (DEFAULT_TTL + MAX_STALE) * 1000
+
+def getaddrinfo(host, port, af=0, type=0, proto=0, flags=0):
+    """Drop-in replacement for socket.getaddrinfo backed by the cache"""
+    key = (host, port, type)
+    with _lock:
+        entry = _cache.get(key)
+    now = time.ticks_ms()
+
+    if entry is not None and time.ticks_diff(entry[2], now) > 0:
+        if entry[0] is None:
+            stats["negative_hits"] += 1
+            raise OSError(-2)  # Same errno getaddrinfo uses for "not found"
+        if time.ticks_diff(now, entry[1]) >= DEFAULT_TTL * 1000:
+            stats["stale_hits"] += 1  # Still waiting to retry a failed re-resolve
+        else:
+            stats["hits"] += 1
+        return entry[0]
+
+    stats["misses"] += 1
+    try:
+        result = _lookup(host, port, af, type, proto, flags)
+    except OSError:
+        stats["failures"] += 1
+        # Resolver is down - an old address is better than no address
+        if entry is not None and _servable(entry, now):
+            stats["stale_hits"] += 1
+            # resolved_ms stays put so MAX_STALE still counts from the last success
+            _retry_later(entry)
+            return entry[0]
+        _store(key, None, NEGATIVE_TTL)
+        raise
+
+    _store(key, result, DEFAULT_TTL)
+    return result
+
+def refresh_due(max_lookups=1):
+    """Re-resolve entries that are about to expire.
+
+    Called from the main loop between requests so the lookups happen
+    outside of a fetch. A failed re-resolve isn't retried for NEGATIVE_TTL,
+    and the scan starts after the last host it looked up, so one host
+    that keeps failing doesn't starve the others. Returns the number of
+    lookups performed.
+    """
+    global _refresh_next
+    now = time.ticks_ms()
+    done = 0
+    with _lock:
+        keys = list(_cache)
+    count = len(keys)
+    for i in range(count):
+        if done >= max_lookups:
+            break
+        index = (_refresh_next + i) % count
+        key = keys[index]
+        with _lock:
+            entry = _cache.get(key)
+        if entry is None or not _servable(entry, now):
+            continue  # Failed or too old; the next real request resolves it
+        if time.ticks_diff(entry[3], now) > 0:
+            continue
+        host, port, type = key
+        done += 1
+        _refresh_next = index + 1
+        try:
+            result = _lookup(host, port, 0, type, 0, 0)
+            _store(key, result, DEFAULT_TTL)
+            stats["refreshes"] += 1
+        except OSError:
+            stats["failures"] += 1
+            _retry_later(entry)  # Keep serving the old address meanwhile
+    return done
+
+def prefetch(hosts=None):
+    """Resolve the API hosts up front (e.g. right after WiFi connects)"""
+    for host, port in hosts or API_HOSTS:
+        try:
+            getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        except OSError as e:
+            print(f"DNS prefetch failed for {host}: {e}")
+
+def clear():
+    """Forget all cached lookups (the WiFi dropped; the network we rejoin
+    may have a different resolver, and connect_wifi() prefetches again)"""
+    with _lock:
+        _cache.clear()
+
+def get_stats():
+    """Cache statistics for /api/status"""
+    requests = stats["hits"] + stats["misses"] + stats["negative_hits"]
+    lookups = stats["lookups"]
+    return {
+        "entries": len(_cache),
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "negative_hits": stats["negative_hits"],
+        "stale_hits": stats["stale_hits"],
+        "refreshes": stats["refreshes"],
+        "failures": stats["failures"],
+        "hit_rate": int(stats["hits"] * 100 / requests) if requests else 0,
+        "lookup_ms_avg": stats["lookup_ms_total"] // lookups if lookups else 0,
+        "lookup_ms_max": stats["lookup_ms_max"],
+        "lookup_ms_last": stats["lookup_ms_last"],
+    }
+
+class _SocketModule:
+    """Stands in for the socket module inside urequests.
+
+    Everything is forwarded to the real module except getaddrinfo,
+    which goes through the cache.
+    """
+    def __init__(self, real):
+        self._real = real
+
+    def __getattr__(self, name):
+        return getattr(self._real, name)
+
+    def getaddrinfo(self, host, port, af=0, type=0, proto=0, flags=0):
+        return getaddrinfo(host, port, af, type, proto, flags)
+
+def install(requests_module):
+    """Route a urequests module's DNS lookups through the cache.
+
+    Safe to call more than once (main.py and auto_update.py both do).
+    """
+    for name in ("socket", "usocket"):
+        current = getattr(requests_module, name, None)
+        if current is not None and not isinstance(current, _SocketModule):
+            setattr(requests_module, name, _SocketModule(current))
@@ -0,0 +1,130 @@
+# Core-to-Core Handoff for Chicago Transit Board
+# Double-buffered snapshot publishing and a small wrapper for running the
+# fetch/parse loop on the RP2350's second core with _thread
+
+import time
+import _thread
+
+class DoubleBuffer:
+    """Two-slot buffer for handing immutable snapshots between cores.
+
+    Writers fill the back slot and then flip `front` with a single store,
+    so readers never take a lock and always see a whole snapshot. Only
+    writers share a lock, and only to stop two of them (e.g. the fetch
+    core and a WiFi reconnect on the render core) from filling the same
+    back slot at once.
+    """
+
+    def __init__(self, initial):
+        self._slots = [initial, initial]
+        self._front = 0
+        self._lock = _thread.allocate_lock()
+        self.seq = 0        # Number of publishes so far
+        self.flips = 0
+        self.contended = 0  # Publishes that had to wait for another writer
+
+    def read(self):
+        """Latest published value (lock-free)"""
+        return self._slots[self._front]
+
+    def publish(self, make):
+        """Publish make(seq) as the new front value and return it.
+
+        `make` builds the snapshot while the writer lock is held, so the
+        sequence number it is given is the one it is published under.
+        """
+        if not self._lock.acquire(0):
+            self.contended += 1
+            self._lock.acquire()
+        try:
+            seq = self.seq + 1
+            value = make(seq)
+            back = self._front ^ 1
+            self._slots[back] = value
+            self._front = back
+            self.seq = seq
+            self.flips += 1
+            return value
+        finally:
+            self._lock.release()
+
+    def writing(self):
+        """The writer lock, for changing state that make() copies:
+
+            with buf.writing():
+                shared[key] = value
+        """
+        return self._lock
+
+    def get_stats(self):
+        """Handoff statistics for /api/status"""
+        return {
+            "seq": self.seq,
+            "flips": self.flips,
+            "contended": self.contended,
+        }
+
+class Worker:
+    """A loop running on the second core.
+
+    The loop is called as func(worker, *args); it should check
+    `worker.running` and call `worker.beat()` each pass. If it raises,
+    the error is recorded and `running` drops to False so the caller can
+    fall back to doing the work on the first core.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.running = False
+        self.started = False
+        self.error = None
+        self.beats = 0
+        self.last_beat_ms = 0
+
+    def start(self, func, *args, stack_size=None):
+        """Start func on a new thread (core 1 on the RP2350). Returns False on failure."""
+        self.running = True
+        self.error = None
+        self.beat()
+        try:
+            if stack_size:
+                _thread.stack_size(stack_size)
+            _thread.start_new_thread(self._run, (func, args))
+        except Exception as e:
+            print(f"Could not start {self.name} thread: {e}")
+            self.running = False
+            self.error = str(e)
+            return False
+        self.started = True
+        return True
+
+    def _run(self, func, args):
+        try:
+            func(self, *args)
+        except Exception as e:
+            print(f"{self.name} thread stopped: {e}")
+            self.error = str(e)
+        finally:
+            self.running = False
+
+    def stop(self):
+        """Ask the loop to exit after its current pass"""
+        self.running = False
+
+    def beat(self):
+        """Mark the loop as alive"""
+        self.last_beat_ms = time.ticks_ms()
+        self.beats += 1
+
+    def beat_age_ms(self):
+        """Milliseconds since the loop last called beat()"""
+        return time.ticks_diff(time.ticks_ms(), self.last_beat_ms)
+
+    def get_stats(self):
+        """Worker statistics for /api/status"""
+        return {
+            "running": self.running,
+            "beats": self.beats,
+            "beat_age_ms": self.beat_age_ms() if self.started else None,
+            "error": self.error,
+        }
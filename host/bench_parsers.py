@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark main.py's feed parsers on fixed fixtures and compare to a baseline
+
+Runs parse_gtfs_protobuf (Metra trip updates), parse_gtfs_alerts_protobuf
+(Metra alerts) and the CTA JSON path (json.loads + parse_cta_arrivals) over
+the small / rush_hour / worst_case fixtures from bench.py, and optionally
+over every capture in a feed_archive.py archive. Reports entities/s, MB/s,
+bytes allocated per call and peak heap (tracemalloc).
+
+Host times are for comparing two versions of the parsers on this machine,
+not board times; allocations carry over much better. bench.py itself is
+also on the board, where it measures with gc.mem_alloc() instead.
+
+Usage:
+    python host/bench_parsers.py
+    python host/bench_parsers.py --save baseline.json
+    python host/bench_parsers.py --check baseline.json      # exit 1 on an allocation regression
+    python host/bench_parsers.py --check baseline.json --gate-time
+    python host/bench_parsers.py --archive archive/ --fixtures small
+"""
+
+import argparse
+import calendar
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import emulator
+
+NOW = 1768478400  # 2026-01-15 12:00 UTC - fixed so every run parses the same bytes
+
+# Metrics --check fails on (lower is better). Allocations are the same on
+# every run; times are only reported, since sub-millisecond host timings
+# swing by more than any useful tolerance from run to run
+MEMORY_METRICS = ("alloc_bytes", "peak_bytes")
+TIME_FLOOR_US = 1000  # Slowdowns smaller than this are never reported
+
+def board_mktime(t):
+    """MicroPython's time.mktime: an 8-tuple in the board's time zone (UTC)"""
+    return calendar.timegm(tuple(t[:6]) + (0, 0, 0))
+
+def bench_fixtures(board, bench, names, repeat, min_ms):
+    results = {}
+    for name in names:
+        results[name] = bench.run_parsers(board.parse_gtfs_protobuf, board.parse_gtfs_alerts_protobuf,
+                                          board.parse_cta_arrivals, name, repeat, NOW, min_ms * 1000)
+    return results
+
+def bench_archive(board, bench, path):
+    """Every capture in an archive once, streamed; per-parser totals"""
+    import feed_archive
+    archive = feed_archive.Archive(path)
+    parsers = {
+        "metra_tripupdates": ("metra_trips", board.parse_gtfs_protobuf),
+        "metra_alerts": ("metra_alerts", board.parse_gtfs_alerts_protobuf),
+        "cta_arrivals": ("cta_json", lambda body: board.parse_cta_arrivals(json.loads(body), None, NOW)),
+    }
+    totals = {}
+    tracemalloc.start()
+    for capture in archive.replay(list(parsers)):
+        name, parse = parsers[capture.endpoint]
+        body = capture.body
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        parse(body)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - before
+        entry = totals.setdefault(name, {"captures": 0, "bytes": 0, "seconds": 0.0, "peak_bytes": 0})
+        entry["captures"] += 1
+        entry["bytes"] += len(body)
+        entry["seconds"] += elapsed
+        entry["peak_bytes"] = max(entry["peak_bytes"], peak)
+    tracemalloc.stop()
+    for entry in totals.values():
+        entry["mb_per_s"] = round(entry["bytes"] / 1e6 / entry["seconds"], 3) if entry["seconds"] else 0
+        entry["seconds"] = round(entry["seconds"], 3)
+    return totals
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """(allocation regressions, slowdowns) against a saved baseline, as lines.
+
+    A slowdown counts only if it is over time_tolerance and also more than
+    TIME_FLOOR_US, so scheduler noise on short parses doesn't show up.
+    """
+    problems = []
+    slower = []
+
+    def line(fixture, parser, metric, old, new, tolerance):
+        return (f"{fixture}/{parser} {metric}: {old} -> {new} "
+                f"(+{(new / old - 1) * 100:.0f}%, limit {tolerance * 100:.0f}%)")
+
+    for fixture, parsers in baseline.items():
+        for parser, old in parsers.items():
+            new = results.get(fixture, {}).get(parser)
+            if new is None:
+                continue
+            for metric in MEMORY_METRICS:
+                if old[metric] and new[metric] > old[metric] * (1 + memory_tolerance):
+                    problems.append(line(fixture, parser, metric, old[metric], new[metric], memory_tolerance))
+            before, after = old["best_us"], new["best_us"]
+            if before and after > before * (1 + time_tolerance) and after - before > TIME_FLOOR_US:
+                slower.append(line(fixture, parser, "best_us", before, after, time_tolerance))
+    return problems, slower
+
+def print_results(results):
+    print(f"{'fixture':<12} {'parser':<13} {'entities':>8} {'KB':>7} {'best ms':>9} "
+          f"{'ent/s':>9} {'MB/s':>7} {'alloc KB':>9} {'peak KB':>8}")
+    for fixture, parsers in results.items():
+        for parser, r in parsers.items():
+            print(f"{fixture:<12} {parser:<13} {r['entities']:>8} {r['bytes'] / 1024:>7.1f} "
+                  f"{r['best_us'] / 1000:>9.2f} {r['entities_per_s']:>9} {r['mb_per_s']:>7.2f} "
+                  f"{r['alloc_bytes'] / 1024:>9.1f} {r['peak_bytes'] / 1024:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark main.py's feed parsers")
+    parser.add_argument("--fixtures", default="small,rush_hour,worst_case", help="Comma-separated fixture names")
+    parser.add_argument("--repeat", type=int, default=10, help="Minimum timed runs per parser (default: 10, best is reported)")
+    parser.add_argument("--min-ms", type=int, default=300, help="Keep timing each parser for at least this long (default: 300)")
+    parser.add_argument("--archive", metavar="DIR", help="Also parse every capture in a feed_archive.py archive")
+    parser.add_argument("--save", metavar="FILE", help="Write the fixture results as a baseline")
+    parser.add_argument("--check", metavar="FILE", help="Compare against a baseline; exit 1 if allocations grew")
+    parser.add_argument("--gate-time", action="store_true", help="With --check, also exit 1 on a slowdown")
+    parser.add_argument("--time-tolerance", type=float, default=0.25,
+                        help="Slowdown to report (default: 0.25 = 25%%, and over 1 ms)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.05, help="Allowed allocation growth (default: 0.05)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    board = emulator.load_main()
+    time.mktime = board_mktime
+    import bench
+
+    names = [name.strip() for name in args.fixtures.split(",") if name.strip()]
+    for name in names:
+        if name not in bench.FIXTURES:
+            parser.error(f"unknown fixture {name!r} (choose from {', '.join(bench.FIXTURES)})")
+
+    results = bench_fixtures(board, bench, names, args.repeat, args.min_ms)
+    archive = bench_archive(board, bench, args.archive) if args.archive else None
+
+    if args.json:
+        print(json.dumps({"fixtures": results, "archive": archive}, indent=2))
+    else:
+        print_results(results)
+        if archive:
+            print("\narchive:")
+            for name, entry in archive.items():
+                print(f"  {name:<13} {entry['captures']:>6} captures  {entry['bytes'] / 1e6:>8.1f} MB  "
+                      f"{entry['mb_per_s']:>6.2f} MB/s  peak {entry['peak_bytes'] / 1024:.1f} KB")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.save}")
+
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+        problems, slower = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+        if slower:
+            print("\nSLOWER (host timing, informational):" if not args.gate_time else "\nSLOWER:")
+            for line in slower:
+                print("  " + line)
+            if args.gate_time:
+                problems += slower
+        if problems:
+            print("\nREGRESSIONS:")
+            for line in problems:
+                print("  " + line)
+            sys.exit(1)
+        print(f"\nno regressions against {args.check}")
+
+if __name__ == "__main__":
+    main()
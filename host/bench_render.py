@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark main.py's display views on the host framebuffer emulator
+
+Each view (single line, dual line, alerts, error) is drawn in two modes:
+
+    full    - scene invalidated every frame, so every region is redrawn
+    steady  - normal operation; only regions whose inputs changed redraw
+              (the alert marquee moves 1px per frame)
+
+and reports frames/sec on this machine plus PicoGraphics calls and panel
+pushes per frame. Call counts carry over to the board; host frames/sec
+is only useful for comparing changes against each other.
+
+The glyph atlas is built in memory (sprites, plus a font with --font)
+and timed against display.text and the pixel-drawn icons, as /api/bench
+does on the board. On the host both sides are Python, so only the board's
+numbers say which path wins; compare runs/calls here instead.
+
+Usage:
+    python host/bench_render.py
+    python host/bench_render.py --seconds 2 --dump frames/
+    python host/bench_render.py --font board.bdf
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import emulator
+import build_atlas
+
+TRAINS = [("UP-N", 3), ("UP-N", 17), ("UP-N", 42)]
+
+ALERT = {
+    "header": "UP-N trains operating with delays of up to 20 minutes",
+    "description": "Due to signal problems near Clybourn, inbound and outbound "
+                   "trains are delayed. Please allow extra travel time.",
+    "routes": ["UP-N"],
+}
+
+def setup_single(main):
+    main.dual_line_mode = False
+    main.current_direction = "Inbound"
+
+def setup_dual(main):
+    main.dual_line_mode = True
+    main.LINE_2 = "Brn"
+    main.current_direction = "Inbound"
+
+def setup_alerts(main):
+    main.dual_line_mode = False
+    main.current_direction = "Alerts"
+
+def setup_error(main):
+    main.dual_line_mode = False
+    main.current_direction = "Inbound"
+    main.wifi_connected = False
+
+VIEWS = [
+    ("single", setup_single),
+    ("dual", setup_dual),
+    ("alerts", setup_alerts),
+    ("error", setup_error),
+]
+
+def reset_state(main):
+    """Put the same trains/alerts/weather in place before each view"""
+    main.line1_inbound = [main.TrainArrival(r, "Inbound", m) for r, m in TRAINS]
+    main.line1_outbound = [main.TrainArrival(r, "Outbound", m) for r, m in TRAINS]
+    main.line2_inbound = [main.TrainArrival("Brn", "Inbound", 4)]
+    main.line2_outbound = [main.TrainArrival("Brn", "Outbound", 9)]
+    main.line1_has_alerts = True
+    main.line2_has_alerts = False
+    alerts = [dict(ALERT)]
+    main.prepare_alert_layouts(alerts)
+    main.active_alerts = alerts
+    main.weather_data["temp"] = 41
+    main.weather_data["icon"] = "cloud"
+    main.wifi_connected = True
+    main.api_error = False
+    main.cached_trains_available = True
+    main.alert_carousel.update({"alert": 0, "page": 0, "offset": 0, "page_ms": 0})
+
+def run(main, mode, seconds):
+    """Draw frames for `seconds` and return (fps, calls/frame, pushes/frame)"""
+    display = main.display
+    i75 = main.i75
+    carousel = main.alert_carousel
+    layout = main.active_alerts[0]["layout"]
+    span = layout["header_w"] + main.MARQUEE_GAP
+
+    main.scene.invalidate()
+    main.draw_display()  # First frame is always a full draw
+    display.reset_calls()
+    pushes = i75.frames
+    frames = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        if mode == "full":
+            main.scene.invalidate()
+        elif main.current_direction == "Alerts":
+            carousel["offset"] = (carousel["offset"] + 1) % span
+        main.draw_display()
+        frames += 1
+    elapsed = time.perf_counter() - start
+    calls = sum(display.calls.values())
+    return frames / elapsed, calls / frames, (i75.frames - pushes) / frames, dict(display.calls)
+
+def load_atlas(board, font=None):
+    """Build an atlas in memory, install it like main.py does and print
+    its timings against display.text and the pixel icons"""
+    import atlas
+    import bench
+    data, n_glyphs, n_sprites = build_atlas.build(font)
+    pens = [board.COLOR_WHITE, board.COLOR_YELLOW, board.COLOR_RED, board.COLOR_METRA_GREEN]
+    board.glyphs = glyphs = atlas.Atlas(board.display, pens, data)
+    board.display.set_pen(board.COLOR_BLACK)
+    glyphs.calibrate()
+    timings = board.atlas_timings(bench)
+    print(f"atlas: {n_glyphs} glyphs, {n_sprites} sprites; strings via "
+          f"{'atlas' if glyphs.draw_strings else 'display.text'}")
+    for text, timing in timings["text"].items():
+        if timing:
+            print(f"  {text!r:<16} atlas {timing['atlas_us']:>5} us ({timing['runs']} spans)  "
+                  f"display.text {timing['text_us']:>5} us")
+    for icon, timing in timings["sprites"].items():
+        print(f"  {icon:<16} atlas {timing['atlas_us']:>5} us  pixels {timing['pixels_us']:>5} us")
+    print()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark display views on the framebuffer emulator")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time per view and mode (default: 1)")
+    parser.add_argument("--dump", metavar="DIR", help="Save a PNG of each view to DIR")
+    parser.add_argument("--scale", type=int, default=4, help="Pixel scale for --dump (default: 4)")
+    parser.add_argument("--calls", action="store_true", help="Show the per-call breakdown")
+    parser.add_argument("--font", help="BDF font to build into the atlas (default: sprites only)")
+    parser.add_argument("--no-atlas", action="store_true", help="Draw without an atlas (display.text and pixels)")
+    args = parser.parse_args()
+
+    board = emulator.load_main(ENABLE_WEATHER=True, WEATHER_DISPLAY_MODE="icon_and_temp")
+    if args.no_atlas:
+        board.glyphs = None
+        print("atlas: none (display.text and pixel icons)")
+    else:
+        load_atlas(board, args.font)
+    if args.dump:
+        os.makedirs(args.dump, exist_ok=True)
+
+    print(f"{'view':<8} {'mode':<7} {'frames/s':>10} {'calls/frame':>12} {'pushes/frame':>13}")
+    for name, setup in VIEWS:
+        for mode in ("full", "steady"):
+            reset_state(board)
+            setup(board)
+            board.publish_snapshot()
+            fps, calls, pushes, breakdown = run(board, mode, args.seconds)
+            print(f"{name:<8} {mode:<7} {fps:>10.0f} {calls:>12.1f} {pushes:>13.2f}")
+            if args.calls and breakdown:
+                parts = ", ".join(f"{k}={v}" for k, v in sorted(breakdown.items()))
+                print(f"         {parts}")
+        if args.dump:
+            path = os.path.join(args.dump, f"{name}.png")
+            board.i75.save(path, args.scale)
+            print(f"         saved {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Build the glyph/sprite atlas (atlas.bin) used by atlas.py on the board
+
+Pre-rasterizes a BDF bitmap font and the display sprites (weather icons,
+dual-line divider) into a compact 1-bit binary the board loads at boot.
+
+Usage:
+    python host/build_atlas.py                     # sprites only
+    python host/build_atlas.py --font board.bdf    # sprites + font
+    python host/build_atlas.py --font board.bdf -o atlas.bin
+
+Without a font the board keeps using display.text for strings and only
+the sprites come from the atlas. Any BDF works; use one whose glyphs are
+6px wide to keep the existing layout (the board font is 6px per char).
+"""
+
+import argparse
+import os
+import struct
+import sys
+
+MAGIC = b"CTBA"
+VERSION = 1
+
+# Color indexes - must match the pens list main.py passes to atlas.load()
+COLORS = {"W": 0, "Y": 1, "R": 2, "G": 3}
+
+# Sprites as ASCII art: "." is transparent, letters are COLORS
+# These match the pixels draw_weather_icon() plots (5x5 at x, y)
+SPRITES = {
+    "sun": [
+        ".....",
+        "..Y..",
+        ".YYY.",
+        "..Y..",
+        ".....",
+    ],
+    "cloud": [
+        ".....",
+        "..W..",
+        ".WWW.",
+        ".....",
+        ".....",
+    ],
+    "rain": [
+        ".....",
+        ".WWW.",
+        ".....",
+        ".Y.Y.",
+        ".....",
+    ],
+    "snow": [
+        ".....",
+        "..W..",
+        ".WWW.",
+        "..W..",
+        ".....",
+    ],
+    # Dotted divider for dual-line mode (every 4th pixel across 128px)
+    "divider": ["W..." * 32],
+}
+
+# Characters to include from the font
+CHARSET = range(32, 127)
+
+def pack_bitmap(rows, width):
+    """Pack rows of 0/1 values into 1-bit rows, MSB first"""
+    stride = (width + 7) // 8
+    out = bytearray()
+    for row in rows:
+        packed = bytearray(stride)
+        for x, bit in enumerate(row[:width]):
+            if bit:
+                packed[x >> 3] |= 0x80 >> (x & 7)
+        out += packed
+    return bytes(out)
+
+def parse_bdf(path):
+    """Parse a BDF font into (height, {code: (advance, rows)})"""
+    glyphs = {}
+    ascent = descent = None
+    bbox = None
+    with open(path, "r", encoding="latin-1") as f:
+        lines = iter(f.read().splitlines())
+
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == "FONTBOUNDINGBOX":
+            bbox = [int(v) for v in parts[1:5]]
+        elif parts[0] == "FONT_ASCENT":
+            ascent = int(parts[1])
+        elif parts[0] == "FONT_DESCENT":
+            descent = int(parts[1])
+        elif parts[0] == "STARTCHAR":
+            code = None
+            advance = None
+            gbbx = None
+            bitmap = []
+            for line in lines:
+                parts = line.split()
+                if not parts:
+                    continue
+                if parts[0] == "ENCODING":
+                    code = int(parts[1])
+                elif parts[0] == "DWIDTH":
+                    advance = int(parts[1])
+                elif parts[0] == "BBX":
+                    gbbx = [int(v) for v in parts[1:5]]
+                elif parts[0] == "BITMAP":
+                    for line in lines:
+                        if line.strip() == "ENDCHAR":
+                            break
+                        bitmap.append(int(line.strip(), 16) if line.strip() else 0)
+                    break
+            if code is not None and gbbx is not None:
+                glyphs[code] = (advance if advance is not None else gbbx[0], gbbx, bitmap)
+
+    if bbox is None:
+        raise ValueError("BDF font has no FONTBOUNDINGBOX")
+    if ascent is None:
+        ascent = bbox[1] + bbox[3]
+    if descent is None:
+        descent = -bbox[3]
+    height = ascent + descent
+
+    cells = {}
+    for code, (advance, (w, h, xoff, yoff), bitmap) in glyphs.items():
+        rows = [[0] * advance for _ in range(height)]
+        row_bits = ((w + 7) // 8) * 8
+        top = ascent - (yoff + h)
+        for gy, value in enumerate(bitmap[:h]):
+            y = top + gy
+            if not 0 <= y < height:
+                continue
+            for gx in range(w):
+                x = xoff + gx
+                if 0 <= x < advance and value & (1 << (row_bits - 1 - gx)):
+                    rows[y][x] = 1
+        cells[code] = (advance, rows)
+    return height, cells
+
+def build(font_path=None):
+    """Build the atlas bytes"""
+    height = 0
+    glyphs = {}
+    if font_path:
+        height, cells = parse_bdf(font_path)
+        glyphs = {code: cells[code] for code in CHARSET if code in cells}
+        if height > 255 or any(advance > 255 for advance, _ in glyphs.values()):
+            raise ValueError("font is too large for the atlas format")
+
+    data = bytearray()
+    glyph_index = []
+    for code in sorted(glyphs):
+        advance, rows = glyphs[code]
+        glyph_index.append((code, advance, len(data)))
+        data += pack_bitmap(rows, advance)
+
+    sprite_index = []
+    for name, art in SPRITES.items():
+        width = len(art[0])
+        layers = []
+        for letter, color in COLORS.items():
+            rows = [[1 if ch == letter else 0 for ch in line] for line in art]
+            if any(any(row) for row in rows):
+                layers.append((color, len(data)))
+                data += pack_bitmap(rows, width)
+        sprite_index.append((name, width, len(art), layers))
+
+    index = bytearray(struct.pack("<4sBBBB", MAGIC, VERSION, height, len(glyph_index), len(sprite_index)))
+    index_size = len(index) + 4 * len(glyph_index)
+    index_size += sum(11 + 3 * len(s[3]) for s in sprite_index)
+
+    for code, advance, offset in glyph_index:
+        index += struct.pack("<BBH", code, advance, index_size + offset)
+    for name, width, h, layers in sprite_index:
+        index += struct.pack("<8sBBB", name.encode()[:8], width, h, len(layers))
+        for color, offset in layers:
+            index += struct.pack("<BH", color, index_size + offset)
+
+    if index_size + len(data) > 0xFFFF:
+        raise ValueError("atlas is larger than 64 KB")
+    return bytes(index + data), len(glyph_index), len(sprite_index)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build atlas.bin for the transit board")
+    parser.add_argument("--font", help="BDF bitmap font to rasterize")
+    parser.add_argument("-o", "--output", default="atlas.bin", help="Output file (default: atlas.bin)")
+    args = parser.parse_args()
+
+    if args.font and not os.path.exists(args.font):
+        print(f"Font not found: {args.font}")
+        sys.exit(1)
+
+    atlas, n_glyphs, n_sprites = build(args.font)
+    with open(args.output, "wb") as f:
+        f.write(atlas)
+    print(f"Wrote {args.output}: {len(atlas)} bytes, {n_glyphs} glyphs, {n_sprites} sprites")
+    print("Upload it with: python upload.py")
+
+if __name__ == "__main__":
+    main()
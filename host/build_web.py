@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Build the portal's web assets (web.bin) served from flash by webassets.py
+
+Gzips the files in web/ and names each after a hash of its content
+(/static/config.3f2a1b9c.js), so the board can tell browsers to cache
+them forever: a changed file gets a new name. The loader page (built
+from loader.html with its CDN links pointed at those names) is
+packed too, and is revalidated by ETag on every load.
+
+Usage:
+    python host/build_web.py
+    python host/build_web.py --lucide lucide.min.js   # bundle the icons too
+    python host/build_web.py -o web.bin
+
+Without --lucide the loader keeps loading the icon library from unpkg;
+the portal works without it (buttons just lose their icons). Get a copy
+from https://unpkg.com/lucide/dist/umd/lucide.min.js to serve it locally.
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import struct
+import sys
+
+MAGIC = b"CTBW"
+VERSION = 1
+
+# Entry flags - must match webassets.py
+GZIP = 1
+IMMUTABLE = 2
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WEB_DIR = os.path.join(ROOT, "web")
+# The board serves this as-is (CDN links) when there is no web.bin
+LOADER = os.path.join(ROOT, "loader.html")
+CDN_URL = "https://cdn.jsdelivr.net/gh/sammcanany/ChicagoTransitBoard@main/web/"
+LUCIDE_URL = "https://unpkg.com/lucide@latest/dist/umd/lucide.min.js"
+
+# web/ files the loader links to, and their content types
+ASSETS = [
+    ("styles.css", "text/css"),
+    ("config.js", "application/javascript"),
+    ("favicon.svg", "image/svg+xml"),
+    ("apple-touch-icon.png", "image/png"),
+]
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()[:8]
+
+def compress(data):
+    """(body, flags): gzipped unless that doesn't make it smaller (PNGs)"""
+    packed = gzip.compress(data, 9, mtime=0)
+    if len(packed) < len(data):
+        return packed, GZIP
+    return data, 0
+
+def hashed_url(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"/static/{stem}.{digest(data)}{ext}"
+
+def build(lucide=None):
+    """web.bin contents and a list of (url, raw size, stored size)"""
+    entries = []  # (url, content type, etag, flags, body, raw size)
+    with open(LOADER, encoding="utf-8") as f:
+        loader = f.read()
+
+    files = [(name, ctype, os.path.join(WEB_DIR, name)) for name, ctype in ASSETS]
+    if lucide:
+        files.append(("lucide.min.js", "application/javascript", lucide))
+    for name, ctype, path in files:
+        with open(path, "rb") as f:
+            data = f.read()
+        url = hashed_url(name, data)
+        body, flags = compress(data)
+        entries.append((url, ctype, f'"{digest(data)}"', flags | IMMUTABLE, body, len(data)))
+        source = LUCIDE_URL if name == "lucide.min.js" else CDN_URL + name
+        if source not in loader:
+            raise ValueError(f"loader.html doesn't link {source}")
+        loader = loader.replace(source, url)
+
+    data = loader.encode("utf-8")
+    body, flags = compress(data)
+    entries.insert(0, ("/", "text/html", f'"{digest(data)}"', flags, body, len(data)))
+
+    # Header, index, then the bodies; offsets are from the start of the file
+    index_size = sum(3 + len(url) + len(ctype) + len(etag) + 9 for url, ctype, etag, _, _, _ in entries)
+    offset = 8 + index_size
+    index = b""
+    for url, ctype, etag, flags, body, size in entries:
+        for text in (url, ctype, etag):
+            index += struct.pack("<B", len(text)) + text.encode()
+        index += struct.pack("<BII", flags, offset, len(body))
+        offset += len(body)
+    pack = struct.pack("<4sBBH", MAGIC, VERSION, len(entries), len(index)) + index
+    pack += b"".join(entry[4] for entry in entries)
+    return pack, [(url, size, len(body)) for url, _, _, _, body, size in entries]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build web.bin for the transit board portal")
+    parser.add_argument("--lucide", help="lucide.min.js to bundle instead of loading it from unpkg")
+    parser.add_argument("-o", "--output", default="web.bin", help="Output file (default: web.bin)")
+    args = parser.parse_args()
+
+    if args.lucide and not os.path.exists(args.lucide):
+        print(f"Not found: {args.lucide}")
+        sys.exit(1)
+
+    pack, files = build(args.lucide)
+    with open(args.output, "wb") as f:
+        f.write(pack)
+    for url, size, stored in files:
+        print(f"  {url:<40} {size:>7} -> {stored:>6} bytes")
+    print(f"Wrote {args.output}: {len(pack)} bytes, {len(files)} files")
+    print("Upload it with: python upload.py")
+
+if __name__ == "__main__":
+    main()
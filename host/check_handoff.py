@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Stress-test the core-to-core handoff (handoff.py) with CPython threads
+
+Runs the board's DoubleBuffer and Worker unchanged, with host/shim
+providing MicroPython's time.ticks_*. Two writer threads publish
+snapshots (like the fetch core and a WiFi reconnect on the render core
+do) while the main thread reads as fast as it can, checking that every
+snapshot it sees is complete and that sequence numbers never go
+backwards.
+
+Usage:
+    python host/check_handoff.py
+    python host/check_handoff.py --seconds 10 --size 200
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "shim"))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import ticks
+ticks.install()
+
+from handoff import DoubleBuffer, Worker
+
+class Shared:
+    """Mutable state the writers build snapshots from (like main.py's globals)"""
+    def __init__(self, size):
+        self.items = [0] * size
+
+def make_snapshot(shared):
+    """Build a snapshot slowly, so a reader racing it would see a torn copy"""
+    def make(seq):
+        for i in range(len(shared.items)):
+            shared.items[i] = seq
+            if i % 16 == 0:
+                time.sleep(0)  # Let other threads in mid-build
+        return (seq, tuple(shared.items))
+    return make
+
+def writer(worker, buffer, shared, delay):
+    while worker.running:
+        worker.beat()
+        buffer.publish(make_snapshot(shared))
+        time.sleep(delay)
+
+def crasher(worker):
+    worker.beat()
+    raise RuntimeError("simulated fetch failure")
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress-test handoff.py with CPython threads")
+    parser.add_argument("--seconds", type=float, default=3.0, help="How long to run (default: 3)")
+    parser.add_argument("--size", type=int, default=100, help="Items per snapshot (default: 100)")
+    parser.add_argument("--delay", type=float, default=0.0005, help="Writer pause between publishes (s)")
+    args = parser.parse_args()
+
+    shared = Shared(args.size)
+    buffer = DoubleBuffer((0, tuple(shared.items)))
+    workers = [Worker("fetch"), Worker("reconnect")]
+    for w in workers:
+        if not w.start(writer, buffer, shared, args.delay):
+            print("FAIL: could not start writer thread")
+            sys.exit(1)
+
+    reads = torn = backwards = 0
+    last_seq = 0
+    deadline = time.monotonic() + args.seconds
+    while time.monotonic() < deadline:
+        seq, items = buffer.read()
+        reads += 1
+        if any(item != seq for item in items):
+            torn += 1
+        if seq < last_seq:
+            backwards += 1
+        last_seq = seq
+
+    for w in workers:
+        w.stop()
+    for _ in range(100):
+        if threading.active_count() == 1:
+            break
+        time.sleep(0.01)
+
+    # A loop that raises should stop cleanly and report why
+    crashed = Worker("crash")
+    crashed.start(crasher)
+    for _ in range(100):
+        if not crashed.running:
+            break
+        time.sleep(0.01)
+
+    stats = buffer.get_stats()
+    print(f"reads:      {reads} ({reads / args.seconds:.0f}/s)")
+    print(f"publishes:  {stats['seq']} ({stats['contended']} contended)")
+    print(f"torn reads: {torn}")
+    print(f"seq went backwards: {backwards}")
+    print(f"crashed worker: running={crashed.running} error={crashed.error!r}")
+
+    ok = (torn == 0 and backwards == 0 and stats["seq"] > 0
+          and not crashed.running and crashed.error)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
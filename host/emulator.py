@@ -0,0 +1,65 @@
+"""
+Load the board code on CPython against the modules in host/shim
+
+    import emulator
+    main = emulator.load_main(ENABLE_WEATHER=True)
+    main.draw_display()
+    main.i75.save("frame.png")
+
+The configuration comes from config.example.py with the overrides given
+to load_main(); nothing is read from (or written to) a real config.py.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import traceback
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+SHIM = os.path.join(HERE, "shim")
+
+# Settings that would make an import reach for hardware or the network
+HOST_DEFAULTS = {
+    "ENABLE_AUTO_UPDATE": False,
+    "ENABLE_WATCHDOG": False,
+}
+
+def _print_exception(exc, file=None):
+    traceback.print_exception(type(exc), exc, exc.__traceback__, file=file or sys.stdout)
+
+def install_shims():
+    """Put host/shim and the repo on sys.path and add MicroPython-only functions"""
+    for path in (REPO, SHIM):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    import ticks
+    ticks.install()
+    if not hasattr(sys, "print_exception"):
+        sys.print_exception = _print_exception
+
+def install_config(**overrides):
+    """Register a `config` module built from config.example.py"""
+    config = types.ModuleType("config")
+    with open(os.path.join(REPO, "config.example.py")) as f:
+        exec(compile(f.read(), "config.example.py", "exec"), config.__dict__)
+    for name, value in HOST_DEFAULTS.items():
+        setattr(config, name, value)
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    sys.modules["config"] = config
+    return config
+
+def load_main(quiet=True, **config):
+    """Import a fresh copy of main.py with the given config overrides"""
+    install_shims()
+    install_config(**config)
+    sys.modules.pop("main", None)
+    if quiet:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import main
+    else:
+        import main
+    return main
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Record upstream feeds into a deduplicated archive and replay them offline
+
+An archive is a directory with two append-only files:
+
+    blobs.dat   zlib-compressed response bodies, each stored once
+    index.dat   one fixed-size record per capture, in capture order:
+                time, endpoint, blob offset/lengths and the body's SHA-1
+
+A capture whose body is identical to one already stored (an unchanged
+alerts feed, a quiet night on the CTA) only adds a 41-byte index record.
+Replay memory-maps both files and decompresses one body at a time, so an
+archive much larger than RAM can be streamed into the parser benchmarks;
+nothing touches the network.
+
+Usage:
+    python host/feed_archive.py record archive/ --metra-token TOKEN --cta-key KEY --cta-stop 30057
+    python host/feed_archive.py record archive/ --base http://localhost:8080 --interval 5 --count 100
+    python host/feed_archive.py info archive/
+    python host/feed_archive.py export archive/ recordings/ --since 2026-01-15T12:00:00
+
+An archive directory can also be given to `run_headless.py --feeds`.
+"""
+
+import argparse
+import bisect
+import calendar
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+import urllib.error
+import urllib.request
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import feeds
+
+# Endpoint numbers stored in the index - only ever append to this list
+ARCHIVE_ENDPOINTS = (
+    "metra_tripupdates",
+    "metra_alerts",
+    "cta_arrivals",
+    "weather_points",
+    "weather_forecast",
+    "owm_weather",
+)
+
+# time (unix s), endpoint, blob offset, stored length, raw length, sha1
+RECORD = struct.Struct("<IBQII20s")
+
+INDEX_FILE = "index.dat"
+BLOB_FILE = "blobs.dat"
+
+def is_archive(path):
+    return os.path.isfile(os.path.join(path, INDEX_FILE))
+
+class Capture:
+    """One archived response; the body is decompressed on first access"""
+
+    __slots__ = ("time", "endpoint", "digest", "size", "_archive", "_offset", "_stored")
+
+    def __init__(self, archive, record):
+        ts, endpoint, offset, stored, size, digest = record
+        self.time = ts
+        self.endpoint = ARCHIVE_ENDPOINTS[endpoint]
+        self.digest = digest
+        self.size = size
+        self._archive = archive
+        self._offset = offset
+        self._stored = stored
+
+    @property
+    def body(self):
+        return self._archive.read_blob(self._offset, self._stored)
+
+class Archive:
+    """Append-only capture archive; open for writing with Archive(path, "a")"""
+
+    def __init__(self, path, mode="r"):
+        self.path = path
+        self.writable = mode == "a"
+        if self.writable:
+            os.makedirs(path, exist_ok=True)
+            self._repair()
+        self._index_map = None
+        self._blob_map = None
+        self._count = 0
+        self._blobs = {}  # sha1 -> (offset, stored, size), built lazily for writers
+        self.open_maps()
+
+    # ----- writing -----
+
+    def _repair(self):
+        """Drop a partial index record and orphaned blob bytes left by a crash"""
+        index_path = os.path.join(self.path, INDEX_FILE)
+        blob_path = os.path.join(self.path, BLOB_FILE)
+        for filename in (index_path, blob_path):
+            if not os.path.exists(filename):
+                open(filename, "wb").close()
+        size = os.path.getsize(index_path)
+        if size % RECORD.size:
+            with open(index_path, "r+b") as f:
+                f.truncate(size - size % RECORD.size)
+        end = 0
+        with open(index_path, "rb") as f:
+            while True:
+                raw = f.read(RECORD.size)
+                if len(raw) < RECORD.size:
+                    break
+                _, _, offset, stored, _, _ = RECORD.unpack(raw)
+                end = max(end, offset + stored)
+        if os.path.getsize(blob_path) > end:
+            with open(blob_path, "r+b") as f:
+                f.truncate(end)
+
+    def add(self, endpoint, body, ts=None):
+        """Archive one response body; returns True if the body was new"""
+        if not self.writable:
+            raise ValueError("archive opened read-only")
+        ts = int(time.time() if ts is None else ts)
+        if ts < self.last_time():
+            raise ValueError(f"capture at {ts} is older than the last one ({self.last_time()})")
+        if not self._blobs and self._count:
+            for i in range(self._count):
+                _, _, offset, stored, size, digest = self.record(i)
+                self._blobs[digest] = (offset, stored, size)
+
+        digest = hashlib.sha1(body).digest()
+        new = digest not in self._blobs
+        if new:
+            packed = zlib.compress(body, 9)
+            with open(os.path.join(self.path, BLOB_FILE), "ab") as f:
+                offset = f.tell()
+                f.write(packed)
+                f.flush()
+                os.fsync(f.fileno())
+            self._blobs[digest] = (offset, len(packed), len(body))
+        offset, stored, size = self._blobs[digest]
+        with open(os.path.join(self.path, INDEX_FILE), "ab") as f:
+            f.write(RECORD.pack(ts, ARCHIVE_ENDPOINTS.index(endpoint), offset, stored, size, digest))
+            f.flush()
+            os.fsync(f.fileno())
+        self.open_maps()
+        return new
+
+    # ----- reading -----
+
+    def open_maps(self):
+        """(Re)map the files, e.g. after another process appended to them"""
+        self.close()
+        index_path = os.path.join(self.path, INDEX_FILE)
+        blob_path = os.path.join(self.path, BLOB_FILE)
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"{self.path} is not a feed archive (no {INDEX_FILE})")
+        index_size = os.path.getsize(index_path)
+        self._count = index_size // RECORD.size
+        if self._count:
+            with open(index_path, "rb") as f:
+                self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if os.path.getsize(blob_path):
+            with open(blob_path, "rb") as f:
+                self._blob_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        for m in (self._index_map, self._blob_map):
+            if m is not None:
+                m.close()
+        self._index_map = None
+        self._blob_map = None
+
+    def __len__(self):
+        return self._count
+
+    def record(self, i):
+        return RECORD.unpack_from(self._index_map, i * RECORD.size)
+
+    def time_at(self, i):
+        return struct.unpack_from("<I", self._index_map, i * RECORD.size)[0]
+
+    def read_blob(self, offset, stored):
+        return zlib.decompress(self._blob_map[offset:offset + stored])
+
+    def first_time(self):
+        return self.time_at(0) if self._count else 0
+
+    def last_time(self):
+        return self.time_at(self._count - 1) if self._count else 0
+
+    def find(self, ts):
+        """Index of the first capture at or after ts (binary search on the mapped index)"""
+        return bisect.bisect_left(_TimeView(self), ts)
+
+    def replay(self, endpoints=None, since=None, until=None):
+        """Yield Captures in time order, optionally filtered"""
+        wanted = None
+        if endpoints:
+            wanted = {ARCHIVE_ENDPOINTS.index(name) for name in endpoints}
+        start = self.find(since) if since is not None else 0
+        for i in range(start, self._count):
+            record = self.record(i)
+            if until is not None and record[0] >= until:
+                break
+            if wanted is None or record[1] in wanted:
+                yield Capture(self, record)
+
+    def stats(self):
+        endpoints = {}
+        unique = set()
+        raw_total = 0
+        for i in range(self._count):
+            _, endpoint, offset, stored, size, digest = self.record(i)
+            entry = endpoints.setdefault(ARCHIVE_ENDPOINTS[endpoint], {"captures": 0, "unique": set()})
+            entry["captures"] += 1
+            entry["unique"].add(digest)
+            unique.add(digest)
+            raw_total += size
+        return {
+            "captures": self._count,
+            "unique_bodies": len(unique),
+            "first": self.first_time(),
+            "last": self.last_time(),
+            "raw_bytes": raw_total,
+            "stored_bytes": len(self._blob_map) if self._blob_map is not None else 0,
+            "index_bytes": self._count * RECORD.size,
+            "endpoints": {name: {"captures": e["captures"], "unique": len(e["unique"])}
+                          for name, e in endpoints.items()},
+        }
+
+    # ----- feed source (run_headless.py / mock_upstream.py) -----
+
+    def start_time(self):
+        return self.first_time() if self._count else None
+
+    def response(self, name, url, now):
+        """Newest capture of `name` at or before `now` (the first one if none yet)"""
+        if name not in ARCHIVE_ENDPOINTS:
+            return 404, b""
+        endpoint = ARCHIVE_ENDPOINTS.index(name)
+        i = min(bisect.bisect_right(_TimeView(self), now), self._count) - 1
+        while i >= 0:
+            record = self.record(i)
+            if record[1] == endpoint:
+                return 200, self.read_blob(record[2], record[3])
+            i -= 1
+        for i in range(self._count):
+            record = self.record(i)
+            if record[1] == endpoint:
+                return 200, self.read_blob(record[2], record[3])
+        return 404, b""
+
+class _TimeView:
+    """Sequence of capture times over the mapped index, for bisect"""
+
+    def __init__(self, archive):
+        self.archive = archive
+
+    def __len__(self):
+        return len(self.archive)
+
+    def __getitem__(self, i):
+        return self.archive.time_at(i)
+
+# ===== RECORDING =====
+
+def capture_urls(args):
+    """(endpoint, url) pairs to capture each round"""
+    urls = []
+    if args.metra_token or args.base:
+        token = args.metra_token or "mock"
+        urls.append(("metra_tripupdates", f"https://gtfspublic.metrarr.com/gtfs/public/tripupdates?api_token={token}"))
+        urls.append(("metra_alerts", f"https://gtfspublic.metrarr.com/gtfs/public/alerts?api_token={token}"))
+    if args.cta_key or args.base:
+        key = args.cta_key or "mock"
+        url = f"http://lapi.transitchicago.com/api/1.0/ttarrivals.aspx?key={key}&stpid={args.cta_stop}&outputType=JSON"
+        if args.cta_route:
+            url += f"&rt={args.cta_route}"
+        urls.append(("cta_arrivals", url))
+    if args.base:
+        base = args.base.rstrip("/")
+        urls = [(name, base + "/" + url.split("://", 1)[1].split("/", 1)[1]) for name, url in urls]
+    return urls
+
+def fetch(url, timeout):
+    request = urllib.request.Request(url, headers={"User-Agent": "ChicagoTransitBoard-recorder"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+def record(args):
+    archive = Archive(args.archive, "a")
+    urls = capture_urls(args)
+    if not urls:
+        sys.exit("nothing to record: give --metra-token, --cta-key or --base")
+    end = time.time() + args.duration * 60 if args.duration else None
+    rounds = 0
+    try:
+        while True:
+            started = time.time()
+            for name, url in urls:
+                try:
+                    body = fetch(url, args.timeout)
+                except (urllib.error.URLError, OSError) as e:
+                    print(f"{time.strftime('%H:%M:%S')} {name}: {e}")
+                    continue
+                new = archive.add(name, body, started)
+                print(f"{time.strftime('%H:%M:%S')} {name}: {len(body)} bytes{'' if new else ' (duplicate)'}")
+            rounds += 1
+            if args.count and rounds >= args.count:
+                break
+            if end and time.time() >= end:
+                break
+            time.sleep(max(0, started + args.interval - time.time()))
+    except KeyboardInterrupt:
+        pass
+    print_info(archive)
+
+# ===== CLI =====
+
+def parse_time(text):
+    if text is None:
+        return None
+    if text.isdigit():
+        return int(text)
+    return calendar.timegm(time.strptime(text, "%Y-%m-%dT%H:%M:%S"))
+
+def format_time(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(ts))
+
+def print_info(archive):
+    stats = archive.stats()
+    if not stats["captures"]:
+        print("empty archive")
+        return
+    ratio = stats["raw_bytes"] / max(1, stats["stored_bytes"] + stats["index_bytes"])
+    print(f"{stats['captures']} captures, {stats['unique_bodies']} unique bodies, "
+          f"{format_time(stats['first'])} - {format_time(stats['last'])}")
+    print(f"{stats['raw_bytes'] / 1024:.0f} KB of responses stored in "
+          f"{(stats['stored_bytes'] + stats['index_bytes']) / 1024:.0f} KB ({ratio:.1f}x)")
+    for name, entry in sorted(stats["endpoints"].items()):
+        print(f"  {name:<18} {entry['captures']:>7} captures  {entry['unique']:>7} unique")
+
+def export(args):
+    archive = Archive(args.archive)
+    count = 0
+    for capture in archive.replay(args.endpoint, parse_time(args.since), parse_time(args.until)):
+        folder = os.path.join(args.dest, capture.endpoint)
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"{capture.time}{feeds.extension(capture.endpoint)}"), "wb") as f:
+            f.write(capture.body)
+        count += 1
+    print(f"exported {count} captures to {args.dest}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay upstream feeds")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Capture feeds on a schedule")
+    rec.add_argument("archive", help="Archive directory (created if needed)")
+    rec.add_argument("--metra-token", help="Metra GTFS-RT API token")
+    rec.add_argument("--cta-key", help="CTA Train Tracker API key")
+    rec.add_argument("--cta-stop", default="30057", help="CTA stpid to capture (default: 30057)")
+    rec.add_argument("--cta-route", help="Restrict CTA arrivals to a route (e.g. Brn)")
+    rec.add_argument("--base", metavar="URL", help="Capture from this server instead (e.g. mock_upstream.py)")
+    rec.add_argument("--interval", type=float, default=30, help="Seconds between rounds (default: 30)")
+    rec.add_argument("--count", type=int, default=0, help="Stop after N rounds")
+    rec.add_argument("--duration", type=float, default=0, metavar="MIN", help="Stop after N minutes")
+    rec.add_argument("--timeout", type=float, default=15, help="Request timeout in seconds (default: 15)")
+
+    info = commands.add_parser("info", help="Summarize an archive")
+    info.add_argument("archive")
+
+    exp = commands.add_parser("export", help="Write captures out as <endpoint>/<unix>.<ext> files")
+    exp.add_argument("archive")
+    exp.add_argument("dest")
+    exp.add_argument("--endpoint", action="append", choices=ARCHIVE_ENDPOINTS, help="Only this endpoint (repeatable)")
+    exp.add_argument("--since", help="UTC YYYY-MM-DDTHH:MM:SS or unix seconds")
+    exp.add_argument("--until", help="UTC YYYY-MM-DDTHH:MM:SS or unix seconds")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args)
+    elif args.command == "info":
+        print_info(Archive(args.archive))
+    else:
+        export(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Upstream feeds for host runs: synthetic or recorded
+
+Every API the board talks to is identified by an endpoint name:
+
+    metra_tripupdates   GTFS-RT trip updates (protobuf)
+    metra_alerts        GTFS-RT service alerts (protobuf)
+    cta_arrivals        CTA Train Tracker arrivals (JSON)
+    weather_points      weather.gov grid point lookup (JSON)
+    weather_forecast    weather.gov forecast (JSON)
+    owm_weather         OpenWeatherMap current weather (JSON)
+
+SyntheticFeeds generates plausible responses for any moment in time, so
+countdowns tick down and trains come and go as the clock advances.
+RecordedFeeds serves captured responses from a directory laid out as
+<dir>/<endpoint>/<unix seconds>.<ext>, picking the newest capture at or
+before the current time (or from a feed_archive.py archive, see
+open_recordings()). HttpFeeds fetches from a running
+mock_upstream.py (or anything else serving the same paths).
+"""
+
+import http.client
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench import pb_bytes as _bytes, pb_feed_header as _feed_header, pb_translated as _translated, pb_uint as _uint
+
+ENDPOINTS = {
+    "metra_tripupdates": ("gtfspublic.metrarr.com", "/gtfs/public/tripupdates", "application/x-protobuf"),
+    "metra_alerts": ("gtfspublic.metrarr.com", "/gtfs/public/alerts", "application/x-protobuf"),
+    "cta_arrivals": ("lapi.transitchicago.com", "/api/1.0/ttarrivals.aspx", "application/json"),
+    "weather_points": ("api.weather.gov", "/points/", "application/geo+json"),
+    "weather_forecast": ("api.weather.gov", "/gridpoints/", "application/geo+json"),
+    "owm_weather": ("api.openweathermap.org", "/data/2.5/weather", "application/json"),
+}
+
+EXTENSIONS = {"application/x-protobuf": ".pb"}
+
+def endpoint_for(url):
+    """Endpoint name for a request URL, or None if it isn't an upstream API"""
+    parts = urlsplit(url)
+    for name, (host, path, _) in ENDPOINTS.items():
+        if parts.hostname == host and parts.path.startswith(path):
+            return name
+    return None
+
+def endpoint_for_path(path):
+    """Endpoint name for a request path on a server standing in for every host"""
+    path = urlsplit(path).path
+    for name, (_, prefix, _) in ENDPOINTS.items():
+        if path.startswith(prefix):
+            return name
+    return None
+
+def content_type(name):
+    return ENDPOINTS[name][2]
+
+def extension(name):
+    return EXTENSIONS.get(content_type(name), ".json")
+
+# ===== SYNTHETIC FEEDS =====
+
+CHICAGO = timezone(timedelta(hours=-6))  # The board treats Chicago as UTC-6 year-round
+
+def _chicago(ts):
+    return datetime.fromtimestamp(int(ts), CHICAGO)
+
+OTHER_METRA_ROUTES = ["UP-NW", "UP-W", "BNSF", "MD-N", "MD-W", "NCS", "HC", "RI", "SWS", "ME"]
+
+class SyntheticFeeds:
+    """Deterministic fake upstream data for any point in time.
+
+    Trains for `line` call at `station` every `headway` minutes in each
+    direction; the rest of the feed is filler trips on other routes so
+    its size is in the range of the real Metra feed.
+    """
+
+    def __init__(self, line="UP-N", station="RAVENSWOOD", headway=20, trips=80,
+                 stops_per_trip=20, alerts=2, cta_route="Brn"):
+        self.line = line
+        self.station = station
+        self.headway = headway
+        self.trips = trips
+        self.stops_per_trip = stops_per_trip
+        self.alerts = alerts
+        self.cta_route = cta_route
+        self._trips = (None, b"")  # (base, encoded entities) - only changes once per headway
+
+    def start_time(self):
+        return None
+
+    def metra_tripupdates(self, now):
+        period = self.headway * 60
+        base = int(now) - int(now) % period
+        if self._trips[0] != base:
+            self._trips = (base, self._trip_entities(base, period))
+        return _feed_header(now) + self._trips[1]
+
+    def _trip_entities(self, base, period):
+        out = bytearray()
+        for k in range(self.trips):
+            ours = k % 4 == 0
+            route = self.line if ours else OTHER_METRA_ROUTES[k % len(OTHER_METRA_ROUTES)]
+            inbound = (k // 4) % 2 == 0
+            departs = base + (k // 8) * period + (k % 8) * 90 - period
+            trip = _bytes(1, f"{route}_{k:03d}_{departs}") + _bytes(5, route)
+            updates = bytearray()
+            for seq in range(1, self.stops_per_trip + 1):
+                stop_id = f"STOP{k % 7}_{seq}"
+                if ours and seq == (20 if inbound else 5):
+                    stop_id = self.station
+                arrival = departs + seq * 180
+                updates += _bytes(2, _uint(1, seq) + _bytes(2, _uint(2, arrival)) + _bytes(4, stop_id))
+            trip_update = _bytes(1, trip) + updates
+            out += _bytes(2, _bytes(1, f"{k}") + _bytes(3, trip_update))
+        return bytes(out)
+
+    def metra_alerts(self, now):
+        out = bytearray(_feed_header(now))
+        texts = [
+            (self.line, f"{self.line} trains operating with delays of up to 15 minutes",
+             "Due to signal problems, inbound and outbound trains are delayed. "
+             "Please allow extra travel time."),
+            ("BNSF", "BNSF schedule change this weekend",
+             "Track work will reduce service on Saturday and Sunday. Check the "
+             "revised timetable before you travel."),
+            ("MD-W", "Elevator out of service at Western Avenue",
+             "Customers needing an accessible route should use Grand/Cicero."),
+        ]
+        for i in range(self.alerts):
+            route, header, description = texts[i % len(texts)]
+            alert = (_bytes(5, _bytes(1, "METRA") + _bytes(4, route))
+                     + _uint(6, 1) + _uint(7, 2)
+                     + _bytes(10, _translated(header))
+                     + _bytes(11, _translated(description)))
+            out += _bytes(2, _bytes(1, f"alert{i}") + _bytes(2, alert))
+        return bytes(out)
+
+    def cta_arrivals(self, now, route=None):
+        route = route or self.cta_route
+        period = 8 * 60
+        base = int(now) - int(now) % period
+        etas = []
+        for i in range(6):
+            arrival = base + period * (i // 2 + 1) + (i % 2) * 120
+            etas.append({
+                "staNm": "Host Station",
+                "rt": route,
+                "destNm": "Loop" if i % 2 == 0 else "Kimball",
+                "trDr": "5" if i % 2 == 0 else "1",
+                "arrT": _chicago(arrival).strftime("%Y-%m-%dT%H:%M:%S"),  # Chicago time
+            })
+        return json.dumps({"ctatt": {
+            "tmst": _chicago(now).strftime("%Y-%m-%dT%H:%M:%S"),
+            "errCd": "0",
+            "errNm": None,
+            "eta": etas,
+        }}).encode()
+
+    def weather_points(self, now):
+        return json.dumps({"properties": {
+            "forecast": "https://api.weather.gov/gridpoints/LOT/76,73/forecast",
+        }}).encode()
+
+    def weather_forecast(self, now):
+        hour = _chicago(now).hour
+        temp = 35 + abs(12 - hour)
+        forecasts = ["Sunny", "Partly Cloudy", "Chance Rain Showers", "Light Snow"]
+        return json.dumps({"properties": {"periods": [{
+            "number": 1,
+            "temperature": temp,
+            "temperatureUnit": "F",
+            "shortForecast": forecasts[(int(now) // 21600) % len(forecasts)],
+        }]}}).encode()
+
+    def owm_weather(self, now):
+        hour = _chicago(now).hour
+        codes = [800, 802, 500, 600]
+        return json.dumps({
+            "weather": [{"id": codes[(int(now) // 21600) % len(codes)], "main": "Clouds"}],
+            "main": {"temp": 35.0 + abs(12 - hour), "humidity": 60},
+            "name": "Chicago",
+        }).encode()
+
+    def response(self, name, url, now):
+        """(status, body) for an endpoint at time `now`"""
+        if name == "cta_arrivals":
+            query = parse_qs(urlsplit(url).query)
+            return 200, self.cta_arrivals(now, query.get("rt", [None])[0])
+        return 200, getattr(self, name)(now)
+
+# ===== RECORDED FEEDS =====
+
+class RecordedFeeds:
+    """Captured responses served by capture time"""
+
+    def __init__(self, root):
+        self.root = root
+        self.index = {}
+        for name in ENDPOINTS:
+            folder = os.path.join(root, name)
+            if not os.path.isdir(folder):
+                continue
+            captures = []
+            for filename in os.listdir(folder):
+                stem = filename.split(".")[0]
+                if stem.isdigit():
+                    captures.append((int(stem), os.path.join(folder, filename)))
+            captures.sort()
+            if captures:
+                self.index[name] = captures
+
+    def start_time(self):
+        """Time of the earliest capture (a sensible clock start for replay)"""
+        starts = [captures[0][0] for captures in self.index.values()]
+        return min(starts) if starts else None
+
+    def response(self, name, url, now):
+        captures = self.index.get(name)
+        if not captures:
+            return 404, b""
+        chosen = captures[0][1]
+        for ts, path in captures:
+            if ts > now:
+                break
+            chosen = path
+        with open(chosen, "rb") as f:
+            return 200, f.read()
+
+def open_recordings(path):
+    """RecordedFeeds for a capture directory, or an Archive for a feed_archive.py archive"""
+    import feed_archive
+    if feed_archive.is_archive(path):
+        return feed_archive.Archive(path)
+    return RecordedFeeds(path)
+
+# ===== LIVE HTTP =====
+
+class HttpFeeds:
+    """Fetch every endpoint from one server (e.g. host/mock_upstream.py).
+
+    Requests keep their path and query; only scheme and host change, and
+    X-Mock-Time tells the server which moment to answer for. Connection
+    failures raise OSError, like urequests on the board.
+    """
+
+    measured = True  # Latency is real, not simulated
+
+    def __init__(self, base_url, timeout=15):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def start_time(self):
+        return None
+
+    def response(self, name, url, now):
+        parts = urlsplit(url)
+        target = self.base_url + parts.path + ("?" + parts.query if parts.query else "")
+        request = urllib.request.Request(target, headers={"X-Mock-Time": str(int(now))})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+        except (urllib.error.URLError, ConnectionError, TimeoutError, http.client.HTTPException) as e:
+            raise OSError(str(e)) from e
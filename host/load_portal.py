@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Load-test the config portal while the board runs headless
+
+Boots main() the way run_headless.py does, then runs --clients simulated
+browsers that each request a portal page every --interval ms over the
+shim's in-memory streams. Latency is counted from when a request was due,
+not from when the client got to send it, so time spent queued behind a
+blocking train fetch is included. Requests are split by whether a train
+fetch was in progress when they were due, and the render task's lateness
+shows whether serving them held up the display.
+
+All times are virtual board time: each upstream request costs --latency
+ms, portal handling itself costs nothing, so what this measures is how
+long clients wait on the rest of the board.
+
+Usage:
+    python host/load_portal.py --minutes 10 --clients 4
+    python host/load_portal.py --clients 16 --interval 100 --latency 2000
+    python host/load_portal.py --paths /metrics /api/status --json
+    python host/load_portal.py --clients 8 --interval 100 --one-address   # trips the rate limit
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import run_headless
+
+DEFAULT_PATHS = ["/api/status", "/api/config", "/metrics", "/api/logs", "/"]
+
+class Load:
+    """Client tasks and the results they collect"""
+
+    def __init__(self, clients, interval_ms, paths, address=None):
+        self.clients = clients
+        self.address = address  # Shared client address, or None for one each
+        self.interval_ms = interval_ms
+        self.paths = paths
+        self.results = []  # (due_ms, latency_ms, status, bytes)
+        self.fetches = []  # (start_ms, end_ms) of every fetch_trains() call
+        self.refused = 0
+
+    def watch_fetches(self, board, clock):
+        """Record when fetch_trains() runs (trains_job looks it up by name)"""
+        import vclock
+        fetch = board.fetch_trains
+
+        def timed_fetch(*args, **kwargs):
+            start = vclock.now_ms()
+            try:
+                return fetch(*args, **kwargs)
+            finally:
+                self.fetches.append((start, vclock.now_ms()))
+        board.fetch_trains = timed_fetch
+
+    async def client(self, n, board):
+        import uasyncio
+        import vclock
+        # Clients start once the portal is up, spread over one interval
+        while board.portal_server is None:
+            await uasyncio.sleep_ms(100)
+        await uasyncio.sleep_ms(n * self.interval_ms // self.clients)
+        due = vclock.now_ms()
+        k = n
+        while True:
+            path = self.paths[k % len(self.paths)]
+            k += 1
+            try:
+                reader, writer = await uasyncio.open_connection("board.local", 80, self.address)
+            except OSError:
+                self.refused += 1
+            else:
+                writer.write(("GET %s HTTP/1.1\r\nHost: board.local\r\n\r\n" % path).encode())
+                await writer.drain()
+                data = await reader.read()
+                writer.close()
+                status = int(data.split(b" ", 2)[1]) if data.startswith(b"HTTP/") else 0
+                self.results.append((due, vclock.now_ms() - due, status, len(data)))
+            due += self.interval_ms
+            await uasyncio.sleep_ms(max(0, due - vclock.now_ms()))
+
+    def tasks(self):
+        def start(board, clock):
+            self.watch_fetches(board, clock)
+            return self.client(0, board)
+
+        def other(n):
+            return lambda board, clock: self.client(n, board)
+        return [start] + [other(n) for n in range(1, self.clients)]
+
+    def during_fetch(self, due):
+        for start, end in self.fetches:
+            if start <= due < end:
+                return True
+        return False
+
+    def report(self):
+        idle = [r for r in self.results if not self.during_fetch(r[0])]
+        busy = [r for r in self.results if self.during_fetch(r[0])]
+        statuses = {}
+        for r in self.results:
+            statuses[r[2]] = statuses.get(r[2], 0) + 1
+        fetch_ms = [end - start for start, end in self.fetches]
+        return {
+            "clients": self.clients,
+            "interval_ms": self.interval_ms,
+            "requests": len(self.results),
+            "refused": self.refused,
+            "statuses": {str(k): v for k, v in sorted(statuses.items())},
+            "latency_ms": {
+                "all": percentiles([r[1] for r in self.results]),
+                "outside_trains_fetch": percentiles([r[1] for r in idle]),
+                "during_trains_fetch": percentiles([r[1] for r in busy]),
+            },
+            "trains_fetches": {
+                "count": len(fetch_ms),
+                "avg_ms": sum(fetch_ms) // len(fetch_ms) if fetch_ms else 0,
+                "max_ms": max(fetch_ms) if fetch_ms else 0,
+            },
+        }
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+
+    def at(p):
+        return values[min(len(values) - 1, int(len(values) * p))]
+    return {"count": len(values), "p50": at(0.5), "p90": at(0.9), "p99": at(0.99), "max": values[-1]}
+
+def print_report(report):
+    print(f"{report['outcome']}: {report['simulated_hours'] * 60:.0f} min simulated in {report['wall_seconds']}s")
+    load = report["load"]
+    print(f"\n{load['clients']} clients, one request each every {load['interval_ms']} ms: "
+          f"{load['requests']} requests, {load['refused']} refused, statuses {load['statuses']}")
+    fetches = load["trains_fetches"]
+    print(f"trains fetches: {fetches['count']}, avg {fetches['avg_ms']} ms, max {fetches['max_ms']} ms")
+    print("\nportal latency (ms):")
+    for name, stats in load["latency_ms"].items():
+        if stats["count"]:
+            print(f"  {name:<20} {stats['count']:>6}  p50 {stats['p50']:>6}  p90 {stats['p90']:>6}  "
+                  f"p99 {stats['p99']:>6}  max {stats['max']:>6}")
+        else:
+            print(f"  {name:<20} {0:>6}")
+    render = report["render"]
+    print(f"\nrender: {render['runs']} frames, late avg {render['late_ms_avg']} ms, "
+          f"max {render['late_ms_max']} ms, {render['overruns']} overruns")
+    portal = report["portal"]
+    rejected = portal["rejected"]
+    print(f"portal server: {portal['requests']} served, {portal['errors']} errors, "
+          f"{portal['timeouts']} timeouts, up to {portal['max_active']} at once, "
+          f"{portal['deferred']} deferred for a frame")
+    print(f"  rejected: {rejected['busy']} busy, {rejected['rate']} rate limited, {rejected['size']} too large")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure config portal latency while the board runs headless")
+    parser.add_argument("--minutes", type=float, default=10, help="Simulated minutes to run (default: 10)")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent clients (default: 4)")
+    parser.add_argument("--interval", type=int, default=500, metavar="MS", help="Each client's time between requests (default: 500)")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS, help="Pages to cycle through")
+    parser.add_argument("--one-address", action="store_true", help="All clients share one address (like one busy browser)")
+    parser.add_argument("--latency", type=int, default=300, help="Simulated ms per upstream HTTP request (default: 300)")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Override a config value")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    load = Load(args.clients, args.interval, args.paths, ("10.0.0.2", 50000) if args.one_address else None)
+    board_args = argparse.Namespace(
+        hours=args.minutes / 60, start=None, feeds=None, upstream=None, latency=args.latency,
+        fail_every=0, set=args.set, raster=False, dump=None, dump_every=30, log=None,
+        verbose=False, json=True)
+    report = run_headless.run(board_args, load.tasks())
+    board = sys.modules["main"]
+    render = board.supervisor.find("render").get_stats()
+    result = {
+        "outcome": report["outcome"],
+        "simulated_hours": report["simulated_hours"],
+        "wall_seconds": report["wall_seconds"],
+        "load": load.report(),
+        "render": {k: render[k] for k in ("runs", "late_ms_avg", "late_ms_max", "overruns")},
+        "portal": board.portal_server.get_stats() if board.portal_server else None,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Local mock of every upstream API the board talks to
+
+Serves the Metra GTFS-RT feeds, CTA Train Tracker and weather APIs from
+feeds.SyntheticFeeds (or recorded responses with --feeds) on one port,
+matching requests by path so a board or run_headless.py only needs its
+host swapped. Network conditions are configurable:
+
+    --latency/--jitter   delay before the response starts
+    --bandwidth          throttle the body to N KB/s
+    --error-rate         fraction of requests that fail, as one of --errors:
+                         500, 503, timeout (never answers), reset (closes
+                         the connection), truncate (sends half the body)
+    ETag/If-None-Match   304 for unchanged bodies (--no-etag to disable)
+    gzip                 when the client sends Accept-Encoding: gzip
+                         (--no-gzip to disable)
+
+GET /_stats returns request, byte and error counts as JSON. A request
+carrying an X-Mock-Time header (Unix seconds) is answered as of that time,
+which is how run_headless.py keeps its virtual clock and the feeds in step.
+
+Usage:
+    python host/mock_upstream.py --port 8080
+    python host/mock_upstream.py --latency 800 --jitter 400 --bandwidth 20 --error-rate 0.1
+    python host/mock_upstream.py --feeds recordings/ --errors 503,truncate
+
+Then set UPSTREAM_OVERRIDE = "http://<this machine>:8080" in the board's
+config.py, or run `python host/run_headless.py --upstream http://localhost:8080`.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import feeds
+
+ERROR_KINDS = ("500", "503", "timeout", "reset", "truncate")
+CHUNK = 512  # Bytes per write when throttling
+
+class Upstream:
+    """Feed source plus network conditions, shared by all handler threads"""
+
+    def __init__(self, source, latency_ms=0, jitter_ms=0, bandwidth_kbs=0,
+                 error_rate=0.0, errors=ERROR_KINDS, etag=True, gzip=True,
+                 clock_offset=0, seed=None):
+        self.source = source
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.bandwidth_kbs = bandwidth_kbs
+        self.error_rate = error_rate
+        self.errors = errors
+        self.etag = etag
+        self.gzip = gzip
+        self.clock_offset = clock_offset  # Added to wall time (replay recordings "now")
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def now(self):
+        return time.time() + self.clock_offset
+
+    def count(self, name, key, amount=1):
+        with self.lock:
+            stats = self.stats.setdefault(name, {"requests": 0, "bytes": 0, "not_modified": 0,
+                                                 "gzip": 0, "errors": 0})
+            stats[key] += amount
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0, self.latency_ms + jitter) / 1000
+
+    def pick_error(self):
+        with self.lock:
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.random.choice(self.errors)
+        return None
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    upstream = None  # Set by make_server()
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body):
+        upstream = self.upstream
+        if self.path == "/_stats":
+            with upstream.lock:
+                body = json.dumps(upstream.stats, indent=2).encode()
+            return self.send_body(200, body, "application/json", send_body)
+
+        name = feeds.endpoint_for_path(self.path)
+        if name is None:
+            return self.send_body(404, b"not an upstream endpoint\n", "text/plain", send_body)
+        upstream.count(name, "requests")
+
+        time.sleep(upstream.delay())
+        error = upstream.pick_error()
+        if error in ("500", "503"):
+            upstream.count(name, "errors")
+            self.send_response(int(error))
+            if error == "503":
+                self.send_header("Retry-After", "30")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if error == "timeout":
+            upstream.count(name, "errors")
+            time.sleep(120)  # Longer than any client timeout on the board
+            self.close_connection = True
+            return
+        if error == "reset":
+            upstream.count(name, "errors")
+            self.reset()
+            return
+
+        now = upstream.now()
+        if "X-Mock-Time" in self.headers:
+            now = float(self.headers["X-Mock-Time"])
+        status, body = upstream.source.response(name, self.path, now)
+        if status != 200:
+            upstream.count(name, "errors")
+            return self.send_body(status, body, "text/plain", send_body)
+
+        headers = {}
+        if upstream.etag:
+            tag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            headers["ETag"] = tag
+            if tag in self.headers.get("If-None-Match", ""):
+                upstream.count(name, "not_modified")
+                self.send_response(304)
+                self.send_header("ETag", tag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        if upstream.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, 6)
+            headers["Content-Encoding"] = "gzip"
+            upstream.count(name, "gzip")
+        headers["Vary"] = "Accept-Encoding"
+
+        if error == "truncate":
+            upstream.count(name, "errors")
+            self.send_body(200, body, feeds.content_type(name), send_body, headers,
+                           limit=len(body) // 2)
+            self.close_connection = True
+            return
+        self.send_body(200, body, feeds.content_type(name), send_body, headers)
+        upstream.count(name, "bytes", len(body))
+
+    def send_body(self, status, body, content_type, send_body, headers=None, limit=None):
+        """Send a response, throttled to --bandwidth; `limit` cuts the body short"""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if not send_body:
+            return
+        if limit is not None:
+            body = body[:limit]
+        rate = self.upstream.bandwidth_kbs * 1024
+        try:
+            if not rate:
+                self.wfile.write(body)
+                return
+            for i in range(0, len(body), CHUNK):
+                piece = body[i:i + CHUNK]
+                self.wfile.write(piece)
+                self.wfile.flush()
+                time.sleep(len(piece) / rate)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def reset(self):
+        """Close the connection with a TCP RST instead of a FIN"""
+        self.close_connection = True
+        try:
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, b"\x01\x00\x00\x00\x00\x00\x00\x00")
+            self.connection.close()
+        except OSError:
+            pass
+
+def make_server(upstream, host="0.0.0.0", port=8080, verbose=False):
+    handler = type("UpstreamHandler", (Handler,), {"upstream": upstream})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Metra/CTA/weather APIs for development")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on (default: all)")
+    parser.add_argument("--port", type=int, default=8080, help="Port (default: 8080)")
+    parser.add_argument("--feeds", metavar="DIR", help="Serve recorded feeds (capture directory or feed_archive.py archive)")
+    parser.add_argument("--trips", type=int, default=80, help="Synthetic Metra trips per feed (default: 80)")
+    parser.add_argument("--stops", type=int, default=20, help="Stops per synthetic trip (default: 20)")
+    parser.add_argument("--alerts", type=int, default=2, help="Synthetic alerts (default: 2)")
+    parser.add_argument("--latency", type=int, default=0, metavar="MS", help="Delay before each response")
+    parser.add_argument("--jitter", type=int, default=0, metavar="MS", help="Random +/- added to --latency")
+    parser.add_argument("--bandwidth", type=float, default=0, metavar="KBS", help="Throttle bodies to KB/s (0 = off)")
+    parser.add_argument("--error-rate", type=float, default=0.0, metavar="P", help="Fraction of requests that fail")
+    parser.add_argument("--errors", default=",".join(ERROR_KINDS),
+                        help=f"Failure kinds to pick from (default: {','.join(ERROR_KINDS)})")
+    parser.add_argument("--no-etag", action="store_true", help="Never send ETag / 304")
+    parser.add_argument("--no-gzip", action="store_true", help="Never gzip responses")
+    parser.add_argument("--seed", type=int, help="Random seed for jitter and errors")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    errors = tuple(kind.strip() for kind in args.errors.split(",") if kind.strip())
+    for kind in errors:
+        if kind not in ERROR_KINDS:
+            parser.error(f"unknown error kind {kind!r} (choose from {', '.join(ERROR_KINDS)})")
+
+    offset = 0
+    if args.feeds:
+        source = feeds.open_recordings(args.feeds)
+        start = source.start_time()
+        if start is None:
+            parser.error(f"no recordings found in {args.feeds}")
+        offset = start - time.time()  # Replay from the first capture onwards
+    else:
+        source = feeds.SyntheticFeeds(trips=args.trips, stops_per_trip=args.stops, alerts=args.alerts)
+
+    upstream = Upstream(source, args.latency, args.jitter, args.bandwidth, args.error_rate,
+                        errors, not args.no_etag, not args.no_gzip, offset, args.seed)
+    server = make_server(upstream, args.host, args.port, args.verbose)
+    print(f"Mock upstream on http://{args.host}:{args.port} ({'recorded' if args.feeds else 'synthetic'} feeds)")
+    for name, (host, path, _) in feeds.ENDPOINTS.items():
+        print(f"  {name:<18} {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
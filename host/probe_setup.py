@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Fire parallel DNS and HTTP probes at the WiFi setup portal
+
+Several simulated phones look up names (captive-portal DNS) and load
+portal pages at once, while --stalled clients open a connection, send
+half a request and go quiet, the way a slow phone does. Reports how long
+DNS answers and pages took and how many never came back.
+
+By default the portal (setup_portal.serve()) runs right here on the host
+shims: DNS on a real UDP socket on 127.0.0.1, HTTP over the shim's
+in-memory streams, everything in real time. With --board the probes go
+over the network to a board in setup mode instead (join its WiFi first).
+
+Usage:
+    python host/probe_setup.py --seconds 10 --dns 4 --http 4 --stalled 2
+    python host/probe_setup.py --board 192.168.4.1 --seconds 30 --json
+"""
+
+import argparse
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_portal import percentiles
+
+DEFAULT_PATHS = ["/", "/generate_204", "/hotspot-detect.html", "/connecttest.txt"]
+NAMES = ["connectivitycheck.gstatic.com", "captive.apple.com", "www.msftconnecttest.com"]
+
+def dns_query(qid, name):
+    """A standard A query for name"""
+    question = b"".join(struct.pack("B", len(part)) + part.encode() for part in name.split("."))
+    return struct.pack(">HHHHHH", qid, 0x0100, 1, 0, 0, 0) + question + b"\0\0\1\0\1"
+
+def dns_answer(reply, qid):
+    """The address in a reply to query qid, or None"""
+    if len(reply) < 16 or struct.unpack_from(">H", reply)[0] != qid:
+        return None
+    if struct.unpack_from(">H", reply, 6)[0] < 1:
+        return None
+    return ".".join(str(b) for b in reply[-4:])
+
+def http_status(data):
+    return int(data.split(b" ", 2)[1]) if data.startswith(b"HTTP/") else 0
+
+class Probes:
+    """Probe results: latencies in ms, None for no (or a wrong) answer"""
+
+    def __init__(self, args):
+        self.args = args
+        self.dns = []
+        self.http = []
+        self.statuses = {}
+        self.stalled = 0  # Stalled connections opened
+        self.lock = threading.Lock()
+
+    def add(self, results, latency_ms, status=None):
+        with self.lock:
+            results.append(latency_ms)
+            if status is not None:
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def report(self):
+        def summary(results):
+            ok = [r for r in results if r is not None]
+            stats = percentiles(ok)
+            stats["failed"] = len(results) - len(ok)
+            return stats
+        return {
+            "dns": summary(self.dns),
+            "http": summary(self.http),
+            "http_statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "stalled_connections": self.stalled,
+        }
+
+# ===== Against a board (real sockets, one thread per client) =====
+
+def board_dns_client(probes, n, stop):
+    args = probes.args
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(args.timeout / 1000)
+    qid = n << 12
+    while time.monotonic() < stop:
+        qid = (qid + 1) & 0xFFFF
+        start = time.monotonic()
+        sock.sendto(dns_query(qid, NAMES[qid % len(NAMES)]), (args.board, args.dns_port))
+        latency = None
+        try:
+            while latency is None:
+                if dns_answer(sock.recv(512), qid):
+                    latency = int((time.monotonic() - start) * 1000)
+        except OSError:
+            pass  # Timed out
+        probes.add(probes.dns, latency)
+        time.sleep(args.interval / 1000)
+
+def board_http_client(probes, n, stop):
+    args = probes.args
+    k = n
+    while time.monotonic() < stop:
+        path = args.paths[k % len(args.paths)]
+        k += 1
+        start = time.monotonic()
+        status = 0
+        try:
+            with socket.create_connection((args.board, args.http_port), args.timeout / 1000) as sock:
+                sock.sendall(("GET %s HTTP/1.1\r\nHost: %s\r\n\r\n" % (path, args.board)).encode())
+                data = b""
+                while True:
+                    chunk = sock.recv(1024)
+                    if not chunk:
+                        break
+                    data += chunk
+                status = http_status(data)
+        except OSError:
+            pass
+        latency = int((time.monotonic() - start) * 1000) if status else None
+        probes.add(probes.http, latency, status)
+        time.sleep(args.interval / 1000)
+
+def board_stalled_client(probes, n, stop):
+    args = probes.args
+    while time.monotonic() < stop:
+        try:
+            with socket.create_connection((args.board, args.http_port), args.timeout / 1000) as sock:
+                probes.stalled += 1
+                sock.sendall(b"GET / HTTP/1.1\r\n")
+                sock.settimeout(max(0.1, stop - time.monotonic()))
+                while sock.recv(1024):
+                    pass  # Wait for the board to give up on us
+        except OSError:
+            time.sleep(0.1)
+
+def run_board(args, probes):
+    stop = time.monotonic() + args.seconds
+    threads = []
+    for count, func in ((args.dns, board_dns_client), (args.http, board_http_client),
+                        (args.stalled, board_stalled_client)):
+        for n in range(count):
+            threads.append(threading.Thread(target=func, args=(probes, n, stop), daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(args.seconds + args.timeout / 1000 + 1)
+    return None
+
+# ===== Against the portal running here (host shims) =====
+
+async def local_dns_client(probes, n, stop):
+    import uasyncio
+    args = probes.args
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    qid = n << 12
+    while time.monotonic() < stop:
+        qid = (qid + 1) & 0xFFFF
+        start = time.monotonic()
+        sock.sendto(dns_query(qid, NAMES[qid % len(NAMES)]), ("127.0.0.1", args.dns_port))
+        latency = None
+        while latency is None and (time.monotonic() - start) * 1000 < args.timeout:
+            try:
+                if dns_answer(sock.recv(512), qid):
+                    latency = int((time.monotonic() - start) * 1000)
+            except BlockingIOError:
+                await uasyncio.sleep_ms(1)
+        probes.add(probes.dns, latency)
+        await uasyncio.sleep_ms(args.interval)
+    sock.close()
+
+async def local_http_client(probes, n, stop):
+    import uasyncio
+    args = probes.args
+
+    async def fetch(path):
+        reader, writer = await uasyncio.open_connection("192.168.4.1", args.http_port)
+        writer.write(("GET %s HTTP/1.1\r\nHost: 192.168.4.1\r\n\r\n" % path).encode())
+        await writer.drain()
+        data = await reader.read()
+        writer.close()
+        return http_status(data)
+
+    k = n
+    while time.monotonic() < stop:
+        path = args.paths[k % len(args.paths)]
+        k += 1
+        start = time.monotonic()
+        try:
+            status = await uasyncio.wait_for_ms(fetch(path), args.timeout)
+        except (OSError, uasyncio.TimeoutError):
+            status = 0
+        latency = int((time.monotonic() - start) * 1000) if status else None
+        probes.add(probes.http, latency, status)
+        await uasyncio.sleep_ms(args.interval)
+
+async def local_stalled_client(probes, n, stop):
+    import uasyncio
+    args = probes.args
+    while time.monotonic() < stop:
+        reader, writer = await uasyncio.open_connection("192.168.4.1", args.http_port)
+        probes.stalled += 1
+        writer.write(b"GET / HTTP/1.1\r\n")
+        await writer.drain()
+        await reader.read()  # Until the server gives up on us
+        writer.close()
+
+def run_local(args, probes):
+    import emulator
+    emulator.install_shims()
+    import network
+    import uasyncio
+    import setup_portal
+
+    scans = setup_portal.ScanCache(network.WLAN(network.STA_IF))
+    scans.scan()
+
+    async def main():
+        dns, server = await setup_portal.serve(scans, args.dns_port, args.http_port)
+        stop = time.monotonic() + args.seconds
+        for count, func in ((args.dns, local_dns_client), (args.http, local_http_client),
+                            (args.stalled, local_stalled_client)):
+            for n in range(count):
+                uasyncio.create_task(func(probes, n, stop))
+        await uasyncio.sleep_ms(args.seconds * 1000 + args.timeout)
+        server.close()
+        dns.sock.close()
+        return {"dns": dns.get_stats(), "http": server.get_stats()}
+    return uasyncio.run(main())
+
+def print_report(report):
+    where = report["target"]
+    print(f"{report['seconds']} s against {where}: {report['clients']['dns']} DNS, "
+          f"{report['clients']['http']} HTTP and {report['clients']['stalled']} stalled clients")
+    print("\nlatency (ms):")
+    for name in ("dns", "http"):
+        stats = report["probes"][name]
+        if stats["count"]:
+            print(f"  {name:<5} {stats['count']:>6} ok  {stats['failed']:>4} failed  p50 {stats['p50']:>5}  "
+                  f"p90 {stats['p90']:>5}  p99 {stats['p99']:>5}  max {stats['max']:>5}")
+        else:
+            print(f"  {name:<5} {0:>6} ok  {stats['failed']:>4} failed")
+    print(f"\nHTTP statuses {report['probes']['http_statuses']}, "
+          f"{report['probes']['stalled_connections']} stalled connections")
+    server = report["server"]
+    if server:
+        http = server["http"]
+        print(f"DNS server: {server['dns']['queries']} queries, {server['dns']['answered']} answered")
+        print(f"web server: {http['requests']} served, {http['timeouts']} timeouts, up to "
+              f"{http['max_active']} at once, rejected {http['rejected']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe the setup portal's DNS and web servers in parallel")
+    parser.add_argument("--board", metavar="IP", help="Probe a board in setup mode (e.g. 192.168.4.1) instead of a local portal")
+    parser.add_argument("--seconds", type=int, default=10, help="How long to probe (default: 10)")
+    parser.add_argument("--dns", type=int, default=4, help="DNS clients (default: 4)")
+    parser.add_argument("--http", type=int, default=4, help="HTTP clients (default: 4)")
+    parser.add_argument("--stalled", type=int, default=2, help="Clients that send half a request and stall (default: 2)")
+    parser.add_argument("--interval", type=int, default=100, metavar="MS", help="Each client's pause between probes (default: 100)")
+    parser.add_argument("--timeout", type=int, default=2000, metavar="MS", help="Give up on a probe after this long (default: 2000)")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS, help="Pages the HTTP clients cycle through")
+    parser.add_argument("--dns-port", type=int, help="DNS port (default: 53 on a board, 5353 locally)")
+    parser.add_argument("--http-port", type=int, default=80, help="HTTP port (default: 80)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    if args.dns_port is None:
+        args.dns_port = 53 if args.board else 5353
+
+    probes = Probes(args)
+    server = run_board(args, probes) if args.board else run_local(args, probes)
+    report = {
+        "target": args.board or "local portal (host shims)",
+        "seconds": args.seconds,
+        "clients": {"dns": args.dns, "http": args.http, "stalled": args.stalled},
+        "probes": probes.report(),
+        "server": server,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Run the real main.py loop headless on the host at accelerated time
+
+main() from main.py (boot, then the supervised tasks) runs on the
+uasyncio shim with a virtual clock, so a simulated day takes seconds to
+minutes. WiFi, watchdog, LED and display are shims; HTTP requests go to
+synthetic feeds or to recorded ones (--feeds) with simulated latency, or
+to a running mock_upstream.py (--upstream) with real latency.
+
+Reports upstream request counts, parse time, Python heap high-water mark
+and frame counts, so two configs (or two versions of the code) can be
+compared on the same inputs.
+
+Usage:
+    python host/run_headless.py --hours 24
+    python host/run_headless.py --hours 2 --set RENDER_FPS=20 --set ENABLE_WEATHER=True
+    python host/run_headless.py --feeds recordings/ --log board.log --json
+    python host/run_headless.py --hours 1 --upstream http://localhost:8080
+"""
+
+import argparse
+import ast
+import calendar
+import contextlib
+import io
+import json
+import os
+import socket
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import emulator
+import feeds
+
+# Config every run starts from (on top of config.example.py)
+HOST_CONFIG = {
+    "METRA_API_TOKEN": "host",
+    "CTA_API_KEY": "host",
+}
+
+class Counter:
+    """count/total/max accumulator"""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def as_dict(self, digits=2):
+        avg = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "total": round(self.total, digits),
+                "avg": round(avg, digits), "max": round(self.max, digits)}
+
+class Transport:
+    """urequests handler: routes board requests to a feed source.
+
+    Each request costs `latency_ms` of virtual time (the board blocks for
+    the whole request), or the measured wall time for sources that really
+    go over the network. A latency longer than the request's `timeout`
+    costs the timeout and fails, as the socket would on the board. Every
+    `fail_every`-th request fails.
+    """
+
+    def __init__(self, source, clock, latency_ms=300, fail_every=0):
+        self.source = source
+        self.clock = clock
+        self.latency_ms = latency_ms
+        self.fail_every = fail_every
+        self.requests = {}
+        self.json_ms = Counter()
+        self.total = 0
+
+    def __call__(self, method, url, **kwargs):
+        import urequests
+        self.total += 1
+        name = feeds.endpoint_for(url) or "other"
+        stats = self.requests.setdefault(name, {"requests": 0, "bytes": 0, "errors": 0})
+        stats["requests"] += 1
+        if not getattr(self.source, "measured", False):
+            timeout_ms = kwargs.get("timeout", 0) * 1000
+            if timeout_ms and self.latency_ms > timeout_ms:
+                self.clock.advance(timeout_ms)
+                stats["errors"] += 1
+                raise OSError(110, "ETIMEDOUT")
+            self.clock.advance(self.latency_ms)
+        if self.fail_every and self.total % self.fail_every == 0:
+            stats["errors"] += 1
+            raise OSError(110, "ETIMEDOUT (simulated)")
+        if name == "other":
+            stats["errors"] += 1
+            return urequests.Response(404, b"")
+        start = time.perf_counter()
+        try:
+            status, body = self.source.response(name, url, self.clock.time())
+        except OSError:
+            stats["errors"] += 1
+            raise
+        finally:
+            if getattr(self.source, "measured", False):
+                self.clock.advance((time.perf_counter() - start) * 1000)
+        stats["bytes"] += len(body)
+        if status != 200:
+            stats["errors"] += 1
+        return TimedResponse(self, status, body)
+
+def _response_class():
+    import urequests
+
+    class TimedResponse(urequests.Response):
+        """Response whose .json() parse time is recorded"""
+        def __init__(self, transport, status, body):
+            super().__init__(status, body)
+            self.transport = transport
+
+        def json(self):
+            start = time.perf_counter()
+            try:
+                return super().json()
+            finally:
+                self.transport.json_ms.add((time.perf_counter() - start) * 1000)
+
+    return TimedResponse
+
+TimedResponse = None
+
+def timed(func, counter):
+    """Wrap func so each call's wall time (ms) goes into counter"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counter.add((time.perf_counter() - start) * 1000)
+    return wrapper
+
+def parse_value(text):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+def parse_start(text):
+    return calendar.timegm(time.strptime(text, "%Y-%m-%dT%H:%M:%S"))
+
+def run(args, tasks=()):
+    """Run the board per args; each of `tasks` (called with the board
+    module and the clock) returns a coroutine to run alongside it"""
+    global TimedResponse
+    emulator.install_shims()
+    import vclock
+    import interstate75
+
+    if args.upstream:
+        source = feeds.HttpFeeds(args.upstream)
+    elif args.feeds:
+        source = feeds.open_recordings(args.feeds)
+    else:
+        source = feeds.SyntheticFeeds()
+    start = parse_start(args.start) if args.start else (source.start_time() or parse_start("2026-01-15T12:00:00"))
+    clock = vclock.install(start)
+    interstate75.Interstate75.RASTER = args.raster
+
+    config = dict(HOST_CONFIG)
+    for item in args.set:
+        key, _, value = item.partition("=")
+        config[key] = parse_value(value)
+
+    log = open(args.log, "w") if args.log else (sys.stdout if args.verbose else io.StringIO())
+    tracemalloc.start()
+    wall_start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        board = emulator.load_main(quiet=False, **config)
+    boot_heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+
+    # Upstream: HTTP through the feed source, DNS answered locally
+    import urequests
+    TimedResponse = _response_class()
+    transport = Transport(source, clock, args.latency, args.fail_every)
+    urequests.handler = transport
+
+    def resolve(host, port, *args):
+        clock.advance(20)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", port))]
+    board.dns_cache._real_getaddrinfo = resolve
+
+    parse = {"metra_trips": Counter(), "metra_alerts": Counter()}
+    board.parse_gtfs_protobuf = timed(board.parse_gtfs_protobuf, parse["metra_trips"])
+    board.parse_gtfs_alerts_protobuf = timed(board.parse_gtfs_alerts_protobuf, parse["metra_alerts"])
+
+    if args.dump:
+        os.makedirs(args.dump, exist_ok=True)
+
+    import uasyncio
+    duration_ms = int(args.hours * 3600 * 1000)
+    outcome = "completed"
+    try:
+        with contextlib.redirect_stdout(log):
+            if args.dump:
+                # Save what the panel shows every --dump-every minutes
+                async def dumper():
+                    n = 0
+                    while True:
+                        await uasyncio.sleep(args.dump_every * 60)
+                        n += 1
+                        board.i75.save(os.path.join(args.dump, f"t{n:04d}.png"))
+                uasyncio.create_task(dumper())
+            for task in tasks:
+                uasyncio.create_task(task(board, clock))
+            uasyncio.run_for(board.main(), duration_ms)
+    except SystemExit as e:
+        outcome = f"stopped: {e}"
+    wall = time.perf_counter() - wall_start
+    heap_current, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if args.log:
+        log.close()
+
+    simulated_s = clock.elapsed_ms() / 1000
+    parse["cta_json"] = transport.json_ms
+    snap = board.display_state.read()
+    return {
+        "outcome": outcome,
+        "config": {k: v for k, v in config.items() if k not in HOST_CONFIG},
+        "simulated_hours": round(simulated_s / 3600, 2),
+        "wall_seconds": round(wall, 2),
+        "speedup": int(simulated_s / wall) if wall else 0,
+        "scheduler_steps": uasyncio.steps,
+        "requests": transport.requests,
+        "parse_ms": {name: c.as_dict() for name, c in parse.items()},
+        "heap": {
+            "boot_kb": boot_heap // 1024,
+            "peak_kb": heap_peak // 1024,
+            "end_kb": heap_current // 1024,
+        },
+        "frames": {
+            "render_frames": board.render_stats["frames"],
+            "render_overruns": board.get_render_stats()["overruns"],
+            "panel_pushes": board.i75.frames,
+            "draw_calls": sum(board.display.calls.values()),
+            "scene": board.scene.get_stats(),
+        },
+        "dns": board.dns_cache.get_stats(),
+        "watchdog": watchdog_report(board),
+        "final": {
+            "inbound": len(snap.line1_inbound),
+            "outbound": len(snap.line1_outbound),
+            "alerts": len(snap.active_alerts),
+            "wifi_connected": snap.wifi_connected,
+        },
+    }
+
+def watchdog_report(board):
+    """Supervisor feed counts plus how the shim WDT saw them (None when off)"""
+    wdt = board.supervisor.wdt
+    if wdt is None:
+        return None
+    stats = board.supervisor.get_watchdog_stats()
+    gap = wdt.gap_ms()
+    stats["max_gap_ms"] = max(wdt.max_gap_ms, gap)
+    stats["resets"] = wdt.resets + (1 if gap > wdt.timeout else 0)  # The board would have rebooted
+    return stats
+
+def print_report(report):
+    print(f"{report['outcome']}: {report['simulated_hours']}h simulated in "
+          f"{report['wall_seconds']}s ({report['speedup']}x), {report['scheduler_steps']} task steps")
+    if report["config"]:
+        print("config: " + ", ".join(f"{k}={v!r}" for k, v in report["config"].items()))
+    print("\nrequests:")
+    for name, stats in sorted(report["requests"].items()):
+        print(f"  {name:<18} {stats['requests']:>6}  {stats['bytes'] / 1024:>9.0f} KB  {stats['errors']:>4} errors")
+    print("\nparse (host ms):")
+    for name, stats in report["parse_ms"].items():
+        print(f"  {name:<18} {stats['count']:>6} calls  avg {stats['avg']:>7.2f}  max {stats['max']:>7.2f}")
+    heap = report["heap"]
+    print(f"\nheap (Python allocations): boot {heap['boot_kb']} KB, peak {heap['peak_kb']} KB, end {heap['end_kb']} KB")
+    frames = report["frames"]
+    scene = frames["scene"]
+    print(f"frames: {frames['render_frames']} rendered, {frames['render_overruns']} overruns, "
+          f"{frames['panel_pushes']} panel pushes, {scene['frames_skipped']} skipped, "
+          f"{frames['draw_calls']} draw calls")
+    watchdog = report["watchdog"]
+    if watchdog:
+        print(f"watchdog: {watchdog['feeds']} feeds, {watchdog['withheld']} withheld, "
+              f"longest gap {watchdog['max_gap_ms']} ms, {watchdog['resets']} resets")
+    final = report["final"]
+    print(f"final: {final['inbound']} inbound / {final['outbound']} outbound trains, "
+          f"{final['alerts']} alerts, wifi {'up' if final['wifi_connected'] else 'down'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run main.py headless at accelerated time")
+    parser.add_argument("--hours", type=float, default=24, help="Simulated hours to run (default: 24)")
+    parser.add_argument("--start", help="Board UTC start time, YYYY-MM-DDTHH:MM:SS (default: first recording or 2026-01-15T12:00:00)")
+    parser.add_argument("--feeds", metavar="DIR", help="Replay recorded feeds (capture directory or feed_archive.py archive)")
+    parser.add_argument("--upstream", metavar="URL", help="Fetch from a running mock_upstream.py instead")
+    parser.add_argument("--latency", type=int, default=300, help="Simulated ms per HTTP request (default: 300; ignored with --upstream)")
+    parser.add_argument("--fail-every", type=int, default=0, metavar="N", help="Fail every Nth request")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Override a config value")
+    parser.add_argument("--raster", action="store_true", help="Rasterize frames (slower; implied by --dump)")
+    parser.add_argument("--dump", metavar="DIR", help="Save the panel as PNG periodically")
+    parser.add_argument("--dump-every", type=float, default=30, metavar="MIN", help="Minutes between dumps (default: 30)")
+    parser.add_argument("--log", metavar="FILE", help="Write the board's output to FILE")
+    parser.add_argument("--verbose", action="store_true", help="Show the board's output")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    if args.dump:
+        args.raster = True
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# Interstate 75 Emulator for CPython
+# Stands in for Pimoroni's interstate75 module: the PicoGraphics calls the
+# board code uses draw into a NumPy framebuffer that can be saved as PNG/PPM
+
+import struct
+import zlib
+
+import numpy as np
+
+# The real constants are opaque ints; here they carry the panel size
+DISPLAY_INTERSTATE75_32X32 = (32, 32)
+DISPLAY_INTERSTATE75_64X32 = (64, 32)
+DISPLAY_INTERSTATE75_96X32 = (96, 32)
+DISPLAY_INTERSTATE75_128X32 = (128, 32)
+DISPLAY_INTERSTATE75_64X64 = (64, 64)
+DISPLAY_INTERSTATE75_128X64 = (128, 64)
+
+SWITCH_A = 0
+SWITCH_B = 1
+
+# Classic 5x7 font, one byte per column (LSB at the top), for chr(32)-chr(126)
+# Glyphs advance 6px, like the board font main.py lays text out for
+_FONT_5X7 = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12"
+    "2313086462" "3649552250" "0005030000" "001c224100" "0041221c00"
+    "082a1c2a08" "08083e0808" "0050300000" "0808080808" "0060600000"
+    "2010080402" "3e5149453e" "00427f4000" "4261514946" "2141454b31"
+    "1814127f10" "2745454539" "3c4a494930" "0171090503" "3649494936"
+    "064949291e" "0036360000" "0056360000" "0008142241" "1414141414"
+    "4122140800" "0201510906" "324979413e" "7e1111117e" "7f49494936"
+    "3e41414122" "7f4141221c" "7f49494941" "7f09090101" "3e41415132"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040"
+    "7f0204027f" "7f0408107f" "3e4141413e" "7f09090906" "3e4151215e"
+    "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f"
+    "7f2018207f" "6314081463" "0304780403" "6151494543" "00007f4141"
+    "0204081020" "41417f0000" "0402010204" "4040404040" "0001020400"
+    "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418"
+    "087e090102" "081454543c" "7f08040478" "00447d4000" "2040443d00"
+    "007f102844" "00417f4000" "7c04180478" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020"
+    "3c4040207c" "1c2040201c" "3c4030403c" "4428102844" "0c5050503c"
+    "4464544c44" "0008364100" "00007f0000" "0041360800" "1008081008"
+)
+FONT_WIDTH = 5
+FONT_HEIGHT = 7
+FONT_ADVANCE = 6
+LINE_HEIGHT = 8
+
+def _glyph(ch):
+    """Column bytes for a character, or None if the font doesn't have it"""
+    code = ord(ch)
+    if 32 <= code <= 126:
+        start = (code - 32) * FONT_WIDTH
+        return _FONT_5X7[start:start + FONT_WIDTH]
+    return None
+
+class PicoGraphics:
+    """The subset of PicoGraphics the board code uses, drawing into self.buffer.
+
+    Every call is counted in self.calls so benchmarks can report draw
+    calls per frame. With raster=False calls are only counted, which is
+    much faster for long headless runs.
+    """
+
+    def __init__(self, width, height, raster=True):
+        self.width = width
+        self.height = height
+        self.raster = raster
+        self.buffer = np.zeros((height, width, 3), dtype=np.uint8)
+        self.palette = []
+        self.pen = (0, 0, 0)
+        self.clip = (0, 0, width, height)
+        self.backlight = 1.0
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def reset_calls(self):
+        """Zero the draw call counters"""
+        self.calls = {}
+
+    def get_bounds(self):
+        self._count("get_bounds")
+        return self.width, self.height
+
+    def create_pen(self, r, g, b):
+        self._count("create_pen")
+        self.palette.append((r & 0xFF, g & 0xFF, b & 0xFF))
+        return len(self.palette) - 1
+
+    def set_pen(self, pen):
+        self._count("set_pen")
+        self.pen = self.palette[pen]
+
+    def set_font(self, font):
+        self._count("set_font")
+
+    def set_backlight(self, brightness):
+        self._count("set_backlight")
+        self.backlight = brightness
+
+    def set_clip(self, x, y, w, h):
+        self._count("set_clip")
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = min(self.width, x + w)
+        y1 = min(self.height, y + h)
+        self.clip = (x0, y0, max(0, x1 - x0), max(0, y1 - y0))
+
+    def remove_clip(self):
+        self._count("remove_clip")
+        self.clip = (0, 0, self.width, self.height)
+
+    def _fill(self, x, y, w, h):
+        """Fill a rectangle with the current pen, clipped"""
+        if not self.raster:
+            return
+        cx, cy, cw, ch = self.clip
+        x0 = max(x, cx)
+        y0 = max(y, cy)
+        x1 = min(x + w, cx + cw)
+        y1 = min(y + h, cy + ch)
+        if x0 < x1 and y0 < y1:
+            self.buffer[y0:y1, x0:x1] = self.pen
+
+    def clear(self):
+        self._count("clear")
+        self._fill(*self.clip)
+
+    def pixel(self, x, y):
+        self._count("pixel")
+        self._fill(x, y, 1, 1)
+
+    def pixel_span(self, x, y, length):
+        self._count("pixel_span")
+        self._fill(x, y, length, 1)
+
+    def rectangle(self, x, y, w, h):
+        self._count("rectangle")
+        self._fill(x, y, w, h)
+
+    def measure_text(self, text, scale=1, spacing=1, fixed_width=False):
+        self._count("measure_text")
+        return len(text) * FONT_ADVANCE * scale
+
+    def text(self, text, x, y, wordwrap=-1, scale=1, angle=0, spacing=1, fixed_width=False):
+        """Draw text with the built-in 5x7 font (angle is ignored)"""
+        self._count("text")
+        if not self.raster:
+            return
+        lines = []
+        for paragraph in str(text).split("\n"):
+            line = ""
+            for word in paragraph.split(" "):
+                candidate = word if not line else line + " " + word
+                if wordwrap > 0 and line and len(candidate) * FONT_ADVANCE * scale > wordwrap:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+
+        for row, line in enumerate(lines):
+            ly = y + row * LINE_HEIGHT * scale
+            for i, ch in enumerate(line):
+                columns = _glyph(ch)
+                if columns is None:
+                    continue
+                gx = x + i * FONT_ADVANCE * scale
+                for cx, bits in enumerate(columns):
+                    for cy in range(FONT_HEIGHT):
+                        if bits & (1 << cy):
+                            self._fill(gx + cx * scale, ly + cy * scale, scale, scale)
+
+class Interstate75:
+    """Emulated Interstate 75 W: framebuffer, status LED and buttons.
+
+    update() copies the framebuffer to self.frame (what the panel shows)
+    and, if dump_dir is set, saves every pushed frame there. Set the
+    class attribute RASTER = False before the board code creates its
+    Interstate75 to only count draw calls.
+    """
+
+    RASTER = True
+
+    def __init__(self, display=DISPLAY_INTERSTATE75_128X32, panel_type=None,
+                 stb_invert=False, color_order=None):
+        self.width, self.height = display
+        self.display = PicoGraphics(self.width, self.height, Interstate75.RASTER)
+        self.frame = self.display.buffer.copy()
+        self.frames = 0
+        self.brightness = 1.0
+        self.led = (0, 0, 0)
+        self.switches = {SWITCH_A: False, SWITCH_B: False}
+        self.dump_dir = None
+        self.dump_scale = 4
+
+    def update(self, graphics=None):
+        if self.display.raster:
+            self.frame = self.display.buffer.copy()
+        self.frames += 1
+        if self.dump_dir:
+            save_png(f"{self.dump_dir}/frame_{self.frames:05d}.png", self.frame, self.dump_scale)
+
+    def set_brightness(self, level):
+        self.brightness = level
+
+    def set_led(self, r, g, b):
+        self.led = (r, g, b)
+
+    def switch_pressed(self, switch):
+        return self.switches.get(switch, False)
+
+    def save(self, path, scale=4):
+        """Save what the panel is currently showing (.png or .ppm)"""
+        if path.endswith(".ppm"):
+            save_ppm(path, self.frame, scale)
+        else:
+            save_png(path, self.frame, scale)
+
+def _scaled(frame, scale):
+    if scale > 1:
+        frame = np.repeat(np.repeat(frame, scale, axis=0), scale, axis=1)
+    return np.ascontiguousarray(frame, dtype=np.uint8)
+
+def save_ppm(path, frame, scale=1):
+    """Write an RGB frame as a binary PPM"""
+    frame = _scaled(frame, scale)
+    height, width = frame.shape[:2]
+    with open(path, "wb") as f:
+        f.write(b"P6\n%d %d\n255\n" % (width, height))
+        f.write(frame.tobytes())
+
+def save_png(path, frame, scale=1):
+    """Write an RGB frame as a PNG (no imaging library needed)"""
+    frame = _scaled(frame, scale)
+    height, width = frame.shape[:2]
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = frame.reshape(height, width * 3)  # Filter byte 0 per row
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
@@ -0,0 +1,62 @@
+# machine module stand-in for CPython
+# Just enough of MicroPython's machine module for the board code to import and run
+
+import vclock
+
+class ResetError(SystemExit):
+    """Raised by reset() so a host run stops where the board would reboot"""
+
+def reset():
+    raise ResetError("machine.reset()")
+
+def soft_reset():
+    raise ResetError("machine.soft_reset()")
+
+def freq(hz=None):
+    return 150_000_000
+
+def unique_id():
+    return b"\x00host\x00\x00\x00"
+
+class WDT:
+    """Watchdog stand-in: records feeds, and feeds that came too late (where
+    the board would have reset), instead of resetting"""
+
+    def __init__(self, id=0, timeout=5000):
+        self.timeout = timeout
+        self.feeds = 0
+        self.resets = 0
+        self.max_gap_ms = 0
+        self.last_ms = vclock.now_ms()
+
+    def gap_ms(self):
+        return vclock.now_ms() - self.last_ms
+
+    def feed(self):
+        gap = self.gap_ms()
+        self.max_gap_ms = max(self.max_gap_ms, gap)
+        if gap > self.timeout:
+            self.resets += 1
+        self.feeds += 1
+        self.last_ms = vclock.now_ms()
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self._value = value or 0
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = v
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
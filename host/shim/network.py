@@ -0,0 +1,74 @@
+# network module stand-in for CPython
+# A WLAN interface whose state host tools set directly
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_GOT_IP = 3
+
+_hostname = "board"
+
+def hostname(name=None):
+    global _hostname
+    if name is None:
+        return _hostname
+    _hostname = name
+
+class WLAN:
+    """Emulated interface. Every WLAN(STA_IF) shares one state, like the board.
+
+    Set WLAN.connect_ok = False to make connect() fail.
+    """
+
+    connect_ok = True
+    _state = {}
+
+    def __init__(self, interface=STA_IF):
+        self.interface = interface
+        self.state = WLAN._state.setdefault(interface, {
+            "active": False,
+            "connected": False,
+            "ssid": None,
+            "config": {"essid": "", "channel": 1},
+            "ifconfig": ("0.0.0.0", "0.0.0.0", "0.0.0.0", "0.0.0.0"),
+        })
+
+    def active(self, is_active=None):
+        if is_active is None:
+            return self.state["active"]
+        self.state["active"] = bool(is_active)
+
+    def connect(self, ssid=None, key=None, **kwargs):
+        self.state["ssid"] = ssid
+        if WLAN.connect_ok:
+            self.state["connected"] = True
+            self.state["ifconfig"] = ("192.168.1.75", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+
+    def disconnect(self):
+        self.state["connected"] = False
+
+    def isconnected(self):
+        return self.state["connected"]
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -55
+        return STAT_GOT_IP if self.state["connected"] else STAT_IDLE
+
+    def ifconfig(self, config=None):
+        if config is None:
+            return self.state["ifconfig"]
+        self.state["ifconfig"] = tuple(config)
+
+    def config(self, *args, **kwargs):
+        if kwargs:
+            self.state["config"].update(kwargs)
+            return None
+        if args:
+            return self.state["config"].get(args[0])
+        return None
+
+    def scan(self):
+        return []
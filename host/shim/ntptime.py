@@ -0,0 +1,12 @@
+# ntptime stand-in for CPython
+# The host clock (or vclock) is already set, so there is nothing to sync
+
+host = "pool.ntp.org"
+timeout = 1
+
+def time():
+    import time as _time
+    return _time.time()
+
+def settime():
+    pass
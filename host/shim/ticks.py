@@ -0,0 +1,32 @@
+# MicroPython time.ticks_* for CPython
+# install() adds the tick functions board code uses to CPython's time module
+
+import time
+
+_PERIOD = 1 << 30  # MicroPython ticks wrap at 2**30 on the rp2 port
+
+def ticks_ms():
+    return int(time.monotonic() * 1000) % _PERIOD
+
+def ticks_us():
+    return int(time.monotonic() * 1000000) % _PERIOD
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) % _PERIOD
+
+def ticks_diff(end, start):
+    return ((end - start + _PERIOD // 2) % _PERIOD) - _PERIOD // 2
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
+
+def sleep_us(us):
+    time.sleep(us / 1000000)
+
+def install():
+    """Add the missing functions to the real time module (idempotent)"""
+    for name, func in (("ticks_ms", ticks_ms), ("ticks_us", ticks_us),
+                       ("ticks_add", ticks_add), ("ticks_diff", ticks_diff),
+                       ("sleep_ms", sleep_ms), ("sleep_us", sleep_us)):
+        if not hasattr(time, name):
+            setattr(time, name, func)
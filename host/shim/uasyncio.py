@@ -0,0 +1,342 @@
+# uasyncio stand-in for CPython
+# A small single-threaded scheduler with the uasyncio API the board code
+# uses. It runs on vclock.now_ms(), so with a virtual clock installed the
+# loop jumps straight to the next wake-up instead of sleeping
+
+import heapq
+import sys
+import traceback
+
+import vclock
+
+class CancelledError(BaseException):
+    pass
+
+class TimeoutError(Exception):
+    pass
+
+_queue = []   # (wake_ms, seq, token, task)
+_seq = 0
+_current = None
+
+# Number of coroutine steps run, for host tools
+steps = 0
+
+class _Sleep:
+    def __init__(self, ms):
+        self.ms = ms
+
+    def __await__(self):
+        yield self
+
+class _Park:
+    """Suspend until something reschedules the task (Event.set, task done)"""
+    def __init__(self, waitlist):
+        self.waitlist = waitlist
+
+    def __await__(self):
+        yield self
+
+class Task:
+    def __init__(self, coro):
+        self.coro = coro
+        self.done = False
+        self.data = None
+        self.exc = None
+        self.waiters = []
+        self._token = 0
+        self._throw = None
+        self.quiet = False  # Don't report an unretrieved exception
+
+    def cancel(self):
+        if self.done:
+            return False
+        self._throw = CancelledError()
+        _schedule(self, 0)
+        return True
+
+    def __await__(self):
+        if not self.done:
+            yield _Park(self.waiters)
+        if self.exc is not None:
+            raise self.exc
+        return self.data
+
+def _schedule(task, delay_ms):
+    global _seq
+    _seq += 1
+    task._token += 1
+    heapq.heappush(_queue, (vclock.now_ms() + max(0, delay_ms), _seq, task._token, task))
+
+def _finish(task, data, exc):
+    task.done = True
+    task.data = data
+    task.exc = exc
+    for waiter in task.waiters:
+        _schedule(waiter, 0)
+    if exc is not None and not task.waiters and not task.quiet and not isinstance(exc, CancelledError):
+        print("Task exception wasn't retrieved:", file=sys.stderr)
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
+    task.waiters = []
+
+def _step(task):
+    global _current, steps
+    _current = task
+    steps += 1
+    try:
+        if task._throw is not None:
+            exc, task._throw = task._throw, None
+            request = task.coro.throw(exc)
+        else:
+            request = task.coro.send(None)
+    except StopIteration as e:
+        _finish(task, e.value, None)
+    except CancelledError as e:
+        _finish(task, None, e)
+    except Exception as e:
+        _finish(task, None, e)
+    else:
+        if isinstance(request, _Sleep):
+            _schedule(task, request.ms)
+        elif isinstance(request, _Park):
+            request.waitlist.append(task)
+        else:
+            _schedule(task, 0)
+    finally:
+        _current = None
+
+def create_task(coro):
+    task = Task(coro)
+    _schedule(task, 0)
+    return task
+
+def current_task():
+    return _current
+
+def sleep_ms(ms):
+    return _Sleep(int(ms))
+
+def sleep(seconds):
+    return _Sleep(int(seconds * 1000))
+
+class Event:
+    def __init__(self):
+        self.state = False
+        self.waiting = []
+
+    def is_set(self):
+        return self.state
+
+    def set(self):
+        self.state = True
+        for task in self.waiting:
+            _schedule(task, 0)
+        self.waiting = []
+
+    def clear(self):
+        self.state = False
+
+    async def wait(self):
+        if not self.state:
+            await _Park(self.waiting)
+        return True
+
+class Lock:
+    def __init__(self):
+        self.state = False
+        self.waiting = []
+
+    def locked(self):
+        return self.state
+
+    async def acquire(self):
+        while self.state:
+            await _Park(self.waiting)
+        self.state = True
+        return True
+
+    def release(self):
+        self.state = False
+        waiting, self.waiting = self.waiting, []
+        for task in waiting:
+            _schedule(task, 0)
+
+    async def __aenter__(self):
+        return await self.acquire()
+
+    async def __aexit__(self, *args):
+        self.release()
+
+async def wait_for_ms(aw, timeout_ms):
+    task = aw if isinstance(aw, Task) else create_task(aw)
+    task.quiet = True  # Raised to the caller instead
+    if not task.done:
+        # Woken by whichever comes first: the task finishing or the deadline
+        me = _current
+        task.waiters.append(me)
+        _schedule(me, timeout_ms)
+        try:
+            await _Park([])
+        except CancelledError:
+            task.cancel()
+            raise
+        if not task.done:
+            task.waiters.remove(me)
+            task.cancel()
+            raise TimeoutError()
+    return await task
+
+async def wait_for(aw, timeout):
+    return await wait_for_ms(aw, int(timeout * 1000))
+
+async def gather(*aws, return_exceptions=False):
+    tasks = [aw if isinstance(aw, Task) else create_task(aw) for aw in aws]
+    results = []
+    for task in tasks:
+        try:
+            results.append(await task)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
+
+# ===== STREAMS =====
+# start_server() listens on an in-memory port; open_connection() (the host
+# side) connects to it, so host tools can drive the board's HTTP server
+# through the same scheduler without real sockets
+
+_servers = {}  # port -> client callback
+_clients = 0
+
+class _Pipe:
+    """One direction of a connection"""
+    def __init__(self):
+        self.buf = bytearray()
+        self.closed = False
+        self.waiting = []
+
+    def wake(self):
+        waiting, self.waiting = self.waiting, []
+        for task in waiting:
+            _schedule(task, 0)
+
+class Stream:
+    def __init__(self, rx, tx, peer):
+        self.rx = rx
+        self.tx = tx
+        self.peer = peer
+
+    def get_extra_info(self, name):
+        return self.peer if name == "peername" else None
+
+    async def _fill(self, ready):
+        while not ready() and not self.rx.closed:
+            await _Park(self.rx.waiting)
+
+    def _take(self, n):
+        data = bytes(self.rx.buf[:n])
+        del self.rx.buf[:n]
+        return data
+
+    async def read(self, n=-1):
+        if n < 0:
+            await self._fill(lambda: False)
+            return self._take(len(self.rx.buf))
+        await self._fill(lambda: len(self.rx.buf) > 0)
+        return self._take(n)
+
+    async def readline(self):
+        await self._fill(lambda: b"\n" in self.rx.buf)
+        end = self.rx.buf.find(b"\n")
+        return self._take(end + 1 if end >= 0 else len(self.rx.buf))
+
+    async def readexactly(self, n):
+        await self._fill(lambda: len(self.rx.buf) >= n)
+        if len(self.rx.buf) < n:
+            raise EOFError()
+        return self._take(n)
+
+    def write(self, data):
+        if self.tx.closed:
+            raise OSError(104, "ECONNRESET")
+        self.tx.buf += data
+        self.tx.wake()
+
+    async def drain(self):
+        await _Sleep(0)
+
+    def close(self):
+        self.tx.closed = True
+        self.tx.wake()
+        self.rx.closed = True
+
+    async def wait_closed(self):
+        pass
+
+class Server:
+    def __init__(self, port):
+        self.port = port
+
+    def close(self):
+        _servers.pop(self.port, None)
+
+    async def wait_closed(self):
+        pass
+
+async def start_server(callback, host, port, backlog=5):
+    if port in _servers:
+        raise OSError(98, "EADDRINUSE")
+    _servers[port] = callback
+    return Server(port)
+
+async def open_connection(host, port, local_addr=None):
+    """Connect to a start_server() port; returns (reader, writer) like uasyncio.
+
+    Each connection gets its own client address unless local_addr is given.
+    """
+    global _clients
+    callback = _servers.get(port)
+    if callback is None:
+        raise OSError(111, "ECONNREFUSED")
+    _clients += 1
+    peer = local_addr or ("10.0.%d.%d" % (_clients // 250 % 250, _clients % 250 + 2), 40000 + _clients % 20000)
+    up = _Pipe()
+    down = _Pipe()
+    client = Stream(down, up, (host, port))
+    server = Stream(up, down, peer)
+    create_task(callback(server, server))
+    return client, client
+
+def run_for(coro, duration_ms=None):
+    """Run coro until it finishes or duration_ms of (virtual) time passes.
+
+    Host-only extension: returns the main Task so callers can check
+    whether it finished. Other tasks are left where they are.
+    """
+    main = create_task(coro)
+    main.quiet = True  # Raised to the caller instead
+    end = None if duration_ms is None else vclock.now_ms() + duration_ms
+    while _queue and not main.done:
+        wake, _, token, task = _queue[0]
+        if end is not None and wake > end:
+            vclock.wait_until(end)
+            break
+        heapq.heappop(_queue)
+        if token != task._token or task.done:
+            continue
+        vclock.wait_until(wake)
+        _step(task)
+    if main.done and main.exc is not None:
+        raise main.exc
+    return main
+
+def run(coro):
+    task = run_for(coro)
+    return task.data
+
+def new_event_loop():
+    """Drop every scheduled task and listening port (fresh loop)"""
+    global _queue
+    _queue = []
+    _servers.clear()
@@ -0,0 +1,39 @@
+# urequests stand-in for CPython
+# Requests go to a handler host tools install; by default there is no network
+
+import socket  # dns_cache.install() wraps this, like on the board
+
+class Response:
+    def __init__(self, status_code=200, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        import json
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+def _offline(method, url, **kwargs):
+    raise OSError(113, "EHOSTUNREACH (host shim has no network)")
+
+# handler(method, url, **kwargs) -> Response
+handler = _offline
+
+def request(method, url, data=None, json=None, headers=None, **kwargs):
+    return handler(method, url, data=data, json=json, headers=headers or {}, **kwargs)
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+def head(url, **kwargs):
+    return request("HEAD", url, **kwargs)
@@ -0,0 +1,119 @@
+# Virtual Clock for CPython
+# Replaces the time functions board code uses with a clock that only moves
+# when something sleeps (or a shim charges simulated latency), so a day of
+# board time can run in seconds
+
+import calendar
+import time
+
+_PERIOD = 1 << 30  # MicroPython ticks wrap at 2**30 on the rp2 port
+
+# Real functions, for host tools that need wall-clock time while installed
+real_time = time.time
+real_sleep = time.sleep
+real_monotonic = time.monotonic
+real_gmtime = time.gmtime
+
+class VirtualClock:
+    """Board time as integer microseconds since the Unix epoch (UTC)"""
+
+    def __init__(self, start=0):
+        self.us = int(start * 1000000)
+        self.start_us = self.us
+        self.slept_us = 0  # Time spent in blocking sleeps
+
+    @property
+    def ms(self):
+        return self.us // 1000
+
+    def elapsed_ms(self):
+        return (self.us - self.start_us) // 1000
+
+    def advance(self, ms):
+        """Move time forward by ms (e.g. simulated network latency)"""
+        if ms > 0:
+            self.us += int(ms * 1000)
+
+    def advance_to(self, ms):
+        """Move time forward to an absolute ms timestamp (never backwards)"""
+        if ms * 1000 > self.us:
+            self.us = int(ms * 1000)
+
+    # MicroPython time API
+
+    def time(self):
+        return self.us // 1000000
+
+    def time_ns(self):
+        return self.us * 1000
+
+    def ticks_ms(self):
+        return (self.us // 1000) % _PERIOD
+
+    def ticks_us(self):
+        return self.us % _PERIOD
+
+    def ticks_cpu(self):
+        return self.us % _PERIOD
+
+    def sleep(self, seconds):
+        self.slept_us += int(seconds * 1000000)
+        self.advance(seconds * 1000)
+
+    def sleep_ms(self, ms):
+        self.slept_us += int(ms * 1000)
+        self.advance(ms)
+
+    def sleep_us(self, us):
+        self.slept_us += int(us)
+        self.us += int(us)
+
+    def gmtime(self, secs=None):
+        """8-tuple like MicroPython's (the board runs on UTC)"""
+        t = real_gmtime(self.time() if secs is None else secs)
+        return (t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec, t.tm_wday, t.tm_yday)
+
+    def mktime(self, t):
+        return calendar.timegm(tuple(t[:6]) + (0, 0, 0))
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) % _PERIOD
+
+def ticks_diff(end, start):
+    return ((end - start + _PERIOD // 2) % _PERIOD) - _PERIOD // 2
+
+clock = None
+
+def install(start=None):
+    """Point the time module at a new virtual clock starting at `start` (Unix seconds)"""
+    global clock
+    clock = VirtualClock(real_time() if start is None else start)
+    time.time = clock.time
+    time.time_ns = clock.time_ns
+    time.ticks_ms = clock.ticks_ms
+    time.ticks_us = clock.ticks_us
+    time.ticks_cpu = clock.ticks_cpu
+    time.ticks_add = ticks_add
+    time.ticks_diff = ticks_diff
+    time.sleep = clock.sleep
+    time.sleep_ms = clock.sleep_ms
+    time.sleep_us = clock.sleep_us
+    time.gmtime = clock.gmtime
+    time.localtime = clock.gmtime
+    time.mktime = clock.mktime
+    return clock
+
+def now_ms():
+    """Current ms for schedulers: virtual when installed, otherwise real"""
+    if clock is not None:
+        return clock.ms
+    return int(real_monotonic() * 1000)
+
+def wait_until(ms):
+    """Block until now_ms() >= ms (instantly, when virtual)"""
+    if clock is not None:
+        clock.advance_to(ms)
+        return
+    delay = ms - now_ms()
+    if delay > 0:
+        real_sleep(delay / 1000)
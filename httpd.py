@@ -0,0 +1,446 @@
+# HTTP Server for Chicago Transit Board
+# Small HTTP/1.1 server on uasyncio streams: each client is its own task,
+# the request line, headers and Content-Length body are read as they
+# arrive, and responses are written (and drained) a chunk at a time.
+# EventHub pushes Server-Sent Events over the same connections.
+
+import json
+import time
+import uasyncio
+import log
+
+MAX_HEADERS = 32            # Header lines before the request is refused
+MAX_HEAD = 2048             # Request line + headers (bytes)
+MAX_BODY = 8192             # Largest Content-Length accepted (bytes)
+READ_TIMEOUT_MS = 5000      # To receive the whole request
+WRITE_TIMEOUT_MS = 10000    # A client that takes longer to accept one chunk is dropped
+
+# Admission control: connections over these limits get an immediate 503
+MAX_INFLIGHT = 4            # Requests being served at once (event streams not counted)
+RATE_PER_S = 5              # Sustained requests per second per client address
+RATE_BURST = 10             # Requests a client may make back to back
+TRACKED_CLIENTS = 16        # Client addresses remembered for rate limiting
+BUSY_RETRY_S = 2            # Retry-After when the server is full
+PRIORITY_GUARD_MS = 20      # Wait for a priority task due within this long
+
+STATUS = {
+    200: "OK",
+    202: "Accepted",
+    204: "No Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+class HttpError(Exception):
+    """Raised while reading a request; answered with `status` and an empty body"""
+
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+class Request:
+    def __init__(self, method, path, query, headers, body, remote):
+        self.method = method
+        self.path = path
+        self.query = query      # Raw query string (after "?"), "" if none
+        self.headers = headers  # Lower-case names
+        self.body = body        # bytes
+        self.remote = remote    # Client IP, or None
+
+class Response:
+    """Writes one response to a client stream.
+
+    start() sends the status line and headers; write() sends body chunks,
+    draining after each so a large body never sits in RAM all at once and
+    other tasks run while the client reads it.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.status = None
+        self.bytes = 0
+        self.writing_since = None  # ticks_ms() while a drain is in progress
+        self.streaming = False     # Long-lived (event stream): not counted as in flight
+
+    async def start(self, status=200, content_type="text/html", headers="", length=None):
+        """Status line and headers; `headers` is preformatted "Name: value\\r\\n" lines"""
+        self.status = status
+        head = "HTTP/1.1 %d %s\r\n" % (status, STATUS.get(status, ""))
+        if content_type:
+            head += "Content-Type: %s\r\n" % content_type
+        if length is not None:
+            head += "Content-Length: %d\r\n" % length
+        await self.write(head + headers + "Connection: close\r\n\r\n")
+
+    async def write(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.writing_since = time.ticks_ms()
+        self.writer.write(data)
+        await self.writer.drain()
+        self.writing_since = None
+        self.bytes += len(data)
+
+    async def stream(self, chunks):
+        """Write every chunk from an iterator (e.g. a generator)"""
+        for chunk in chunks:
+            await self.write(chunk)
+
+    async def send(self, body, status=200, content_type="text/html", headers=""):
+        """Whole response with a Content-Length"""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        await self.start(status, content_type, headers, len(body))
+        if body:
+            await self.write(body)
+
+    async def json(self, data, status=200, headers=""):
+        await self.send(json.dumps(data), status, "application/json", headers)
+
+class LimitedReader:
+    """Line reader over a stream that stops after `limit` bytes.
+
+    Reads in small chunks instead of the stream's readline(), so a client
+    sending an endless header line costs at most `limit` bytes of RAM.
+    """
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.left = limit
+        self.buf = b""
+
+    async def readline(self):
+        while True:
+            end = self.buf.find(b"\n")
+            if end >= 0:
+                line = self.buf[:end + 1]
+                self.buf = self.buf[end + 1:]
+                return line
+            if self.left <= 0:
+                raise HttpError(431)
+            chunk = await self.stream.read(min(256, self.left))
+            if not chunk:
+                line, self.buf = self.buf, b""
+                return line
+            self.left -= len(chunk)
+            self.buf += chunk
+
+    async def readexactly(self, n):
+        while len(self.buf) < n:
+            chunk = await self.stream.read(n - len(self.buf))
+            if not chunk:
+                raise EOFError()
+            self.buf += chunk
+        data = self.buf[:n]
+        self.buf = self.buf[n:]
+        return data
+
+async def read_request(stream, remote=None, max_body=MAX_BODY, max_head=MAX_HEAD):
+    """Parse one request from the stream; None if the client sent nothing"""
+    reader = LimitedReader(stream, max_head)
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("utf-8").split()
+    if len(parts) != 3:
+        raise HttpError(400)
+    method, target = parts[0], parts[1]
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line or line == b"\r\n" or line == b"\n":
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HttpError(431)
+        name, _, value = line.decode("utf-8").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HttpError(400)
+    if length > max_body:
+        raise HttpError(413)
+    body = b""
+    if length > 0:
+        body = await reader.readexactly(length)
+
+    path, _, query = target.partition("?")
+    return Request(method, path, query, headers, body, remote)
+
+def etag_matches(request, etag):
+    """True if the client's If-None-Match already names etag (answer 304)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag == etag or tag == "W/" + etag:
+            return True
+    return False
+
+class Server:
+    """Serves handler(request, response) for every connection on `port`.
+
+    Clients are served concurrently, each in its own task, so a slow
+    client only ever waits on its own socket. Responses may run as long
+    as they keep writing (event streams); a client that stops reading
+    for WRITE_TIMEOUT_MS is dropped.
+
+    Before anything is read, a connection must fit under max_inflight and
+    its address under the per-client rate (rate_per_s, with bursts of
+    rate_burst); otherwise it gets a bare 503 with Retry-After. If
+    `priority` is set, it returns the ms until a more important task (the
+    render task) is due, and handlers wait until just after it runs.
+    """
+
+    def __init__(self, handler, port=80, max_body=MAX_BODY, max_inflight=MAX_INFLIGHT,
+                 rate_per_s=RATE_PER_S, rate_burst=RATE_BURST):
+        self.handler = handler
+        self.port = port
+        self.max_body = max_body
+        self.max_inflight = max_inflight
+        self.interval_ms = 1000 // max(1, rate_per_s)
+        self.tolerance_ms = self.interval_ms * (rate_burst - 1)
+        self.priority = None
+        self.server = None
+        self.requests = 0   # Served (handler ran)
+        self.errors = 0     # Handler exceptions and dropped connections
+        self.timeouts = 0
+        self.rejected_busy = 0    # Over max_inflight
+        self.rejected_rate = 0    # Client over its rate
+        self.rejected_size = 0    # Request head or body too large (431/413)
+        self.deferred = 0   # Requests that waited for the priority task
+        self.active = 0
+        self.max_active = 0
+        self.bytes_sent = 0
+        self._clients = {}  # Address -> ticks_ms() its next request is allowed from (GCRA)
+        self._responses = []  # (task, Response) being served
+        self._reaper = None
+
+    async def start(self, host="0.0.0.0", backlog=5):
+        self.server = await uasyncio.start_server(self._client, host, self.port, backlog)
+        self._reaper = uasyncio.create_task(self._reap())
+        return self
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+    async def _reap(self):
+        """Cancel responses stuck writing to a client that stopped reading"""
+        while True:
+            await uasyncio.sleep_ms(1000)
+            now = time.ticks_ms()
+            for task, response in self._responses:
+                since = response.writing_since
+                if since is not None and time.ticks_diff(now, since) > WRITE_TIMEOUT_MS:
+                    self.timeouts += 1
+                    response.writing_since = None
+                    task.cancel()
+
+    def _inflight(self):
+        count = 0
+        for _, response in self._responses:
+            if not response.streaming:
+                count += 1
+        return count
+
+    def _rate_wait_ms(self, remote):
+        """0 if `remote` may make a request now (and charge it), else ms to wait"""
+        if remote is None:
+            return 0
+        now = time.ticks_ms()
+        clients = self._clients
+        allowed = clients.get(remote)
+        if allowed is None or time.ticks_diff(allowed, now) < 0:
+            allowed = now
+        wait = time.ticks_diff(allowed, now) - self.tolerance_ms
+        if wait > 0:
+            return wait
+        if remote not in clients and len(clients) >= TRACKED_CLIENTS:
+            # Forget clients that are back to a full burst, or else the oldest
+            for address in list(clients):
+                if time.ticks_diff(clients[address], now) <= 0:
+                    del clients[address]
+            if len(clients) >= TRACKED_CLIENTS:
+                del clients[next(iter(clients))]
+        clients[remote] = time.ticks_add(allowed, self.interval_ms)
+        return 0
+
+    async def _client(self, reader, writer):
+        self.active += 1
+        if self.active > self.max_active:
+            self.max_active = self.active
+        response = Response(writer)
+        entry = (uasyncio.current_task(), response)
+        try:
+            peer = writer.get_extra_info("peername")
+            remote = peer[0] if peer else None
+
+            # Admission: refuse before reading anything
+            retry = 0
+            if self._inflight() >= self.max_inflight:
+                self.rejected_busy += 1
+                retry = BUSY_RETRY_S
+            else:
+                wait = self._rate_wait_ms(remote)
+                if wait:
+                    self.rejected_rate += 1
+                    retry = (wait + 999) // 1000
+            self._responses.append(entry)
+            if retry:
+                await response.send(b"", 503, None, "Retry-After: %d\r\n" % retry)
+                return
+
+            try:
+                request = await uasyncio.wait_for_ms(read_request(reader, remote, self.max_body), READ_TIMEOUT_MS)
+            except uasyncio.TimeoutError:
+                self.timeouts += 1
+                return
+            except HttpError as e:
+                if e.status in (413, 431):
+                    self.rejected_size += 1
+                await response.send(b"", e.status)
+                return
+            except EOFError:
+                return  # Client hung up mid-request
+            if request is None:
+                return
+
+            if self.priority is not None:
+                due = self.priority()
+                if due is not None and due < PRIORITY_GUARD_MS:
+                    self.deferred += 1
+                    await uasyncio.sleep_ms(max(0, due) + 1)
+            self.requests += 1
+            await self.handler(request, response)
+        except OSError as e:
+            self.errors += 1
+            log.debug("Client dropped: %s", e)  # Reset, timed out or hung up
+        except Exception as e:
+            self.errors += 1
+            log.error("Web error: %s", e)
+            if response.status is None:
+                try:
+                    await response.send(b"", 500)
+                except Exception:
+                    pass
+        finally:
+            if entry in self._responses:
+                self._responses.remove(entry)
+            self.bytes_sent += response.bytes
+            self.active -= 1
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def get_stats(self):
+        return {
+            "port": self.port,
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "rejected": {"busy": self.rejected_busy, "rate": self.rejected_rate, "size": self.rejected_size},
+            "deferred": self.deferred,
+            "active": self.active,
+            "max_active": self.max_active,
+            "bytes_sent": self.bytes_sent,
+        }
+
+class EventHub:
+    """Server-Sent Events fan-out.
+
+    Each topic holds a dict of state. publish() records which keys changed,
+    and every subscriber is sent just those keys ("event: <topic>" with a
+    JSON object to merge into what it has). A new subscriber, or one that
+    fell more than one change behind, gets the topic's whole state instead.
+    Nothing is sent while nothing changes, apart from a comment line every
+    keepalive_ms so dead connections are noticed.
+    """
+
+    def __init__(self, max_subscribers=3, keepalive_ms=25000):
+        self.max_subscribers = max_subscribers
+        self.keepalive_ms = keepalive_ms
+        self.topics = {}    # name -> [version, state, JSON of the last change]
+        self.seq = 0        # Total changes published
+        self.subscribers = 0
+        self.rejected = 0   # Subscribers turned away at the cap
+        self.events = 0     # Events written to subscribers
+        self._changed = uasyncio.Event()
+
+    def publish(self, topic, state):
+        """Set a topic's state; returns True if any key changed"""
+        entry = self.topics.get(topic)
+        if entry is None:
+            self.topics[topic] = [1, dict(state), json.dumps(state)]
+        else:
+            old = entry[1]
+            delta = {}
+            for key, value in state.items():
+                if key not in old or old[key] != value:
+                    delta[key] = value
+            if not delta:
+                return False
+            old.update(delta)
+            entry[0] += 1
+            entry[2] = json.dumps(delta)
+        self.seq += 1
+        self._changed.set()
+        self._changed.clear()  # Tasks already waiting have been woken
+        return True
+
+    async def serve(self, response, headers=""):
+        """Stream events to one client until it disconnects"""
+        if self.subscribers >= self.max_subscribers:
+            self.rejected += 1
+            await response.send("", 503, None, "Retry-After: 30\r\n" + headers)
+            return
+        self.subscribers += 1
+        response.streaming = True
+        sent = {}  # topic -> version this client has
+        try:
+            await response.start(200, "text/event-stream", "Cache-Control: no-cache\r\n" + headers)
+            await response.write("retry: 5000\n\n")
+            while True:
+                seq = self.seq
+                for name, entry in list(self.topics.items()):
+                    version = entry[0]
+                    have = sent.get(name, 0)
+                    if version == have:
+                        continue
+                    data = entry[2] if have and version == have + 1 else json.dumps(entry[1])
+                    sent[name] = version
+                    await response.write("event: %s\ndata: %s\n\n" % (name, data))
+                    self.events += 1
+                if self.seq != seq:
+                    continue  # Changed while we were writing
+                try:
+                    await uasyncio.wait_for_ms(self._changed.wait(), self.keepalive_ms)
+                except uasyncio.TimeoutError:
+                    await response.write(": keepalive\n\n")
+        finally:
+            self.subscribers -= 1
+
+    def get_stats(self):
+        return {
+            "subscribers": self.subscribers,
+            "max_subscribers": self.max_subscribers,
+            "rejected": self.rejected,
+            "events": self.events,
+            "changes": self.seq,
+        }
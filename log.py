@@ -0,0 +1,119 @@
+# Logging for Chicago Transit Board
+# Level-filtered log records kept in a RAM ring buffer (read via /api/logs),
+# optionally echoed to the serial console and appended to a flash file
+
+import time
+import _thread
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+# Records below this level are dropped. Hot paths check it themselves,
+#     if log.level <= log.DEBUG:
+#         log.debug("Frame %d", n)
+# so a disabled debug line costs one comparison and builds nothing.
+level = INFO
+echo = True          # Also print records to the serial console
+file_path = None     # Append records here on flush()
+file_max = 16384     # Bytes before file_path is rotated to file_path + ".1"
+flush_interval = 60  # Seconds between flushes (scheduled by main.py)
+
+_size = 0
+_ring = []           # (seq, time, level, msg, args); formatting waits until read
+_seq = 0             # Sequence number of the last record
+_flushed = 0         # Last seq written to file_path
+_last_flush = 0
+_lock = _thread.allocate_lock()  # Both cores log in dual-core mode
+
+def setup(min_level=INFO, size=100, console=True, path=None, max_bytes=16384, interval=60):
+    global level, echo, file_path, file_max, flush_interval, _size, _ring
+    level = min_level
+    echo = console
+    file_path = path
+    file_max = max_bytes
+    flush_interval = interval
+    _size = size
+    _ring = [None] * size
+
+def parse_level(name, default=INFO):
+    """Level number for a name like "debug" (or a number), else default"""
+    if isinstance(name, int):
+        return name
+    for number, label in LEVEL_NAMES.items():
+        if label == str(name).upper():
+            return number
+    return default
+
+def _format(msg, args):
+    if not args:
+        return msg
+    try:
+        return msg % args
+    except Exception:
+        return msg + " " + repr(args)
+
+def _record(lvl, msg, args):
+    global _seq
+    with _lock:
+        _seq += 1
+        if _size:
+            _ring[_seq % _size] = (_seq, time.time(), lvl, msg, args)
+    if echo:
+        text = _format(msg, args)
+        print(text if lvl < WARNING else LEVEL_NAMES[lvl] + ": " + text)
+
+def debug(msg, *args):
+    if level <= DEBUG:
+        _record(DEBUG, msg, args)
+
+def info(msg, *args):
+    if level <= INFO:
+        _record(INFO, msg, args)
+
+def warning(msg, *args):
+    if level <= WARNING:
+        _record(WARNING, msg, args)
+
+def error(msg, *args):
+    if level <= ERROR:
+        _record(ERROR, msg, args)
+
+def entries(since=0, min_level=DEBUG):
+    """Formatted records newer than seq `since`, oldest first"""
+    result = []
+    first = max(since + 1, _seq - _size + 1, 1)
+    for seq in range(first, _seq + 1):
+        entry = _ring[seq % _size]
+        if entry is None or entry[0] != seq or entry[2] < min_level:
+            continue
+        result.append({"seq": seq, "time": entry[1], "level": LEVEL_NAMES[entry[2]],
+                       "msg": _format(entry[3], entry[4])})
+    return result
+
+def get_stats():
+    return {"level": LEVEL_NAMES.get(level, level), "seq": _seq, "buffer": _size,
+            "file": file_path, "flushed": _flushed}
+
+def flush():
+    """Append records not yet written to file_path (rotating it when full)"""
+    global _flushed, _last_flush
+    _last_flush = time.time()
+    if not file_path or _flushed >= _seq:
+        return
+    import os
+    try:
+        if os.stat(file_path)[6] > file_max:
+            os.rename(file_path, file_path + ".1")
+    except OSError:
+        pass  # No file yet
+    try:
+        with open(file_path, "a") as f:
+            for entry in entries(_flushed):
+                f.write("%d %s %s\n" % (entry["time"], entry["level"], entry["msg"]))
+        _flushed = _seq
+    except OSError as e:
+        print("Log flush failed: %s" % e)
@@ -8,6 +8,9 @@ import os
 import sys
 from machine import WDT
 from interstate75 import Interstate75, DISPLAY_INTERSTATE75_128X32
+from scene import Scene
+from handoff import DoubleBuffer, Worker
+import atlas
 
 # ===== INITIALIZE DISPLAY FIRST (needed for LED) =====
 # Interstate 75 W with 2x 64x32 panels side-by-side = 128x32 display
@@ -264,6 +267,59 @@ try:
         COLOR_DIRECTION = "#FFFFFF"
         COLOR_TRAIN_INFO = "#FFFFFF"
         COLOR_WEATHER = "#FFFFFF"
+    
+    # Display refresh rate
+    try:
+        from config import RENDER_FPS
+    except ImportError:
+        RENDER_FPS = 10
+    
+    # Longest a feed parse may run (ms); None = the watchdog budget of
+    # whatever is parsing (see parse_deadline_ms())
+    try:
+        from config import PARSE_DEADLINE_MS
+    except ImportError:
+        PARSE_DEADLINE_MS = None
+    
+    # Run fetching/parsing on the second core
+    try:
+        from config import ENABLE_DUAL_CORE
+    except ImportError:
+        ENABLE_DUAL_CORE = False
+    
+    # Span tracing (exported from /api/trace)
+    try:
+        from config import ENABLE_TRACING
+    except ImportError:
+        ENABLE_TRACING = False
+    try:
+        from config import TRACE_BUFFER_SIZE
+    except ImportError:
+        TRACE_BUFFER_SIZE = 512
+    
+    # Logging (read from /api/logs; LOG_FILE keeps a copy in flash)
+    try:
+        from config import LOG_LEVEL
+    except ImportError:
+        LOG_LEVEL = "info"
+    try:
+        from config import LOG_ECHO
+    except ImportError:
+        LOG_ECHO = True
+    try:
+        from config import LOG_FILE
+    except ImportError:
+        LOG_FILE = None
+    try:
+        from config import LOG_BUFFER_SIZE
+    except ImportError:
+        LOG_BUFFER_SIZE = 100
+    
+    # Development: send every API request to a mock server instead
+    try:
+        from config import UPSTREAM_OVERRIDE
+    except ImportError:
+        UPSTREAM_OVERRIDE = None
         
 except ImportError:
     print("\n" + "="*50)
@@ -280,12 +336,116 @@ except ImportError:
 
 import urequests
 
+import log
+from supervisor import Supervisor
+log.setup(log.parse_level(LOG_LEVEL), LOG_BUFFER_SIZE, LOG_ECHO, LOG_FILE)
+
+# Runs the periodic tasks and feeds the watchdog (see start_tasks())
+supervisor = Supervisor()
+
+# Cache DNS lookups for the API hosts (urequests resolves on every request)
+import dns_cache
+dns_cache.install(urequests)
+
+# Must come before any @tracing.traced function is defined
+import tracing
+tracing.setup(ENABLE_TRACING, TRACE_BUFFER_SIZE)
+
+def api_url(url):
+    """Rewrite an upstream URL to UPSTREAM_OVERRIDE (scheme and host), keeping path and query"""
+    if not UPSTREAM_OVERRIDE:
+        return url
+    path = url.split("://", 1)[-1]
+    slash = path.find("/")
+    return UPSTREAM_OVERRIDE.rstrip("/") + (path[slash:] if slash >= 0 else "/")
+
+# ===== METRICS =====
+# Served at /metrics. Label values are fixed here; hot paths record by index.
+import metrics
+
+UPSTREAMS = ("metra_trips", "metra_alerts", "cta_arrivals", "weather")
+UP_METRA_TRIPS = 0
+UP_METRA_ALERTS = 1
+UP_CTA = 2
+UP_WEATHER = 3
+
+PARSERS = ("metra_trips", "metra_alerts", "cta_arrivals")  # Same indices as UPSTREAMS
+
+fetch_requests = metrics.Counter("fetch_requests_total", "Upstream HTTP requests", "upstream", UPSTREAMS)
+fetch_errors = metrics.Counter("fetch_errors_total", "Upstream requests that failed or returned non-200", "upstream", UPSTREAMS)
+fetch_bytes = metrics.Counter("fetch_bytes_total", "Upstream response body bytes", "upstream", UPSTREAMS)
+fetch_latency = metrics.Histogram("fetch_latency_ms", "Upstream request time including body (ms)",
+                                  (100, 250, 500, 1000, 2500, 5000, 10000), "upstream", UPSTREAMS)
+parse_duration = metrics.Histogram("parse_duration_ms", "Feed parse time (ms)",
+                                   (5, 10, 25, 50, 100, 250, 500, 1000), "parser", PARSERS)
+parse_entities = metrics.Counter("parse_entities_total", "Entities decoded from upstream feeds", "parser", PARSERS)
+frame_render = metrics.Histogram("frame_render_us", "Time to draw one frame (us)",
+                                 (1000, 2000, 5000, 10000, 20000, 50000, 100000))
+portal_latency = metrics.Histogram("portal_request_ms", "Config portal request handling time (ms)",
+                                   (5, 10, 25, 50, 100, 250, 500, 1000))
+gc_runs = metrics.Counter("gc_runs_total", "Garbage collections seen between frames")
+gc_monitor = metrics.GcMonitor(gc_runs)
+
+HTTP_SPANS = tuple(tracing.name("http " + upstream) for upstream in UPSTREAMS)
+PORTAL_SPAN = tracing.name("portal request")
+GC_SPAN = tracing.name("gc")
+
+def _cache_stats():
+    """(cache, hits, misses) for the DNS, glyph atlas and scene caches"""
+    dns = dns_cache.stats
+    caches = [("dns", dns["hits"] + dns["stale_hits"] + dns["negative_hits"], dns["misses"])]
+    if glyphs is not None:
+        caches.append(("atlas", glyphs.hits, glyphs.misses))
+    caches.append(("scene", scene.frames_skipped, scene.frames_drawn))  # Skipped = nothing to redraw
+    return caches
+
+def _hit_ratios():
+    return [(name, "%.3f" % (hits / (hits + misses) if hits + misses else 0)) for name, hits, misses in _cache_stats()]
+
+def _heap_free():
+    import gc
+    return gc.mem_free() if hasattr(gc, "mem_free") else None
+
+metrics.Collector("cache_hits_total", "Cache hits", lambda: [(c[0], c[1]) for c in _cache_stats()], "counter", "cache")
+metrics.Collector("cache_misses_total", "Cache misses", lambda: [(c[0], c[2]) for c in _cache_stats()], "counter", "cache")
+metrics.Collector("cache_hit_ratio", "Cache hits / lookups since boot", _hit_ratios, "gauge", "cache")
+metrics.Collector("heap_free_bytes", "Free heap", _heap_free)
+metrics.Collector("heap_largest_free_block_bytes", "Largest allocatable heap block", metrics.largest_free_block)
+metrics.Collector("render_overruns_total", "Frames that missed their deadline", lambda: get_render_stats()["overruns"], "counter")
+
+def http_get(upstream, url, **kwargs):
+    """GET an upstream API (honouring UPSTREAM_OVERRIDE) and record fetch metrics.
+
+    The body is read here so its download time counts as latency; .json()
+    and .content reuse it. The timeout is capped below the watchdog
+    timeout, and the request is a supervisor checkpoint on either side.
+    """
+    kwargs["timeout"] = supervisor.timeout_s(kwargs.get("timeout", 10))
+    supervisor.checkpoint()
+    fetch_requests.inc(upstream)
+    start = time.ticks_ms()
+    span = tracing.begin()
+    try:
+        response = urequests.get(api_url(url), **kwargs)
+        if response.status_code == 200:
+            fetch_bytes.inc(upstream, len(response.content))
+        else:
+            fetch_errors.inc(upstream)
+    except Exception:
+        fetch_errors.inc(upstream)
+        raise
+    finally:
+        fetch_latency.observe(time.ticks_diff(time.ticks_ms(), start), upstream)
+        tracing.end(HTTP_SPANS[upstream], span)
+        supervisor.checkpoint()
+    return response
+
 # Import auto-update module
 if ENABLE_AUTO_UPDATE:
     try:
         import auto_update
     except ImportError:
-        print("Warning: auto_update.py not found - auto-update disabled")
+        log.warning("auto_update.py not found - auto-update disabled")
         ENABLE_AUTO_UPDATE = False
 
 # ===== API CONFIGURATION =====
@@ -319,6 +479,32 @@ COLOR_YELLOW = display.create_pen(255, 255, 0)
 COLOR_RED = display.create_pen(255, 0, 0)
 COLOR_BLACK = display.create_pen(0, 0, 0)
 
+# Retained display scene - tracks what's on the panel between frames
+scene = Scene(display, i75, COLOR_BLACK)
+
+# Pre-rendered font/icons (optional - build with host/build_atlas.py)
+# Pens are indexed by the atlas color codes: W, Y, R, G
+glyphs = atlas.load(display, [COLOR_WHITE, COLOR_YELLOW, COLOR_RED, COLOR_METRA_GREEN])
+if glyphs is not None:
+    # Sprites always come from the atlas; strings only if it beats display.text here
+    display.set_pen(COLOR_BLACK)
+    glyphs.calibrate()
+    log.info("Glyph atlas loaded: %s glyphs, %s sprites, strings via %s (%s)", len(glyphs.glyphs),
+             len(glyphs.sprites), "atlas" if glyphs.draw_strings else "display.text", glyphs.calibration)
+
+def draw_text(text, x, y):
+    """Draw scale-1 text with the current pen, blitting from the atlas when possible"""
+    if glyphs is None or not glyphs.text(text, x, y):
+        display.text(text, x, y, scale=1)
+
+def text_width(text):
+    """Width of scale-1 text in pixels"""
+    if glyphs is not None:
+        width = glyphs.measure(text)
+        if width is not None:
+            return width
+    return len(text) * 6
+
 # Metra Line Colors
 LINE_COLORS = {
     # Metra Lines
@@ -348,14 +534,23 @@ def get_line_color(line_code):
     """Get color for a specific line, default to Metra green"""
     return LINE_COLORS.get(line_code, COLOR_METRA_GREEN)
 
+# Pens created from config hex colors, so each color only gets one create_pen
+_pen_cache = {}
+
 def hex_to_pen(hex_color):
     """Convert hex color (#RRGGBB) to display pen"""
+    pen = _pen_cache.get(hex_color)
+    if pen is not None:
+        return pen
     try:
+        key = hex_color
         hex_color = hex_color.lstrip('#')
         r = int(hex_color[0:2], 16)
         g = int(hex_color[2:4], 16)
         b = int(hex_color[4:6], 16)
-        return display.create_pen(r, g, b)
+        pen = display.create_pen(r, g, b)
+        _pen_cache[key] = pen
+        return pen
     except:
         return COLOR_WHITE  # Default to white if parsing fails
 
@@ -391,6 +586,7 @@ def normalize_cta_line_name(route_code):
     return cta_name_map.get(route_str, route_str)  # Return original if not in map
 
 # ===== WIFI CONNECTION =====
+@tracing.traced("connect_wifi")
 def connect_wifi(silent=False):
     """Connect to WiFi and show status on display. Returns True if successful.
     
@@ -406,26 +602,27 @@ def connect_wifi(silent=False):
     try:
         network.hostname("board")
         if not silent:
-            print("Hostname set to 'board' for mDNS")
+            log.info("Hostname set to 'board' for mDNS")
     except Exception as e:
         if not silent:
-            print(f"Could not set hostname: {e}")
+            log.warning("Could not set hostname: %s", e)
 
     # Check if already connected
     if wlan.isconnected():
         wifi_connected = True
         wifi_disconnect_start_ms = None
+        publish_snapshot()
         if not silent:
-            print(f"Already connected! IP: {wlan.ifconfig()[0]}")
+            log.info("Already connected! IP: %s", wlan.ifconfig()[0])
 
         # Sync time with NTP server
         try:
             import ntptime
-            print("Syncing time with NTP...")
+            log.info("Syncing time with NTP...")
             ntptime.settime()
-            print("Time synced successfully")
+            log.info("Time synced successfully")
         except Exception as e:
-            print(f"NTP sync failed: {e}")
+            log.error("NTP sync failed: %s", e)
 
         # Start mDNS responder using micropython-mdns library
         try:
@@ -440,21 +637,21 @@ def connect_wifi(silent=False):
                 host=lambda: "board"
             )
             mdns_server.advertise("_http", "_tcp", port=80)
-            print(f"mDNS ready: http://board.local or http://{ip}")
+            log.info("mDNS ready: http://board.local or http://%s", ip)
 
         except ImportError:
             # Library not installed - try to install it
-            print("mDNS library not found, installing...")
+            log.info("mDNS library not found, installing...")
             try:
                 import mip
                 mip.install("github:cbrand/micropython-mdns")
-                print("mDNS library installed! Restart to enable board.local")
+                log.info("mDNS library installed! Restart to enable board.local")
             except Exception as install_err:
-                print(f"Could not install mDNS library: {install_err}")
+                log.warning("Could not install mDNS library: %s", install_err)
             mdns_server = None
             mdns_client = None
         except Exception as e:
-            print(f"mDNS setup failed: {e}")
+            log.error("mDNS setup failed: %s", e)
             mdns_server = None
             mdns_client = None
 
@@ -470,6 +667,7 @@ def connect_wifi(silent=False):
         display.set_pen(COLOR_WHITE)
         display.text("Connecting WiFi...", 5, 5, scale=1)
         i75.update()
+        scene.invalidate()
     
     max_wait = 20
     while max_wait > 0:
@@ -478,27 +676,30 @@ def connect_wifi(silent=False):
             break
         max_wait -= 1
         time.sleep(0.5)  # Reduced sleep to allow more LED blinks
+        supervisor.checkpoint()
     
     if wlan.status() != 3:
         wifi_connected = False
+        publish_snapshot()
         led_pattern_error()  # Error LED pattern
-        print("WiFi connection failed")
+        log.error("WiFi connection failed")
         return False
     else:
         wifi_connected = True
         wifi_disconnect_start_ms = None
+        publish_snapshot()
         ip = wlan.ifconfig()[0]
         led_pattern_success()  # Success LED pattern
-        print(f'Connected! IP: {ip}')
+        log.info("Connected! IP: %s", ip)
 
         # Sync time with NTP server
         try:
             import ntptime
-            print("Syncing time with NTP...")
+            log.info("Syncing time with NTP...")
             ntptime.settime()
-            print("Time synced successfully")
+            log.info("Time synced successfully")
         except Exception as e:
-            print(f"NTP sync failed: {e}")
+            log.error("NTP sync failed: %s", e)
 
         # Start mDNS responder using micropython-mdns library
         try:
@@ -513,13 +714,16 @@ def connect_wifi(silent=False):
                 host=lambda: "board"
             )
             mdns_server.advertise("_http", "_tcp", port=80)
-            print(f"mDNS ready: http://board.local or http://{ip}")
+            log.info("mDNS ready: http://board.local or http://%s", ip)
 
         except Exception as e:
-            print(f"mDNS setup failed: {e}")
+            log.error("mDNS setup failed: %s", e)
             mdns_server = None
             mdns_client = None
 
+        # Resolve API hosts now so the first fetches hit the DNS cache
+        dns_cache.prefetch()
+
         if not silent:
             display.set_pen(COLOR_BLACK)
             display.clear()
@@ -527,6 +731,7 @@ def connect_wifi(silent=False):
             display.text("WiFi OK!", 5, 5, scale=1)
             display.text(ip, 5, 15, scale=1)
             i75.update()
+            scene.invalidate()
             time.sleep(2)
         led_connected()  # Keep LED green while running
         return True
@@ -544,39 +749,46 @@ def check_wifi_and_reconnect():
         return True
     
     # WiFi disconnected - attempt to reconnect
-    print("WiFi disconnected! Attempting to reconnect...")
+    log.warning("WiFi disconnected! Attempting to reconnect...")
     led_pattern_error()
     wifi_connected = False
+    publish_snapshot()
 
     # Start disconnect timer if not already started
     if wifi_disconnect_start_ms is None:
         wifi_disconnect_start_ms = time.ticks_ms()
+        dns_cache.clear()
     
     # Try to reconnect silently (don't update display during normal operation)
     for attempt in range(3):
-        print(f"Reconnection attempt {attempt + 1}/3...")
+        log.info("Reconnection attempt %s/3...", attempt + 1)
         if connect_wifi(silent=True):
-            print("WiFi reconnected successfully!")
+            log.info("WiFi reconnected successfully!")
             led_connected()  # Keep LED green while running
             return True
         time.sleep(2)
+        supervisor.checkpoint()
     
     # Check if we've been offline for more than 60 seconds
     try:
         if wifi_disconnect_start_ms is not None:
             elapsed_ms = time.ticks_diff(time.ticks_ms(), wifi_disconnect_start_ms)
             if elapsed_ms >= 60000:
-                print("Offline for >60s. Entering WiFi setup portal...")
+                # With the watchdog on this run never checks in again, so
+                # the board resets and boot opens the portal instead
+                log.info("Offline for >60s. Entering WiFi setup portal...")
                 try:
+                    if portal_server:
+                        portal_server.close()  # The setup portal needs port 80
                     import setup_portal
                     setup_portal.run_server()  # Blocks until config saved and device restarts
                 except Exception as e:
-                    print(f"Failed to start setup portal: {e}")
+                    log.error("Failed to start setup portal: %s", e)
                 # If setup portal returns, continue returning False to skip network ops
     except Exception as e:
-        print(f"Disconnect timer error: {e}")
+        log.error("Disconnect timer error: %s", e)
 
-    print("Failed to reconnect to WiFi after 3 attempts")
+    log.error("Failed to reconnect to WiFi after 3 attempts")
     return False
 
 # ===== TRAIN DATA =====
@@ -626,6 +838,8 @@ wifi_connected = False
 wifi_disconnect_start_ms = None  # Tracks when we first detected a disconnect
 api_error = False
 last_successful_update = 0
+last_trains_fetch = 0   # time.time() of the last fetch_trains()/fetch_alerts() run,
+last_alerts_fetch = 0   # which dates the next one for /api/arrivals caching
 cached_trains_available = False
 
 # Track which view we're showing
@@ -636,7 +850,70 @@ dual_line_mode = LINE_2 is not None
 current_station_index = 0  # Which station we're currently displaying in rotation mode
 station_rotation_enabled = ROTATION_MODE == "station" and len(ROTATION_STATIONS) > 0
 
-def parse_gtfs_protobuf(data):
+# ===== DISPLAY SNAPSHOT =====
+class Snapshot:
+    """Immutable copy of the state the display draws from.
+
+    Fetchers update the globals above and then call publish_snapshot(),
+    which flips a new Snapshot into the display_state double buffer. The
+    render task reads it once per frame, so a frame never mixes old and
+    new data - even when the fetches run on the other core.
+    """
+    def __init__(self, version):
+        self.version = version
+        self.line1_inbound = tuple(line1_inbound)
+        self.line1_outbound = tuple(line1_outbound)
+        self.line2_inbound = tuple(line2_inbound)
+        self.line2_outbound = tuple(line2_outbound)
+        self.station_cache = {}
+        for index, cache in list(station_cache.items()):
+            self.station_cache[index] = {
+                "inbound": tuple(cache["inbound"]),
+                "outbound": tuple(cache["outbound"]),
+            }
+        self.active_alerts = tuple(active_alerts)
+        self.line1_has_alerts = line1_has_alerts
+        self.line2_has_alerts = line2_has_alerts
+        self.weather_temp = weather_data["temp"]
+        self.weather_icon = weather_data["icon"]
+        self.wifi_connected = wifi_connected
+        self.api_error = api_error
+        self.cached_trains_available = cached_trains_available
+
+display_state = DoubleBuffer(Snapshot(0))
+
+def publish_snapshot():
+    """Publish the current arrival/alert/weather state to the render task"""
+    display_state.publish(Snapshot)
+
+# The entity loops below checkpoint every PARSE_CHECK_EVERY entities, so a
+# big feed keeps the watchdog fed, and raise ParseTimeout once a parse runs
+# past parse_deadline_ms(); the fetch then keeps the previous data
+PARSE_CHECK_EVERY = 16
+
+class ParseTimeout(Exception):
+    pass
+
+def parse_deadline_ms():
+    """PARSE_DEADLINE_MS if configured, else the watchdog budget of what is
+    parsing: one pass of the core 1 fetch loop, or the running task (or
+    section). A parse that outlives that is treated as stuck."""
+    if PARSE_DEADLINE_MS:
+        return PARSE_DEADLINE_MS
+    if not supervisor.in_loop():
+        return FETCH_CORE_BUDGET_MS
+    task = supervisor.current
+    return task.budget_ms if task is not None else NETWORK_BUDGET_MS
+
+def parse_checkpoint(started_ms, deadline_ms):
+    """Called between entities: beat the running task, and raise once the parse is past its deadline"""
+    supervisor.checkpoint()
+    elapsed = time.ticks_diff(time.ticks_ms(), started_ms)
+    if elapsed > deadline_ms:
+        raise ParseTimeout("gave up after %d ms (deadline %d ms)" % (elapsed, deadline_ms))
+
+@tracing.traced("parse_gtfs_protobuf")
+def parse_gtfs_protobuf(data, deadline_ms=None):
     """Simple GTFS-RT protobuf parser for MicroPython
 
     Protobuf wire types:
@@ -846,6 +1123,10 @@ def parse_gtfs_protobuf(data):
         return entity
 
     # Parse top-level FeedMessage
+    started_ms = time.ticks_ms()
+    if deadline_ms is None:
+        deadline_ms = parse_deadline_ms()
+    entities = 0
     try:
         while pos < len(data):
             tag, pos = read_varint(data, pos)
@@ -854,6 +1135,9 @@ def parse_gtfs_protobuf(data):
 
             if field_num == 2 and wire_type == 2:  # entity
                 entity_data, pos = read_bytes(data, pos)
+                entities += 1
+                if entities % PARSE_CHECK_EVERY == 0:
+                    parse_checkpoint(started_ms, deadline_ms)
                 entity = parse_entity(entity_data)
                 if entity.get("trip_update"):
                     result["entity"].append(entity)
@@ -869,11 +1153,14 @@ def parse_gtfs_protobuf(data):
                 pos += 1  # Skip unknown
 
         return result
+    except ParseTimeout:
+        raise
     except Exception as e:
-        print(f"Protobuf parse error: {e}")
+        log.error("Protobuf parse error: %s", e)
         return None
 
-def parse_gtfs_alerts_protobuf(data):
+@tracing.traced("parse_gtfs_alerts_protobuf")
+def parse_gtfs_alerts_protobuf(data, deadline_ms=None):
     """Parse GTFS-RT alerts protobuf
 
     Alert structure:
@@ -1048,6 +1335,10 @@ def parse_gtfs_alerts_protobuf(data):
         return entity
 
     # Parse top-level FeedMessage
+    started_ms = time.ticks_ms()
+    if deadline_ms is None:
+        deadline_ms = parse_deadline_ms()
+    entities = 0
     try:
         while pos < len(data):
             tag, pos = read_varint(data, pos)
@@ -1056,6 +1347,9 @@ def parse_gtfs_alerts_protobuf(data):
 
             if field_num == 2 and wire_type == 2:  # entity
                 entity_data, pos = read_bytes(data, pos)
+                entities += 1
+                if entities % PARSE_CHECK_EVERY == 0:
+                    parse_checkpoint(started_ms, deadline_ms)
                 entity = parse_entity(entity_data)
                 if entity.get("alert"):
                     result["entity"].append(entity)
@@ -1071,10 +1365,13 @@ def parse_gtfs_alerts_protobuf(data):
                 pos += 1
 
         return result
+    except ParseTimeout:
+        raise
     except Exception as e:
-        print(f"Alerts protobuf parse error: {e}")
+        log.error("Alerts protobuf parse error: %s", e)
         return None
 
+@tracing.traced("fetch_metra_trains")
 def fetch_metra_trains(station_id, line_code):
     """Fetch Metra train arrivals using GTFS-RT JSON API"""
     trains_inbound = []
@@ -1083,10 +1380,10 @@ def fetch_metra_trains(station_id, line_code):
     try:
         # Check if API token is set
         if not METRA_API_TOKEN or METRA_API_TOKEN == "your_token_here":
-            print("Metra API token not configured - skipping fetch")
+            log.warning("Metra API token not configured - skipping fetch")
             return trains_inbound, trains_outbound
 
-        print(f"Fetching Metra trains for station {station_id} on {line_code}")
+        log.debug("Fetching Metra trains for station %s on %s", station_id, line_code)
 
         import time as time_module
         from time import localtime
@@ -1095,9 +1392,9 @@ def fetch_metra_trains(station_id, line_code):
         # Metra GTFS-RT API - pass token as query parameter
         url = f"{TRIP_UPDATES_URL}?api_token={METRA_API_TOKEN}"
 
-        response = urequests.get(url, timeout=15)
+        response = http_get(UP_METRA_TRIPS, url, timeout=15)
         if response.status_code != 200:
-            print(f"Metra API error: HTTP {response.status_code}")
+            log.error("Metra API error: HTTP %s", response.status_code)
             response.close()
             return trains_inbound, trains_outbound
 
@@ -1106,10 +1403,17 @@ def fetch_metra_trains(station_id, line_code):
         response.close()
 
         # Parse GTFS-RT protobuf manually (simplified parser)
-        data = parse_gtfs_protobuf(raw_content)
+        parse_start = time.ticks_ms()
+        try:
+            data = parse_gtfs_protobuf(raw_content)
+        except ParseTimeout as e:
+            log.warning("Metra trips feed (%s bytes) %s; keeping the last trains", len(raw_content), e)
+            raise
+        parse_duration.observe(time.ticks_diff(time.ticks_ms(), parse_start), UP_METRA_TRIPS)
         if not data or "entity" not in data:
-            print("Failed to parse Metra protobuf response")
+            log.error("Failed to parse Metra protobuf response")
             return trains_inbound, trains_outbound
+        parse_entities.inc(UP_METRA_TRIPS, len(data["entity"]))
 
         # GTFS-RT timestamps are in UTC
         # After NTP sync, time.time() returns UTC
@@ -1182,14 +1486,126 @@ def fetch_metra_trains(station_id, line_code):
         trains_inbound.sort(key=lambda t: t.arrival_timestamp)
         trains_outbound.sort(key=lambda t: t.arrival_timestamp)
         
-        print(f"Found {len(trains_inbound)} inbound, {len(trains_outbound)} outbound Metra trains")
+        log.debug("Found %s inbound, %s outbound Metra trains", len(trains_inbound), len(trains_outbound))
 
+    except ParseTimeout:
+        raise  # The caller keeps what it has
     except Exception as e:
-        print(f"Error fetching Metra trains: {type(e).__name__}: {e}")
+        log.error("Error fetching Metra trains: %s: %s", type(e).__name__, e)
         sys.print_exception(e)
 
     return trains_inbound, trains_outbound
 
+@tracing.traced("parse_cta_arrivals")
+def parse_cta_arrivals(data, line_code=None, current_time=None):
+    """Turn a decoded Train Tracker response into (inbound, outbound) TrainArrival lists"""
+    trains_inbound = []
+    trains_outbound = []
+    if current_time is None:
+        current_time = time.time()
+
+    if "eta" in data["ctatt"]:
+        for arrival in data["ctatt"]["eta"]:
+            # Parse arrival time (ISO 8601 format: 2025-11-25T09:46:21)
+            if "arrT" in arrival:
+                try:
+                    arr_str = arrival["arrT"]
+                    
+                    # Parse ISO 8601 format: YYYY-MM-DDTHH:MM:SS
+                    # Split into date and time parts
+                    date_time_parts = arr_str.split("T")
+                    if len(date_time_parts) != 2:
+                        continue
+                    
+                    date_part = date_time_parts[0].split("-")
+                    time_part = date_time_parts[1].split(":")
+                    
+                    year = int(date_part[0])
+                    month = int(date_part[1])
+                    day = int(date_part[2])
+                    hour = int(time_part[0])
+                    minute = int(time_part[1])
+                    second = int(time_part[2])
+                    
+                    # Convert to timestamp
+                    # CTA API returns Central Time, but board uses UTC
+                    # Chicago is UTC-6 (CST) or UTC-5 (CDT)
+                    # Add 6 hours (21600 seconds) to convert from Chicago time to UTC
+                    arrival_time = time.mktime((year, month, day, hour, minute, second, 0, 0)) + 21600
+                    
+                    # Calculate minutes until arrival
+                    minutes = int((arrival_time - current_time) / 60)
+                    
+                    # Skip past trains
+                    if minutes < 0:
+                        continue
+                    
+                    # Skip trains more than 60 min away
+                    if minutes > 60:
+                        continue
+                    
+                except (ValueError, IndexError, KeyError):
+                    # Skip if we can't parse the time
+                    continue
+            else:
+                # No arrival time, skip
+                continue
+
+            # Get route and direction
+            route = arrival.get("rt", line_code or "Unknown")
+            destination = arrival.get("destNm", "")
+            
+            # Validate route - ensure it's not a station ID
+            if route and route.isdigit():
+                log.warning("Route appears to be numeric (%s), using line_code instead", route)
+                route = line_code or "Unknown"
+            
+            # Debug: print what we got from API
+            if not route or route == "Unknown":
+                log.warning("Missing route in CTA data. Station: %s, Dest: %s", arrival.get('staNm'), destination)
+            
+            # CTA uses direction codes in trDr field:
+            # 1 = South/West (toward terminals), 5 = North/East (toward Loop/downtown)
+            # For most lines: 5 = toward downtown (Inbound), 1 = away from downtown (Outbound)
+            # However, this is line-dependent, so we also check destination
+            
+            direction_code = arrival.get("trDr", "")
+            
+            # For Brown line: Loop is inbound, Kimball is outbound
+            # For Red line: 95th and Howard are terminals, downtown is inbound
+            # General rule: if going TO a terminal/end station, use destination
+            
+            # Check if this is going toward downtown/Loop keywords
+            downtown_keywords = ["Loop", "downtown", "Clark/Lake"]
+            toward_downtown = any(keyword in destination for keyword in downtown_keywords)
+            
+            # For terminals, check if it's the main terminal (Loop side = inbound)
+            terminal_inbound = ["Loop"]  # These terminals are considered "inbound"
+            terminal_outbound = ["Kimball", "95th/Dan Ryan", "Howard", "Forest Park", "Harlem", "O'Hare", "UIC-Halsted", "Midway"]
+            
+            # Determine direction
+            if toward_downtown or any(t in destination for t in terminal_inbound):
+                direction = "Inbound"
+            elif any(t in destination for t in terminal_outbound):
+                direction = "Outbound"
+            else:
+                # Fallback: use direction code (5 = typically inbound, 1 = typically outbound)
+                direction = "Inbound" if direction_code == "5" else "Outbound"
+
+            train = TrainArrival(route, direction, minutes, 1, arrival_timestamp=arrival_time)
+
+            if direction == "Inbound":
+                trains_inbound.append(train)
+            else:
+                trains_outbound.append(train)
+    
+    # Sort by arrival time
+    trains_inbound.sort(key=lambda t: t.arrival_timestamp)
+    trains_outbound.sort(key=lambda t: t.arrival_timestamp)
+
+    return trains_inbound, trains_outbound
+
+@tracing.traced("fetch_cta_trains")
 def fetch_cta_trains(station_id, line_code=None):
     """Fetch CTA train arrivals using Train Tracker API"""
     trains_inbound = []
@@ -1197,7 +1613,7 @@ def fetch_cta_trains(station_id, line_code=None):
     
     # Check if API key is set
     if not CTA_API_KEY or CTA_API_KEY == "your_cta_key_here" or CTA_API_KEY == "":
-        print("CTA API key not configured - skipping fetch")
+        log.warning("CTA API key not configured - skipping fetch")
         return trains_inbound, trains_outbound
     
     # Normalize CTA line name to API code
@@ -1211,7 +1627,7 @@ def fetch_cta_trains(station_id, line_code=None):
     if line_code in line_map:
         line_code = line_map[line_code]
     
-    print(f"Fetching CTA trains for station {station_id}" + (f" on {line_code}" if line_code else ""))
+    log.debug("Fetching CTA trains for station %s%s", station_id, " on " + line_code if line_code else "")
     
     try:
         # CTA Train Tracker API
@@ -1222,9 +1638,9 @@ def fetch_cta_trains(station_id, line_code=None):
             # Filter by route/line if specified
             url += f"&rt={line_code}"
         
-        response = urequests.get(url, timeout=10)
+        response = http_get(UP_CTA, url, timeout=10)
         if response.status_code != 200:
-            print(f"CTA API error: HTTP {response.status_code}")
+            log.error("CTA API error: HTTP %s", response.status_code)
             response.close()
             return trains_inbound, trains_outbound
         
@@ -1233,132 +1649,37 @@ def fetch_cta_trains(station_id, line_code=None):
         
         # Check for API errors
         if "ctatt" not in data:
-            print("Invalid CTA API response")
+            log.warning("Invalid CTA API response")
             return trains_inbound, trains_outbound
         
         if "errCd" in data["ctatt"] and data["ctatt"]["errCd"] != "0":
-            print(f"CTA API error: {data['ctatt'].get('errNm', 'Unknown error')}")
+            log.error("CTA API error: %s", data['ctatt'].get('errNm', 'Unknown error'))
             return trains_inbound, trains_outbound
         
         # Parse train arrivals
-        if "eta" in data["ctatt"]:
-            current_time = time.time()
-            
-            for arrival in data["ctatt"]["eta"]:
-                # Parse arrival time (ISO 8601 format: 2025-11-25T09:46:21)
-                if "arrT" in arrival:
-                    try:
-                        arr_str = arrival["arrT"]
-                        
-                        # Parse ISO 8601 format: YYYY-MM-DDTHH:MM:SS
-                        # Split into date and time parts
-                        date_time_parts = arr_str.split("T")
-                        if len(date_time_parts) != 2:
-                            continue
-                        
-                        date_part = date_time_parts[0].split("-")
-                        time_part = date_time_parts[1].split(":")
-                        
-                        year = int(date_part[0])
-                        month = int(date_part[1])
-                        day = int(date_part[2])
-                        hour = int(time_part[0])
-                        minute = int(time_part[1])
-                        second = int(time_part[2])
-                        
-                        # Convert to timestamp
-                        # CTA API returns Central Time, but board uses UTC
-                        # Chicago is UTC-6 (CST) or UTC-5 (CDT)
-                        # Add 6 hours (21600 seconds) to convert from Chicago time to UTC
-                        arrival_time = time.mktime((year, month, day, hour, minute, second, 0, 0)) + 21600
-                        
-                        # Calculate minutes until arrival
-                        minutes = int((arrival_time - current_time) / 60)
-                        
-                        # Skip past trains
-                        if minutes < 0:
-                            continue
-                        
-                        # Skip trains more than 60 min away
-                        if minutes > 60:
-                            continue
-                        
-                    except (ValueError, IndexError, KeyError):
-                        # Skip if we can't parse the time
-                        continue
-                else:
-                    # No arrival time, skip
-                    continue
-
-                # Get route and direction
-                route = arrival.get("rt", line_code or "Unknown")
-                destination = arrival.get("destNm", "")
-                
-                # Validate route - ensure it's not a station ID
-                if route and route.isdigit():
-                    print(f"Warning: Route appears to be numeric ({route}), using line_code instead")
-                    route = line_code or "Unknown"
-                
-                # Debug: print what we got from API
-                if not route or route == "Unknown":
-                    print(f"Warning: Missing route in CTA data. Station: {arrival.get('staNm')}, Dest: {destination}")
-                
-                # CTA uses direction codes in trDr field:
-                # 1 = South/West (toward terminals), 5 = North/East (toward Loop/downtown)
-                # For most lines: 5 = toward downtown (Inbound), 1 = away from downtown (Outbound)
-                # However, this is line-dependent, so we also check destination
-                
-                direction_code = arrival.get("trDr", "")
-                
-                # For Brown line: Loop is inbound, Kimball is outbound
-                # For Red line: 95th and Howard are terminals, downtown is inbound
-                # General rule: if going TO a terminal/end station, use destination
-                
-                # Check if this is going toward downtown/Loop keywords
-                downtown_keywords = ["Loop", "downtown", "Clark/Lake"]
-                toward_downtown = any(keyword in destination for keyword in downtown_keywords)
-                
-                # For terminals, check if it's the main terminal (Loop side = inbound)
-                terminal_inbound = ["Loop"]  # These terminals are considered "inbound"
-                terminal_outbound = ["Kimball", "95th/Dan Ryan", "Howard", "Forest Park", "Harlem", "O'Hare", "UIC-Halsted", "Midway"]
-                
-                # Determine direction
-                if toward_downtown or any(t in destination for t in terminal_inbound):
-                    direction = "Inbound"
-                elif any(t in destination for t in terminal_outbound):
-                    direction = "Outbound"
-                else:
-                    # Fallback: use direction code (5 = typically inbound, 1 = typically outbound)
-                    direction = "Inbound" if direction_code == "5" else "Outbound"
-
-                train = TrainArrival(route, direction, minutes, 1, arrival_timestamp=arrival_time)
-
-                if direction == "Inbound":
-                    trains_inbound.append(train)
-                else:
-                    trains_outbound.append(train)
-        
-        # Sort by arrival time
-        trains_inbound.sort(key=lambda t: t.arrival_timestamp)
-        trains_outbound.sort(key=lambda t: t.arrival_timestamp)
+        parse_start = time.ticks_ms()
+        trains_inbound, trains_outbound = parse_cta_arrivals(data, line_code)
+        parse_duration.observe(time.ticks_diff(time.ticks_ms(), parse_start), UP_CTA)
+        parse_entities.inc(UP_CTA, len(data["ctatt"].get("eta", ())))
         
-        print(f"Found {len(trains_inbound)} inbound, {len(trains_outbound)} outbound CTA trains")
+        log.debug("Found %s inbound, %s outbound CTA trains", len(trains_inbound), len(trains_outbound))
 
     except Exception as e:
-        print(f"Error fetching CTA trains: {e}")
+        log.error("Error fetching CTA trains: %s", e)
     
     return trains_inbound, trains_outbound
 
+@tracing.traced("fetch_trains_for_station")
 def fetch_trains_for_station(station_index):
     """Fetch train arrivals for a specific station in rotation mode"""
     global station_cache, api_error, last_successful_update, cached_trains_available
     
     if station_index >= len(ROTATION_STATIONS):
-        print(f"Invalid station index: {station_index}")
+        log.warning("Invalid station index: %s", station_index)
         return
     
     station = ROTATION_STATIONS[station_index]
-    print(f"Fetching trains for: {station['name']} ({station['line']})")
+    log.debug("Fetching trains for: %s (%s)", station['name'], station['line'])
     
     try:
         # Call appropriate API based on transit type
@@ -1370,12 +1691,12 @@ def fetch_trains_for_station(station_index):
         if station_id.isdigit() and len(station_id) == 5:
             # CTA station ID (5-digit numeric)
             if transit_type != "cta":
-                print(f"Note: Station ID {station_id} appears to be CTA, overriding transit_type")
+                log.warning("Station ID %s appears to be CTA, overriding transit_type", station_id)
                 transit_type = "cta"
         elif not station_id.isdigit():
             # Metra station ID (text like RAVENSWOOD)
             if transit_type != "metra":
-                print(f"Note: Station ID {station_id} appears to be Metra, overriding transit_type")
+                log.warning("Station ID %s appears to be Metra, overriding transit_type", station_id)
                 transit_type = "metra"
         
         if transit_type == "cta":
@@ -1383,25 +1704,30 @@ def fetch_trains_for_station(station_index):
         else:  # metra
             inbound, outbound = fetch_metra_trains(station["id"], station["line"])
         
-        # Store in station cache
-        station_cache[station_index] = {
+        # Store in station cache (under the writer lock: Snapshot() copies
+        # station_cache, possibly on the other core)
+        entry = {
             "inbound": inbound,
             "outbound": outbound,
             "last_update": time.time()
         }
+        with display_state.writing():
+            station_cache[station_index] = entry
         
         # Update status
         if len(inbound) > 0 or len(outbound) > 0:
             api_error = False
             last_successful_update = time.time()
             cached_trains_available = True
-            print(f"Found trains for {station['name']}")
+            log.debug("Found trains for %s", station['name'])
         else:
-            print(f"No trains found for {station['name']}")
+            log.debug("No trains found for %s", station['name'])
             # Don't set api_error - empty response is valid
         
+    except ParseTimeout:
+        api_error = True  # Keep the station's last trains
     except Exception as e:
-        print(f"Error fetching trains for station {station_index}: {e}")
+        log.error("Error fetching trains for station %s: %s", station_index, e)
         api_error = True
 
 def detect_transit_type(line_code):
@@ -1417,13 +1743,21 @@ def detect_transit_type(line_code):
     else:
         return "metra"
 
+@tracing.traced("fetch_trains")
 def fetch_trains():
-    """Fetch train arrivals from transit APIs"""
+    """Fetch train arrivals from transit APIs and publish them to the display"""
+    global last_trains_fetch
+    last_trains_fetch = time.time()
+    _fetch_trains()
+    publish_snapshot()
+
+def _fetch_trains():
+    """Fetch train arrivals for the configured lines or rotation stations"""
     global line1_inbound, line1_outbound, line2_inbound, line2_outbound
     global api_error, last_successful_update, cached_trains_available, wifi_connected
     
     if not wifi_connected:
-        print("Skipping fetch_trains: WiFi not connected")
+        log.warning("Skipping fetch_trains: WiFi not connected")
         return
     
     # Skip API calls during typical no-service hours (1:30 AM - 4:30 AM)
@@ -1456,7 +1790,7 @@ def fetch_trains():
     if not has_24hr_service:
         # Skip if between 1:30 AM and 4:30 AM local time
         if (current_hour == 1 and current_minute >= 30) or (current_hour in [2, 3]) or (current_hour == 4 and current_minute < 30):
-            print("Skipping API call during no-service hours (1:30-4:30 AM local)")
+            log.debug("Skipping API call during no-service hours (1:30-4:30 AM local)")
             return
     
     # In station rotation mode, fetch for all stations
@@ -1468,18 +1802,18 @@ def fetch_trains():
     try:
         # Check if LINE_1 is properly configured
         if not LINE_1 or LINE_1 == "" or LINE_1 == "None":
-            print("ERROR: LINE_1 not configured properly in config.py")
+            log.error("LINE_1 not configured properly in config.py")
             api_error = True
             return
         
         if not PRIMARY_STATION_ID or PRIMARY_STATION_ID == "" or PRIMARY_STATION_ID == "None":
-            print("ERROR: PRIMARY_STATION_ID not configured properly in config.py")
+            log.error("PRIMARY_STATION_ID not configured properly in config.py")
             api_error = True
             return
         
         # Detect transit type for LINE_1
         line1_type = detect_transit_type(LINE_1)
-        print(f"LINE_1: {LINE_1}, Type: {line1_type}, Station: {PRIMARY_STATION_ID}")
+        log.debug("LINE_1: %s, Type: %s, Station: %s", LINE_1, line1_type, PRIMARY_STATION_ID)
         
         # Fetch LINE_1 data
         if line1_type == "cta":
@@ -1516,14 +1850,16 @@ def fetch_trains():
             api_error = False
             last_successful_update = time.time()
             cached_trains_available = True
-            print(f"Successfully fetched trains: {len(line1_inbound)} inbound, {len(line1_outbound)} outbound")
+            log.debug("Successfully fetched trains: %s inbound, %s outbound", len(line1_inbound), len(line1_outbound))
         else:
-            print("Warning: No trains returned from API (could be valid if no trains scheduled)")
+            log.warning("No trains returned from API (could be valid if no trains scheduled)")
             # Don't set api_error = True here - empty is valid during off-hours
 
+    except ParseTimeout:
+        api_error = True  # Keep the trains we have
     except Exception as e:
         api_error = True
-        print(f"Error fetching trains: {e}")
+        log.error("Error fetching trains: %s", e)
         sys.print_exception(e)
         # Keep cached data if available
         if not cached_trains_available:
@@ -1532,16 +1868,19 @@ def fetch_trains():
         line2_inbound = []
         line2_outbound = []
 
+@tracing.traced("fetch_alerts")
 def fetch_alerts():
     """Fetch service alerts from Metra/CTA APIs"""
-    global active_alerts, line1_has_alerts, line2_has_alerts
+    global active_alerts, line1_has_alerts, line2_has_alerts, last_alerts_fetch
 
-    active_alerts = []
+    last_alerts_fetch = time.time()
+    previous = (active_alerts, line1_has_alerts, line2_has_alerts)
+    alerts = []
     line1_has_alerts = False
     line2_has_alerts = False
 
     try:
-        print("Fetching service alerts...")
+        log.debug("Fetching service alerts...")
 
         # Determine which transit system(s) we're using
         line1_type = detect_transit_type(LINE_1) if LINE_1 else "metra"
@@ -1550,7 +1889,7 @@ def fetch_alerts():
         # Fetch Metra alerts if using any Metra lines
         if line1_type == "metra" or (line2_type and line2_type == "metra"):
             metra_alerts = fetch_metra_alerts()
-            active_alerts.extend(metra_alerts)
+            alerts.extend(metra_alerts)
 
             # Check if our lines are affected
             for alert in metra_alerts:
@@ -1563,7 +1902,7 @@ def fetch_alerts():
         # Fetch CTA alerts if using any CTA lines
         if line1_type == "cta" or (line2_type and line2_type == "cta"):
             cta_alerts = fetch_cta_alerts()
-            active_alerts.extend(cta_alerts)
+            alerts.extend(cta_alerts)
 
             # Check if our lines are affected
             for alert in cta_alerts:
@@ -1573,15 +1912,130 @@ def fetch_alerts():
                 if dual_line_mode and LINE_2 in affected_routes:
                     line2_has_alerts = True
 
+        # Wrap alert text for the carousel now rather than on every frame
+        prepare_alert_layouts(alerts)
+        active_alerts = alerts
+
         if len(active_alerts) > 0:
-            print(f"Found {len(active_alerts)} active alerts")
+            log.debug("Found %s active alerts", len(active_alerts))
         else:
-            print("No active service alerts")
+            log.debug("No active service alerts")
 
+    except ParseTimeout:
+        active_alerts, line1_has_alerts, line2_has_alerts = previous
     except Exception as e:
-        print(f"Error fetching alerts: {e}")
+        log.error("Error fetching alerts: %s", e)
         active_alerts = []
 
+    publish_snapshot()
+
+# ===== ALERT CAROUSEL =====
+# Alerts are laid out once per distinct alert (at fetch time): the header
+# scrolls as a marquee and the routes/description are wrapped into
+# 128px-wide pages that the carousel steps through
+ALERT_PAGE_TIME = 3000    # ms each page stays up
+ALERT_SCROLL_MS = 40      # Marquee tick (1px per tick = 25px/s)
+ALERT_MAX_PAGES = 12      # Cap on wrapped description lines per alert
+ALERT_TEXT_WIDTH = 124    # Usable width at x=2
+MARQUEE_GAP = 24          # Blank pixels between marquee repeats
+
+_alert_layouts = {}       # (header, description, routes) -> layout
+
+# Carousel position - advanced by alert_animation_job()
+alert_carousel = {"alert": 0, "page": 0, "offset": 0, "page_ms": 0, "showing": False}
+
+def wrap_text(text, width):
+    """Word-wrap text into lines no wider than width pixels"""
+    lines = []
+    line = ""
+    for word in text.split():
+        candidate = word if not line else line + " " + word
+        if text_width(candidate) <= width:
+            line = candidate
+            continue
+        if line:
+            lines.append(line)
+        # Hard-split words that are wider than a whole line
+        while text_width(word) > width:
+            cut = len(word) - 1
+            while cut > 1 and text_width(word[:cut]) > width:
+                cut -= 1
+            lines.append(word[:cut])
+            word = word[cut:]
+        line = word
+    if line:
+        lines.append(line)
+    return lines
+
+def prepare_alert_layouts(alerts):
+    """Attach a carousel layout to each alert, reusing layouts for unchanged alerts"""
+    global _alert_layouts
+    layouts = {}
+    wrapped = 0
+    for alert in alerts:
+        routes = alert.get("routes", [])
+        key = (alert.get("header", ""), alert.get("description", ""), tuple(routes))
+        layout = layouts.get(key) or _alert_layouts.get(key)
+        if layout is None:
+            header = key[0] or "Alert"
+            pages = []
+            if routes:
+                pages.extend(wrap_text("Lines: " + ", ".join(routes[:3]), ALERT_TEXT_WIDTH))
+            pages.extend(wrap_text(key[1], ALERT_TEXT_WIDTH)[:ALERT_MAX_PAGES])
+            layout = {
+                "header": header,
+                "header_w": text_width(header),
+                "pages": pages or [""],
+            }
+            wrapped += 1
+        layouts[key] = layout
+        alert["layout"] = layout
+    # Only keep layouts for alerts that are still active
+    _alert_layouts = layouts
+    if wrapped:
+        log.debug("Laid out %s new alert(s)", wrapped)
+
+def showing_alerts(snap):
+    """Check if draw_display() would show the alerts screen for this snapshot"""
+    if not snap.wifi_connected or (snap.api_error and not snap.cached_trains_available):
+        return False
+    return current_direction == "Alerts" and ENABLE_SERVICE_ALERTS and len(snap.active_alerts) > 0
+
+def alert_animation_job():
+    """Scroll the alert marquee and step the carousel (every ALERT_SCROLL_MS)"""
+    carousel = alert_carousel
+    snap = display_state.read()
+    if not showing_alerts(snap):
+        carousel["showing"] = False
+        return
+
+    now = time.ticks_ms()
+    if not carousel["showing"]:
+        # Just rotated onto the alerts view - start this alert's page timer
+        carousel["showing"] = True
+        carousel["page_ms"] = now
+        carousel["offset"] = 0
+
+    count = len(snap.active_alerts)
+    layout = snap.active_alerts[carousel["alert"] % count]["layout"]
+
+    # Marquee: only headers wider than the panel scroll
+    if layout["header_w"] > ALERT_TEXT_WIDTH:
+        carousel["offset"] = (carousel["offset"] + 1) % (layout["header_w"] + MARQUEE_GAP)
+
+    # Carousel: step through pages, then on to the next alert
+    if time.ticks_diff(now, carousel["page_ms"]) >= ALERT_PAGE_TIME:
+        carousel["page_ms"] = now
+        carousel["page"] += 1
+        if carousel["page"] >= len(layout["pages"]):
+            carousel["page"] = 0
+            carousel["offset"] = 0
+            carousel["alert"] = (carousel["alert"] + 1) % count
+
+    # Only the regions whose inputs moved (normally just the strip) redraw
+    draw_alerts_screen(snap)
+
+@tracing.traced("fetch_metra_alerts")
 def fetch_metra_alerts():
     """Fetch service alerts from Metra GTFS-RT alerts feed"""
     alerts = []
@@ -1590,9 +2044,9 @@ def fetch_metra_alerts():
         # Metra alerts API returns protobuf (same as trip updates)
         url = f"{ALERTS_URL}?api_token={METRA_API_TOKEN}"
 
-        response = urequests.get(url, timeout=10)
+        response = http_get(UP_METRA_ALERTS, url, timeout=10)
         if response.status_code != 200:
-            print(f"Metra alerts API error: {response.status_code}")
+            log.error("Metra alerts API error: %s", response.status_code)
             response.close()
             return alerts
 
@@ -1601,9 +2055,16 @@ def fetch_metra_alerts():
         response.close()
 
         # Parse GTFS-RT alerts protobuf
-        data = parse_gtfs_alerts_protobuf(raw_content)
+        parse_start = time.ticks_ms()
+        try:
+            data = parse_gtfs_alerts_protobuf(raw_content)
+        except ParseTimeout as e:
+            log.warning("Metra alerts feed (%s bytes) %s; keeping the last alerts", len(raw_content), e)
+            raise
+        parse_duration.observe(time.ticks_diff(time.ticks_ms(), parse_start), UP_METRA_ALERTS)
         if not data or "entity" not in data:
             return alerts
+        parse_entities.inc(UP_METRA_ALERTS, len(data["entity"]))
 
         # Extract alerts
         for entity in data["entity"]:
@@ -1623,14 +2084,17 @@ def fetch_metra_alerts():
                     "routes": affected_routes
                 })
 
-        print(f"Metra: Found {len(alerts)} alerts")
+        log.debug("Metra: Found %s alerts", len(alerts))
 
 
+    except ParseTimeout:
+        raise  # fetch_alerts() keeps what it has
     except Exception as e:
-        print(f"Error fetching Metra alerts: {e}")
+        log.error("Error fetching Metra alerts: %s", e)
 
     return alerts
 
+@tracing.traced("fetch_cta_alerts")
 def fetch_cta_alerts():
     """Fetch service alerts from CTA alerts API"""
     alerts = []
@@ -1641,13 +2105,14 @@ def fetch_cta_alerts():
         # For now, return empty list
         # In the future, could scrape CTA alerts page or use their general transit feed
 
-        print("CTA: No alerts API available in Train Tracker")
+        log.debug("CTA: No alerts API available in Train Tracker")
 
     except Exception as e:
-        print(f"Error fetching CTA alerts: {e}")
+        log.error("Error fetching CTA alerts: %s", e)
 
     return alerts
 
+@tracing.traced("fetch_weather")
 def fetch_weather():
     """Fetch weather data from configured API service"""
     global weather_data
@@ -1656,7 +2121,7 @@ def fetch_weather():
         return
     
     try:
-        print("Fetching weather...")
+        log.debug("Fetching weather...")
         
         if WEATHER_API_SERVICE == "weathergov":
             # Weather.gov API (free, no key needed, US only)
@@ -1671,9 +2136,9 @@ def fetch_weather():
             points_url = f"https://api.weather.gov/points/{lat},{lon}"
             headers = {"User-Agent": "ChicagoTransitBoard/1.5.0"}
 
-            response = urequests.get(points_url, headers=headers, timeout=10)
+            response = http_get(UP_WEATHER, points_url, headers=headers, timeout=10)
             if response.status_code != 200:
-                print(f"Weather.gov points error: {response.status_code}")
+                log.error("Weather.gov points error: %s", response.status_code)
                 response.close()
                 return
 
@@ -1683,9 +2148,9 @@ def fetch_weather():
             forecast_url = points_data["properties"]["forecast"]
 
             # Step 2: Get forecast
-            response = urequests.get(forecast_url, headers=headers, timeout=10)
+            response = http_get(UP_WEATHER, forecast_url, headers=headers, timeout=10)
             if response.status_code != 200:
-                print(f"Weather.gov forecast error: {response.status_code}")
+                log.error("Weather.gov forecast error: %s", response.status_code)
                 response.close()
                 return
 
@@ -1717,11 +2182,11 @@ def fetch_weather():
         elif WEATHER_API_SERVICE == "openweathermap":
             # OpenWeatherMap API
             if not WEATHER_API_KEY:
-                print("OpenWeatherMap requires API key")
+                log.warning("OpenWeatherMap requires API key")
                 return
             
             url = f"https://api.openweathermap.org/data/2.5/weather?zip={WEATHER_ZIP_CODE},us&appid={WEATHER_API_KEY}&units=imperial"
-            response = urequests.get(url)
+            response = http_get(UP_WEATHER, url)
             data = response.json()
             response.close()
             
@@ -1749,19 +2214,26 @@ def fetch_weather():
                 weather_data["icon"] = "cloud"
         
         weather_data["last_update"] = time.time()
-        print(f"Weather: {weather_data['temp']}°F, {weather_data['condition']}")
+        publish_snapshot()
+        log.debug("Weather: %s°F, %s", weather_data['temp'], weather_data['condition'])
         
     except Exception as e:
-        print(f"Error fetching weather: {e}")
+        log.error("Error fetching weather: %s", e)
 
-def draw_weather_icon(x, y):
+def draw_weather_icon(x, y, icon=None):
     """Draw a simple weather icon at the given position"""
-    if not ENABLE_WEATHER or weather_data["icon"] is None:
-        return
-    
-    icon = weather_data["icon"]
+    if icon is None:
+        if not ENABLE_WEATHER or weather_data["icon"] is None:
+            return
+        icon = weather_data["icon"]
     
-    # Simple 5x5 pixel icons
+    # Pre-rendered sprite if the atlas has one
+    if glyphs is not None and glyphs.sprite(icon, x, y):
+        return
+    draw_weather_pixels(x, y, icon)
+
+def draw_weather_pixels(x, y, icon):
+    """Simple 5x5 pixel icons, for when the atlas isn't there"""
     display.set_pen(COLOR_YELLOW)
     
     if icon == "sun":
@@ -1834,195 +2306,195 @@ def adjust_brightness():
     
     return BRIGHTNESS
 
+@tracing.traced("draw_display")
 def draw_display():
-    """Update the LED display based on mode and direction"""
+    """Update the LED display based on mode and direction.
+
+    Draws from the latest published snapshot. Each view declares its
+    regions on the scene; only regions whose inputs changed are redrawn
+    and the panel is only updated when something did.
+    """
+    snap = display_state.read()
+    
     # Adjust brightness based on time
-    current_brightness = adjust_brightness()
-    try:
-        i75.set_brightness(current_brightness)
-    except AttributeError:
-        pass  # Newer firmware doesn't have this method
+    scene.set_brightness(adjust_brightness())
     
     # Check if we should show error screen
-    if not wifi_connected or (api_error and not cached_trains_available):
-        draw_error_screen()
-        return
-    
-    display.set_pen(COLOR_BLACK)
-    display.clear()
-    
-    if current_direction == "Alerts" and ENABLE_SERVICE_ALERTS and len(active_alerts) > 0:
+    if not snap.wifi_connected or (snap.api_error and not snap.cached_trains_available):
+        draw_error_screen(snap)
+    elif showing_alerts(snap):
         # Show alerts screen
-        draw_alerts_screen()
+        draw_alerts_screen(snap)
     elif dual_line_mode:
         # DUAL LINE MODE: Split screen - top and bottom
-        draw_dual_line_display()
+        draw_dual_line_display(snap)
     else:
         # SINGLE LINE MODE: Full screen
-        draw_single_line_display()
-    
-    # Draw weather icon in top-right corner if enabled
+        draw_single_line_display(snap)
+
+def add_weather_region(snap):
+    """Declare the weather region (top-right corner) if weather is shown"""
+    if not ENABLE_WEATHER or snap.weather_temp is None:
+        return
     # Position to the right of In/Out direction text
-    if ENABLE_WEATHER and WEATHER_DISPLAY_MODE == "icon_only" and weather_data["temp"] is not None:
-        draw_weather_icon(120, 2)
-    elif ENABLE_WEATHER and WEATHER_DISPLAY_MODE == "icon_and_temp" and weather_data["temp"] is not None:
-        # Show temp to the right of "In"/"Out" text (which ends around x=115)
-        temp_pen = hex_to_pen(COLOR_WEATHER)
-        display.set_pen(temp_pen)
-        temp_text = f"{weather_data['temp']}"
-        # Position temp at x=108 (right after "In"/"Out" which is at x=100)
-        temp_x = 108
-        display.text(temp_text, temp_x, 2, scale=1)
-        # Icon after temp text
-        draw_weather_icon(temp_x + len(temp_text) * 6 + 1, 2)
-    
-    i75.update()
-
-def draw_single_line_display():
+    if WEATHER_DISPLAY_MODE == "icon_only":
+        scene.region("weather", 118, 0, 10, 10, (None, snap.weather_icon), _draw_weather)
+    elif WEATHER_DISPLAY_MODE == "icon_and_temp":
+        scene.region("weather", 108, 0, 20, 10, (snap.weather_temp, snap.weather_icon), _draw_weather)
+
+def _draw_weather(temp, icon):
+    if temp is None:
+        draw_weather_icon(120, 2, icon)
+        return
+    # Show temp to the right of "In"/"Out" text (which ends around x=115)
+    display.set_pen(hex_to_pen(COLOR_WEATHER))
+    temp_text = f"{temp}"
+    # Position temp at x=108 (right after "In"/"Out" which is at x=100)
+    temp_x = 108
+    draw_text(temp_text, temp_x, 2)
+    # Icon after temp text
+    draw_weather_icon(temp_x + text_width(temp_text) + 1, 2, icon)
+
+def add_alert_icon_region(name, y, h, has_alerts):
+    """Declare the "!" alert icon region at the start of a train row"""
+    scene.region(name, 0, y, 8, h, (y, ENABLE_ALERT_ICONS and has_alerts), _draw_alert_icon)
+
+def _draw_alert_icon(y, show):
+    if show:
+        display.set_pen(COLOR_RED)
+        draw_text("!", 2, y)
+
+def _draw_train_row(y, train_text, minutes, has_alert):
+    """Draw route text on the left and the countdown on the right"""
+    display.set_pen(hex_to_pen(COLOR_TRAIN_INFO))
+    draw_text(train_text, 10 if has_alert else 2, y)
+    
+    # Time on the right
+    time_text = format_time(minutes)
+    display.set_pen(get_time_color(minutes))
+    time_x = 128 - text_width(time_text) - 5
+    draw_text(time_text, time_x, y)
+
+def _draw_message(text, x, y):
+    display.set_pen(COLOR_WHITE)
+    draw_text(text, x, y)
+
+def _draw_single_header(station_name, dir_text):
+    # Header - Station name (smaller for 32px height)
+    display.set_pen(hex_to_pen(COLOR_STATION_NAME))
+    draw_text(station_name, 2, 1)
+    
+    # Direction indicator
+    display.set_pen(hex_to_pen(COLOR_DIRECTION))
+    draw_text(dir_text, 100, 1)
+
+# Last "Display:" line printed, so it's only logged when it changes
+_last_display_log = None
+
+@tracing.traced("draw_single_line_display")
+def draw_single_line_display(snap):
     """Draw display for single line (full screen 128x32)"""
+    global _last_display_log
+    
     # Get trains based on mode
     if station_rotation_enabled:
         # Station rotation mode: get from cache
-        if current_station_index in station_cache:
-            cache = station_cache[current_station_index]
+        if current_station_index in snap.station_cache:
+            cache = snap.station_cache[current_station_index]
             trains = cache["inbound"] if current_direction == "Inbound" else cache["outbound"]
             station = ROTATION_STATIONS[current_station_index]
             station_name = station['name']
-            line_color = get_line_color(station['line'])
         else:
             trains = []
             station_name = "Loading..."
-            line_color = COLOR_WHITE
     else:
         # Single line mode
-        trains = line1_inbound if current_direction == "Inbound" else line1_outbound
+        trains = snap.line1_inbound if current_direction == "Inbound" else snap.line1_outbound
         station_name = STATION_STOP_ID
-        line_color = get_line_color(LINE_1)
     
-    # Header - Station name with line color (smaller for 32px height)
-    station_pen = hex_to_pen(COLOR_STATION_NAME)
-    display.set_pen(station_pen)
-    display.text(station_name, 2, 1, scale=1)
+    if log.level <= log.DEBUG:
+        log_key = (station_name, current_direction, len(trains))
+        if log_key != _last_display_log:
+            _last_display_log = log_key
+            if len(trains) == 0:
+                log.debug("Display: %s %s - No trains", station_name, current_direction)
+            else:
+                log.debug("Display: %s %s - %s trains", station_name, current_direction, len(trains))
     
-    # Direction indicator
-    direction_pen = hex_to_pen(COLOR_DIRECTION)
-    display.set_pen(direction_pen)
+    scene.begin("single")
     dir_text = "In" if current_direction == "Inbound" else "Out"
-    display.text(dir_text, 100, 1, scale=1)
+    scene.region("header", 0, 0, 128, 11, (station_name, dir_text), _draw_single_header)
+    add_weather_region(snap)
     
     if len(trains) == 0:
-        display.set_pen(COLOR_WHITE)
-        display.text("No trains", 35, 15, scale=1)
-        i75.update()
-        print(f"Display: {station_name} {current_direction} - No trains")
-        return
+        scene.region("empty", 0, 11, 128, 21, ("No trains", 35, 15), _draw_message)
+    else:
+        # Show up to 2 trains (adjusted for 32px height)
+        y_start = 12
+        has_alerts = ENABLE_ALERT_ICONS and snap.line1_has_alerts
+        for i, train in enumerate(trains[:2]):
+            y = y_start + (i * 10)
+            
+            # Format: "UP-N, Inbound" or "UP-N, Outbound"
+            # Normalize CTA line names (Brn -> Brown, G -> Green, etc.)
+            route_display = normalize_cta_line_name(train.route)
+            train_text = f"{route_display}, {train.direction}"
+            
+            scene.region(f"row{i}", 0, y, 128, 10,
+                         (y, train_text, train.get_minutes(), has_alerts), _draw_train_row)
+            # Show alert icon if this line has alerts
+            add_alert_icon_region(f"alert{i}", y, 10, has_alerts)
     
-    # Show up to 2 trains (adjusted for 32px height)
-    y_start = 12
-    print(f"Display: {station_name} {current_direction} - {len(trains)} trains")
-    for i, train in enumerate(trains[:2]):
-        y = y_start + (i * 10)
-        
-        # Format: "UP-N, Inbound" or "UP-N, Outbound"
-        # Normalize CTA line names (Brn -> Brown, G -> Green, etc.)
-        route_display = normalize_cta_line_name(train.route)
-        train_text = f"{route_display}, {train.direction}"
-        
-        # Show alert icon if this line has alerts
-        train_info_pen = hex_to_pen(COLOR_TRAIN_INFO)
-        if ENABLE_ALERT_ICONS and line1_has_alerts:
-            display.set_pen(COLOR_RED)
-            display.text("!", 2, y, scale=1)
-            display.set_pen(train_info_pen)
-            display.text(train_text, 10, y, scale=1)
-        else:
-            display.set_pen(train_info_pen)
-            display.text(train_text, 2, y, scale=1)
-        
-        # Time on the right
-        time_text = format_time(train.get_minutes())
-        time_color = get_time_color(train.get_minutes())
-        
-        display.set_pen(time_color)
-        time_x = 128 - (len(time_text) * 6) - 5
-        display.text(time_text, time_x, y, scale=1)
+    scene.commit()
 
-def draw_dual_line_display():
-    """Draw display for two lines (split screen for 128x32 - 16px each half)"""
-    # TOP HALF - Line 1 (y=0 to y=15)
-    line1_color = get_line_color(LINE_1)
-    display.set_pen(line1_color)
+def _draw_line_label(text, pen, y):
+    display.set_pen(pen)
+    draw_text(text, 2, y)
+
+def _draw_divider():
+    # Dotted divider line at y=16 (middle of 32px display)
+    if glyphs is not None and glyphs.sprite("divider", 0, 16):
+        return
+    display.set_pen(COLOR_WHITE)
+    for x in range(0, 128, 4):
+        display.pixel(x, 16)
+
+def _add_dual_half(n, line_code, trains, has_alerts, y):
+    """Declare label and first-train regions for one half of the dual display"""
     # Normalize line name for display (convert Brn -> Brown, etc.)
-    line1_display = normalize_cta_line_name(LINE_1)
-    display.text(line1_display, 2, 0, scale=1)
+    scene.region(f"line{n}", 0, y, 128, 8,
+                 (normalize_cta_line_name(line_code), get_line_color(line_code), y), _draw_line_label)
     
-    trains1 = line1_inbound if current_direction == "Inbound" else line1_outbound
-    if len(trains1) > 0:
-        train = trains1[0]  # Show first train only
+    row_y = y + 8
+    if len(trains) > 0:
+        train = trains[0]  # Show first train only
+        has_alerts = ENABLE_ALERT_ICONS and has_alerts
         # Normalize CTA line names
-        route_display = normalize_cta_line_name(train.route)
-        train_text = f"{route_display}"
-        
+        scene.region(f"row{n}", 0, row_y, 128, 8,
+                     (row_y, normalize_cta_line_name(train.route), train.get_minutes(), has_alerts),
+                     _draw_train_row)
         # Show alert icon if line has alerts
-        train_info_pen = hex_to_pen(COLOR_TRAIN_INFO)
-        if ENABLE_ALERT_ICONS and line1_has_alerts:
-            display.set_pen(COLOR_RED)
-            display.text("!", 2, 8, scale=1)
-            display.set_pen(train_info_pen)
-            display.text(train_text, 10, 8, scale=1)
-        else:
-            display.set_pen(train_info_pen)
-            display.text(train_text, 2, 8, scale=1)
-        
-        time_text = format_time(train.get_minutes())
-        time_color = get_time_color(train.get_minutes())
-        display.set_pen(time_color)
-        time_x = 128 - (len(time_text) * 6) - 5
-        display.text(time_text, time_x, 8, scale=1)
+        add_alert_icon_region(f"alert{n}", row_y, 8, has_alerts)
     else:
-        display.set_pen(COLOR_WHITE)
-        display.text("No trains", 40, 8, scale=1)
+        scene.region(f"row{n}", 0, row_y, 128, 8, ("No trains", 40, row_y), _draw_message)
+
+@tracing.traced("draw_dual_line_display")
+def draw_dual_line_display(snap):
+    """Draw display for two lines (split screen for 128x32 - 16px each half)"""
+    scene.begin("dual")
     
-    # Divider line at y=16 (middle of 32px display)
-    for x in range(0, 128, 4):
-        display.set_pen(COLOR_WHITE)
-        display.pixel(x, 16)
+    # TOP HALF - Line 1 (y=0 to y=15)
+    trains1 = snap.line1_inbound if current_direction == "Inbound" else snap.line1_outbound
+    _add_dual_half(1, LINE_1, trains1, snap.line1_has_alerts, 0)
     
-    # BOTTOM HALF - Line 2 (y=17 to y=31)
-    line2_color = get_line_color(LINE_2)
-    display.set_pen(line2_color)
-    # Normalize line name for display (convert Brn -> Brown, etc.)
-    line2_display = normalize_cta_line_name(LINE_2)
-    display.text(line2_display, 2, 17, scale=1)
+    scene.region("divider", 0, 16, 128, 1, (), _draw_divider)
     
-    trains2 = line2_inbound if current_direction == "Inbound" else line2_outbound
-    if len(trains2) > 0:
-        train = trains2[0]  # Show first train only
-        # Normalize CTA line names
-        route_display = normalize_cta_line_name(train.route)
-        train_text = f"{route_display}"
-        
-        # Show alert icon if line has alerts
-        train_info_pen = hex_to_pen(COLOR_TRAIN_INFO)
-        if ENABLE_ALERT_ICONS and line2_has_alerts:
-            display.set_pen(COLOR_RED)
-            display.text("!", 2, 25, scale=1)
-            display.set_pen(train_info_pen)
-            display.text(train_text, 10, 25, scale=1)
-        else:
-            display.set_pen(train_info_pen)
-            display.text(train_text, 2, 25, scale=1)
-        
-        time_text = format_time(train.get_minutes())
-        time_color = get_time_color(train.get_minutes())
-        display.set_pen(time_color)
-        time_x = 128 - (len(time_text) * 6) - 5
-        display.text(time_text, time_x, 25, scale=1)
-    else:
-        display.set_pen(COLOR_WHITE)
-        display.text("No trains", 40, 25, scale=1)
+    # BOTTOM HALF - Line 2 (y=17 to y=31)
+    trains2 = snap.line2_inbound if current_direction == "Inbound" else snap.line2_outbound
+    _add_dual_half(2, LINE_2, trains2, snap.line2_has_alerts, 17)
     
-    i75.update()
+    add_weather_region(snap)
+    scene.commit()
 
 def format_time(minutes):
     """Format minutes into display string"""
@@ -2042,137 +2514,830 @@ def get_time_color(minutes):
     else:
         return COLOR_WHITE
 
-def draw_alerts_screen():
-    """Draw full-screen alerts display"""
+def _draw_alerts_title(number, count):
     display.set_pen(COLOR_RED)
-    display.text("SERVICE ALERTS", 10, 2, scale=1)
-    
-    if len(active_alerts) == 0:
-        display.set_pen(COLOR_WHITE)
-        display.text("No active alerts", 10, 25, scale=1)
-        i75.update()
-        return
-    
-    # Show first alert (could scroll through multiple)
-    alert = active_alerts[0]
-    
-    y = 15
+    draw_text("SERVICE ALERTS" if count == 1 else f"ALERT {number}/{count}", 10, 2)
+
+def _draw_alert_strip(header, width, offset):
+    # Marquee - a second copy follows the first so the loop is seamless
     display.set_pen(COLOR_YELLOW)
-    
-    # Display header (truncate if too long)
-    header = alert.get('header', 'Alert')
-    if len(header) > 20:
-        header = header[:20] + "..."
-    display.text(header, 2, y, scale=1)
-    
-    # Show affected routes
-    y += 12
+    draw_text(header, 2 - offset, 12)
+    if width > ALERT_TEXT_WIDTH:
+        draw_text(header, 2 - offset + width + MARQUEE_GAP, 12)
+
+def _draw_alert_page(text):
     display.set_pen(COLOR_WHITE)
-    routes = alert.get('routes', [])
-    if routes:
-        routes_text = "Lines: " + ", ".join(routes[:3])
-        display.text(routes_text, 2, y, scale=1)
-    
-    # Show description (first line only)
-    y += 12
-    desc = alert.get('description', '')
-    if desc and len(desc) > 0:
-        # Take first 40 chars
-        desc_line = desc[:40]
-        if len(desc) > 40:
-            desc_line += "..."
-        display.text(desc_line, 2, y, scale=1)
-    
-    i75.update()
-
-def draw_error_screen():
-    """Display error messages when WiFi or API fails"""
-    display.set_pen(COLOR_BLACK)
-    display.clear()
+    draw_text(text, 2, 22)
+
+@tracing.traced("draw_alerts_screen")
+def draw_alerts_screen(snap):
+    """Draw full-screen alerts display (one carousel page of one alert)"""
+    scene.begin("alerts")
+    alerts = snap.active_alerts
+    count = len(alerts)
+    
+    if count == 0:
+        scene.region("title", 0, 0, 128, 11, (1, 1), _draw_alerts_title)
+        scene.region("alert", 0, 11, 128, 21, ("No active alerts", 10, 25), _draw_message)
+    else:
+        carousel = alert_carousel
+        index = carousel["alert"] % count
+        layout = alerts[index].get("layout")
+        if layout is None:
+            # Alerts normally get laid out at fetch time
+            prepare_alert_layouts(alerts)
+            layout = alerts[index]["layout"]
+        pages = layout["pages"]
+        
+        scene.region("title", 0, 0, 128, 11, (index + 1, count), _draw_alerts_title)
+        # Only this strip changes on marquee ticks
+        scene.region("strip", 0, 11, 128, 10,
+                     (layout["header"], layout["header_w"], carousel["offset"]), _draw_alert_strip)
+        scene.region("page", 0, 21, 128, 11, (pages[carousel["page"] % len(pages)],), _draw_alert_page)
     
+    add_weather_region(snap)
+    scene.commit()
+
+def _draw_error(no_wifi, api_failed):
     # Error header in red
     display.set_pen(COLOR_RED)
     display.text("ERROR", 35, 5, scale=2)
     
     # Specific error message
     display.set_pen(COLOR_WHITE)
-    if not wifi_connected:
-        display.text("No WiFi", 30, 25, scale=1)
-        display.text("Connection", 20, 35, scale=1)
+    if no_wifi:
+        draw_text("No WiFi", 30, 25)
+        draw_text("Connection", 20, 35)
         display.set_pen(COLOR_YELLOW)
-        display.text("Check SSID/", 15, 50, scale=1)
-        display.text("Password", 25, 57, scale=1)
-    elif api_error:
-        display.text("API Error", 25, 25, scale=1)
+        draw_text("Check SSID/", 15, 50)
+        draw_text("Password", 25, 57)
+    elif api_failed:
+        draw_text("API Error", 25, 25)
         display.set_pen(COLOR_YELLOW)
-        display.text("Check Token", 15, 40, scale=1)
-        display.text("in config.py", 10, 50, scale=1)
-    
-    i75.update()
+        draw_text("Check Token", 15, 40)
+        draw_text("in config.py", 10, 50)
+
+@tracing.traced("draw_error_screen")
+def draw_error_screen(snap=None):
+    """Display error messages when WiFi or API fails"""
+    if snap is None:
+        snap = display_state.read()
+    scene.begin("error")
+    scene.region("error", 0, 0, 128, 32, (not snap.wifi_connected, snap.api_error), _draw_error)
+    scene.commit()
+
+# ===== SECOND CORE FETCHER =====
+FETCH_STACK_SIZE = 16 * 1024  # Protobuf parsing and TLS need more than the default
+
+fetch_worker = Worker("fetch")
+
+def fetch_loop(worker):
+    """Periodic fetch/parse loop run on core 1 when ENABLE_DUAL_CORE is set.
+
+    Does the same fetches main_loop() would; results reach the render
+    task through publish_snapshot(). WiFi reconnects, the web portal and
+    auto-update stay on core 0.
+    """
+    last_update = time.time()
+    last_alerts_update = time.time()
+    last_weather_update = time.time()
+    while worker.running:
+        worker.beat()
+        current_time = time.time()
+        
+        if wifi_connected:
+            dns_cache.refresh_due()
+        
+        if current_time - last_update >= UPDATE_INTERVAL:
+            if wifi_connected:
+                fetch_trains()
+            last_update = current_time
+        
+        if ENABLE_SERVICE_ALERTS and wifi_connected and (current_time - last_alerts_update >= ALERTS_UPDATE_INTERVAL):
+            fetch_alerts()
+            last_alerts_update = current_time
+        
+        if ENABLE_WEATHER and wifi_connected and (current_time - last_weather_update >= WEATHER_UPDATE_INTERVAL):
+            fetch_weather()
+            last_weather_update = current_time
+        
+        time.sleep_ms(100)
+
+# ===== RENDER TASK =====
+render_stats = {
+    "frames": 0,
+    "last_start": None,    # ticks_ms() of the last frame
+    "frame_us_last": 0,    # Time spent in draw_display()
+    "frame_us_max": 0,
+    "interval_ms_last": 0, # Time between frame starts
+    "jitter_ms_last": 0,   # |interval - period|
+    "jitter_ms_max": 0,
+    "jitter_ms_total": 0,
+}
+
+def render_frame():
+    """Draw the latest snapshot (run every frame period by the render task).
+
+    The supervisor schedules frames against absolute deadlines, so a slow
+    frame doesn't push every later frame back. If a frame is missed
+    entirely (e.g. during a blocking fetch) the schedule restarts from now
+    rather than drawing a burst of catch-up frames.
+    """
+    start = time.ticks_ms()
+    last_start = render_stats["last_start"]
+    if last_start is not None:
+        interval = time.ticks_diff(start, last_start)
+        jitter = abs(interval - 1000 // max(1, RENDER_FPS))
+        render_stats["interval_ms_last"] = interval
+        render_stats["jitter_ms_last"] = jitter
+        render_stats["jitter_ms_total"] += jitter
+        if jitter > render_stats["jitter_ms_max"]:
+            render_stats["jitter_ms_max"] = jitter
+    render_stats["last_start"] = start
+
+    frame_start = time.ticks_us()
+    try:
+        draw_display()
+    except Exception as e:
+        log.error("Render error: %s", e)
+    frame_us = time.ticks_diff(time.ticks_us(), frame_start)
+    frame_render.observe(frame_us)
+    if gc_monitor.sample():
+        tracing.mark(GC_SPAN)
+    render_stats["frames"] += 1
+    render_stats["frame_us_last"] = frame_us
+    if frame_us > render_stats["frame_us_max"]:
+        render_stats["frame_us_max"] = frame_us
+
+def get_render_stats():
+    """Render timing statistics for /api/status"""
+    frames = render_stats["frames"]
+    task = supervisor.find("render")
+    return {
+        "fps_target": RENDER_FPS,
+        "frames": frames,
+        "overruns": task.overruns if task else 0,  # Frames started a whole period (or more) late
+        "frame_us_last": render_stats["frame_us_last"],
+        "frame_us_max": render_stats["frame_us_max"],
+        "interval_ms_last": render_stats["interval_ms_last"],
+        "jitter_ms_last": render_stats["jitter_ms_last"],
+        "jitter_ms_max": render_stats["jitter_ms_max"],
+        "jitter_ms_avg": render_stats["jitter_ms_total"] // (frames - 1) if frames > 1 else 0,
+    }
+
+# ===== SELF-BENCHMARK =====
+BENCH_MIN_INTERVAL = 120    # Seconds between /api/bench runs
+BENCH_FIXTURES = ("small", "rush_hour")  # worst_case doesn't fit in the board's heap
+BENCH_MAX_FRAMES = 200
+BENCH_MAX_REPEAT = 10
+BENCH_BUDGET_MS = 7000      # Longest blocking step (one parse, one redraw)
+
+bench_state = {
+    "running": False,
+    "step": None,        # What the running benchmark is doing
+    "started": None,     # time.time() of the last run
+    "result": None,      # Results of the last completed run
+    "error": None,
+}
+
+def bench_retry_after():
+    """Seconds until /api/bench may start another run (0 = now)"""
+    if bench_state["running"]:
+        return BENCH_MIN_INTERVAL
+    if bench_state["started"] is None:
+        return 0
+    return int(max(0, bench_state["started"] + BENCH_MIN_INTERVAL - time.time()))
+
+def start_bench(params):
+    """Start a benchmark run in the background with options from the query string"""
+    import uasyncio
+    fixture = params.get("fixture", "small")
+    if fixture not in BENCH_FIXTURES:
+        fixture = "small"
+    try:
+        frames = min(max(1, int(params.get("frames", 50))), BENCH_MAX_FRAMES)
+        repeat = min(max(1, int(params.get("repeat", 3))), BENCH_MAX_REPEAT)
+    except ValueError:
+        frames, repeat = 50, 3
+    bench_state["running"] = True
+    bench_state["started"] = time.time()
+    bench_state["error"] = None
+    uasyncio.create_task(bench_task(fixture, frames, repeat))
+
+BENCH_TEXTS = ("UP-N 12 min", "Ravenswood", "Due")
+
+def atlas_timings(bench, repeat=10):
+    """Best draw times (us): atlas vs display.text for a few strings, and
+    atlas sprites vs the pixel-drawn icons"""
+    display.set_pen(COLOR_BLACK)
+    texts = {}
+    for text in BENCH_TEXTS:
+        texts[text] = glyphs.compare(text, repeat=repeat)
+    sprites = {}
+    for icon in ("sun", "cloud", "rain", "snow"):
+        if icon not in glyphs.sprites:
+            continue
+        sprite = bench.Timing()
+        pixels = bench.Timing()
+        for _ in range(repeat):
+            sprite.run(glyphs.sprite, (icon, 0, 0))
+            pixels.run(draw_weather_pixels, (0, 0, icon))
+        sprites[icon] = {"atlas_us": sprite.best, "pixels_us": pixels.best}
+    return {"draw_strings": glyphs.draw_strings, "text": texts, "sprites": sprites}
+
+async def bench_task(fixture, frames, repeat):
+    """Time the parsers, N full redraws and heap churn on this board.
+
+    Runs one step (a single parse, one redraw) at a time with a frame
+    period's sleep in between, so the render task keeps drawing while the
+    benchmark is in progress. Each step runs in the supervisor's "bench"
+    section, so it is charged to the benchmark and held to BENCH_BUDGET_MS.
+    """
+    import uasyncio
+    import gc
+    import bench
+    gap = 1000 // max(1, RENDER_FPS)
+    result = {"fixture": fixture, "parsers": {}, "render": None, "atlas": None, "heap": None}
+    try:
+        result["firmware"] = os.uname().version
+        result["machine"] = os.uname().machine
+    except AttributeError:
+        pass
+    try:
+        bench_state["step"] = "fixture"
+        with supervisor.section("bench", BENCH_BUDGET_MS):
+            data = bench.make_fixture(fixture)
+        await uasyncio.sleep_ms(gap)
+        for name, func, arg, entities in bench.parser_jobs(parse_gtfs_protobuf, parse_gtfs_alerts_protobuf,
+                                                           parse_cta_arrivals, data):
+            bench_state["step"] = name
+            timing = bench.Timing()
+            for _ in range(repeat):
+                with supervisor.section("bench", BENCH_BUDGET_MS):
+                    timing.run(func, (arg,))
+                await uasyncio.sleep_ms(gap)
+            with supervisor.section("bench", BENCH_BUDGET_MS):
+                # The parsers checkpoint as they go; sample free heap there
+                supervisor.checkpoint_hook = bench.sample_memory
+                try:
+                    memory = bench.measure_memory(func, (arg,))
+                finally:
+                    supervisor.checkpoint_hook = None
+            result["parsers"][name] = bench.rates(timing.stats(*memory), entities, len(arg))
+            await uasyncio.sleep_ms(gap)
+        data = None
+
+        # Full redraws of whatever is on screen (every region dirty)
+        bench_state["step"] = "render"
+        total = 0
+        best = None
+        worst = 0
+        for _ in range(frames):
+            scene.invalidate()
+            with supervisor.section("bench", BENCH_BUDGET_MS):
+                start = time.ticks_us()
+                draw_display()
+                elapsed = time.ticks_diff(time.ticks_us(), start)
+            total += elapsed
+            best = elapsed if best is None else min(best, elapsed)
+            worst = max(worst, elapsed)
+            await uasyncio.sleep_ms(gap)
+        result["render"] = {"frames": frames, "best_us": best, "avg_us": total // frames, "max_us": worst}
+
+        if glyphs is not None:
+            bench_state["step"] = "atlas"
+            with supervisor.section("bench", BENCH_BUDGET_MS):
+                result["atlas"] = atlas_timings(bench)
+            scene.invalidate()
+            await uasyncio.sleep_ms(gap)
+
+        bench_state["step"] = "heap"
+        rounds = []
+        for _ in range(3):
+            with supervisor.section("bench", BENCH_BUDGET_MS):
+                rounds.append(bench.heap_churn())
+            await uasyncio.sleep_ms(gap)
+        result["heap"] = {"rounds": rounds}
+        if bench.MICROPYTHON:
+            result["heap"]["mem_free"] = gc.mem_free()
+            result["heap"]["mem_alloc"] = gc.mem_alloc()
+        result["duration_s"] = time.time() - bench_state["started"]
+        bench_state["result"] = result
+        log.info("Benchmark done (%s, %s frames)", fixture, frames)
+    except Exception as e:
+        bench_state["error"] = str(e)
+        log.error("Benchmark error: %s", e)
+    finally:
+        bench_state["running"] = False
+        bench_state["step"] = None
+
+def get_bench_status():
+    """Benchmark state and last results for /api/bench"""
+    return {
+        "running": bench_state["running"],
+        "step": bench_state["step"],
+        "retry_after": bench_retry_after(),
+        "error": bench_state["error"],
+        "result": bench_state["result"],
+    }
+
+# ===== CONFIG PORTAL =====
+import httpd
+import hashlib
+import binascii
+
+CORS = 'Access-Control-Allow-Origin: *\r\n'
+EVENTS_INTERVAL_MS = 2000  # How often /api/events topics are checked for changes
+EVENTS_MAX_CLIENTS = 3     # Open /api/events streams; more get 503
+
+portal_server = None
+event_hub = httpd.EventHub(EVENTS_MAX_CLIENTS)
+
+# Portal UI from flash (optional - build with host/build_web.py); without
+# it LOADER_PAGE pulls the UI from the CDN
+import webassets
+web_assets = webassets.load()
+if web_assets is not None:
+    log.info("Web assets loaded: %s files", len(web_assets.files))
+
+LOADER_PAGE = 'loader.html'  # Links the UI on the CDN; web.bin has a local copy
+
+def _portal_outcomes():
+    if not portal_server:
+        return None
+    rejected = portal_server.get_stats()['rejected']
+    return [('served', portal_server.requests), ('busy', rejected['busy']),
+            ('rate_limited', rejected['rate']), ('too_large', rejected['size'])]
+
+metrics.Collector("portal_requests_total", "Config portal requests served or turned away",
+                  _portal_outcomes, "counter", "outcome")
+
+def render_due_ms():
+    """ms until the next frame is due (negative when it's late)"""
+    task = supervisor.find("render")
+    return time.ticks_diff(task.due, time.ticks_ms()) if task else None
+
+async def start_portal_server():
+    """Start the config portal HTTP server, or None if it can't listen"""
+    try:
+        server = await httpd.Server(portal_handler, 80).start(backlog=5)
+        server.priority = render_due_ms  # Requests wait for a frame that's about due
+        wlan = network.WLAN(network.STA_IF)
+        log.info("Config portal available at http://%s", wlan.ifconfig()[0])
+        return server
+    except Exception as e:
+        log.warning("Could not start config portal: %s", e)
+        return None
+
+def portal_status():
+    """The status fields shown on the portal's main page"""
+    import config_portal
+    status = config_portal.get_system_status()
+    return {
+        'version': status['version'],
+        'wifi_connected': status['wifi_connected'],
+        'uptime': f"{status['uptime'] // 3600}h {(status['uptime'] % 3600) // 60}m",
+        'memory_pct': int((status['free_memory'] / status['total_memory']) * 100) if status['total_memory'] else None,
+    }
+
+def trains_json(trains, minutes=True):
+    """Trains as dicts; without minutes the result only changes with the data"""
+    if minutes:
+        return [{'route': t.route, 'min': t.get_minutes(), 'at': int(t.arrival_timestamp)} for t in trains]
+    return [{'route': t.route, 'at': int(t.arrival_timestamp)} for t in trains]
+
+def arrivals_json(snap, minutes=True):
+    """Arrivals from a display snapshot, as served to the portal and LAN clients"""
+    stations = {}
+    for index, cache in snap.station_cache.items():
+        stations[str(index)] = {'inbound': trains_json(cache['inbound'], minutes),
+                                'outbound': trains_json(cache['outbound'], minutes)}
+    return {
+        'line1': LINE_1,
+        'line2': LINE_2,
+        'line1_inbound': trains_json(snap.line1_inbound, minutes),
+        'line1_outbound': trains_json(snap.line1_outbound, minutes),
+        'line2_inbound': trains_json(snap.line2_inbound, minutes),
+        'line2_outbound': trains_json(snap.line2_outbound, minutes),
+        'station_cache': stations,
+    }
+
+def alerts_json(snap):
+    """Alerts without their carousel layouts"""
+    return {
+        'alerts': [{'header': a.get('header', ''), 'description': a.get('description', ''),
+                    'routes': a.get('routes', [])} for a in snap.active_alerts],
+        'line1_has_alerts': snap.line1_has_alerts,
+        'line2_has_alerts': snap.line2_has_alerts,
+    }
+
+# Endpoint -> (snapshot version, ETag, JSON body): each published snapshot
+# is encoded and hashed once, however many clients ask for it
+_snapshot_json = {}
+
+def snapshot_json(name, snap, build):
+    """(etag, body) of build()'s JSON for snap; the ETag is a digest of the body"""
+    cached = _snapshot_json.get(name)
+    if cached is None or cached[0] != snap.version:
+        import json
+        with supervisor.section('portal', PORTAL_BUDGET_MS):
+            body = json.dumps(build()).encode('utf-8')
+            etag = '"%s"' % binascii.hexlify(hashlib.sha256(body).digest()[:8]).decode()
+        cached = _snapshot_json[name] = (snap.version, etag, body)
+    return cached[1], cached[2]
+
+async def send_cached(req, resp, name, snap, build, last_fetch, interval):
+    """build()'s JSON for snap with a content ETag (see snapshot_json()),
+    cacheable until the next scheduled fetch; 304 if the client already has it"""
+    etag, body = snapshot_json(name, snap, build)
+    max_age = max(0, int(last_fetch + interval - time.time())) if last_fetch else 0
+    headers = f'ETag: {etag}\r\nCache-Control: max-age={max_age}\r\n' + CORS
+    if httpd.etag_matches(req, etag):
+        await resp.send('', 304, None, headers)
+    else:
+        await resp.send(body, 200, 'application/json', headers)
+
+async def send_json(resp, build, status=200, headers=''):
+    """Send build()'s JSON; building and encoding it block the loop, so
+    they run in the supervisor's 'portal' section"""
+    import json
+    with supervisor.section('portal', PORTAL_BUDGET_MS):
+        body = json.dumps(build())
+    await resp.send(body, status, 'application/json', headers)
+
+def publish_events():
+    """Hand the current state to the event hub; subscribers get what changed"""
+    snap = display_state.read()
+    event_hub.publish('status', portal_status())
+    arrivals = arrivals_json(snap)
+    # What the panel is showing, so the browser can mirror it
+    arrivals['view'] = current_direction
+    arrivals['station'] = str(current_station_index) if station_rotation_enabled else None
+    event_hub.publish('arrivals', arrivals)
+    if ENABLE_SERVICE_ALERTS:
+        event_hub.publish('alerts', alerts_json(snap))
+    event_hub.publish('metrics', {
+        'frames': render_stats['frames'],
+        'render_overruns': get_render_stats()['overruns'],
+        'heap_free': _heap_free(),
+        'portal_requests': portal_server.requests if portal_server else 0,
+        'snapshot': snap.version,
+    })
+
+def events_job():
+    if event_hub.subscribers:
+        publish_events()
+
+def query_params(req):
+    import config_portal
+    return config_portal.parse_form_data(req.query) if req.query else {}
+
+async def portal_handler(req, resp):
+    """Handle one config portal / API request"""
+    request_start = time.ticks_ms()
+    request_span = tracing.begin()
+    try:
+        await portal_route(req, resp)
+    finally:
+        portal_latency.observe(time.ticks_diff(time.ticks_ms(), request_start))
+        tracing.end(PORTAL_SPAN, request_span)
+
+def full_status():
+    """Everything /api/status reports"""
+    status_json = portal_status()
+    status_json.update({
+        'dns': dns_cache.get_stats(),
+        'display': scene.get_stats(),
+        'render': get_render_stats(),
+        'handoff': display_state.get_stats(),
+        'fetch_core': fetch_worker.get_stats() if ENABLE_DUAL_CORE else None,
+        'atlas': glyphs.get_stats() if glyphs is not None else None,
+        'tracing': tracing.get_stats(),
+        'logs': log.get_stats(),
+        'tasks': supervisor.get_stats(),
+        'watchdog': supervisor.get_watchdog_stats(),
+        'portal': portal_server.get_stats() if portal_server else None,
+        'events': event_hub.get_stats(),
+        'web_assets': web_assets.get_stats() if web_assets else None
+    })
+    return status_json
+
+async def portal_route(req, resp):
+    method = req.method
+    path = req.path
+    if method == 'GET' and (path == '/' or path == '/config'):
+        loader = web_assets.find('/') if web_assets else None
+        if loader:
+            await web_assets.send(req, resp, loader)
+        else:
+            try:
+                with open(LOADER_PAGE) as f:
+                    page = f.read()
+            except OSError:
+                page = None
+            if page:
+                await resp.send(page)
+            else:
+                await resp.send(LOADER_PAGE + ' is missing; run upload.py', 500, 'text/plain')
+        
+    elif method == 'GET' and path.startswith('/static/'):
+        # Content-hashed UI files from web.bin, cached by browsers for good
+        asset = web_assets.find(path) if web_assets else None
+        if asset:
+            await web_assets.send(req, resp, asset)
+        else:
+            await resp.send('', 404, None)
+        
+    elif method == 'GET' and path == '/api/config':
+        # Return config as JSON
+        import config_portal
+        await resp.json(config_portal.get_current_config(), headers=CORS)
+        
+    elif method == 'GET' and path == '/api/status':
+        await send_json(resp, full_status, headers=CORS)
+        
+    elif method == 'GET' and path == '/api/arrivals':
+        # What the board has fetched, for other devices on the LAN;
+        # 'at' is the arrival time (Unix seconds)
+        snap = display_state.read()
+        await send_cached(req, resp, 'arrivals', snap, lambda: arrivals_json(snap, False),
+                          last_trains_fetch, UPDATE_INTERVAL)
+        
+    elif method == 'GET' and path == '/api/alerts':
+        snap = display_state.read()
+        await send_cached(req, resp, 'alerts', snap, lambda: alerts_json(snap),
+                          last_alerts_fetch, ALERTS_UPDATE_INTERVAL)
+        
+    elif method == 'GET' and path == '/api/events':
+        # Server-Sent Events: status, arrivals, alerts and metrics,
+        # each sent when (and only as far as) it changes
+        with supervisor.section('portal', PORTAL_BUDGET_MS):
+            publish_events()  # So the first events are current
+        await event_hub.serve(resp, CORS)
+        
+    elif method == 'GET' and path == '/metrics':
+        # Prometheus text exposition, sent a metric at a time
+        await resp.start(200, 'text/plain; version=0.0.4')
+        await resp.stream(metrics.render())
+        
+    elif method == 'GET' and path == '/api/trace':
+        # Chrome trace JSON of the recorded spans; ?pause=1,
+        # ?resume=1 or ?clear=1 control recording instead
+        params = query_params(req)
+        if 'pause' in params or 'resume' in params or 'clear' in params:
+            if 'pause' in params:
+                tracing.pause()
+            if 'resume' in params:
+                tracing.resume()
+            if 'clear' in params:
+                tracing.clear()
+            await resp.json(tracing.get_stats(), headers=CORS)
+        else:
+            await resp.start(200, 'application/json',
+                             'Content-Disposition: attachment; filename="trace.json"\r\n' + CORS)
+            await resp.stream(tracing.chrome_trace())
+        
+    elif method == 'GET' and path == '/api/logs':
+        # Buffered log records; ?since=<seq> returns only newer
+        # ones, ?level=warning filters by level
+        params = query_params(req)
+        try:
+            since = int(params.get('since', 0))
+        except ValueError:
+            since = 0
+        min_level = log.parse_level(params.get('level', 'debug'), log.DEBUG)
+        await send_json(resp, lambda: {'seq': log.get_stats()['seq'], 'entries': log.entries(since, min_level)},
+                        headers=CORS)
+        
+    elif method == 'GET' and path == '/api/bench':
+        # Last benchmark results; ?run=1 starts a new run
+        # (at most one every BENCH_MIN_INTERVAL seconds)
+        params = query_params(req)
+        status = 200
+        retry = ''
+        if 'run' in params:
+            wait = bench_retry_after()
+            if wait:
+                status = 429
+                retry = f'Retry-After: {wait}\r\n'
+            else:
+                start_bench(params)
+                status = 202
+        await resp.json(get_bench_status(), status, retry + CORS)
+        
+    elif method == 'POST' and path == '/api/save':
+        # Parse JSON body and save config
+        import config_portal
+        import json
+        try:
+            data = json.loads(req.body.decode('utf-8') if req.body else '{}')
+            # Convert JSON to form params format
+            params = {}
+            for k, v in data.items():
+                if isinstance(v, bool):
+                    if v:
+                        params[k] = 'true'
+                else:
+                    params[k] = str(v)
+            # Preserve WiFi settings
+            params['wifi_ssid'] = WIFI_SSID
+            params['wifi_password'] = WIFI_PASSWORD
+            with supervisor.section('portal', PORTAL_BUDGET_MS):
+                saved = config_portal.save_config(params)
+        except Exception as e:
+            log.error("Save error: %s", e)
+            await resp.json({'error': str(e)}, 400)
+            return
+        if saved:
+            await resp.json({'success': True})
+            resp.writer.close()
+            await resp.writer.wait_closed()
+            sys.exit()
+        else:
+            await resp.json({'success': False}, 500)
+            
+    elif method == 'OPTIONS':
+        # Handle CORS preflight
+        await resp.send('', 200, None, CORS + 'Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n'
+                        'Access-Control-Allow-Headers: Content-Type\r\n')
+        
+    elif method == 'GET' and path == '/restart':
+        await resp.send('Restarting...', content_type='text/plain')
+        resp.writer.close()
+        await resp.writer.wait_closed()
+        import machine
+        machine.reset()
+    else:
+        await resp.send('', 404, None)
+
+# ===== SUPERVISED TASKS =====
+WIFI_CHECK_INTERVAL = 30     # Seconds between WiFi checks
+UPDATE_POLL_INTERVAL = 3600  # Seconds between looks at CHECK_UPDATE_INTERVAL
+
+last_update_check = 0
+
+def wifi_job():
+    """Reconnect WiFi if it dropped; re-resolve API hosts before their DNS entries expire"""
+    if not check_wifi_and_reconnect():
+        led_blink(1, 200, 100, r=100, g=0, b=0)  # Red blink to indicate offline
+        return
+    if not fetch_worker.running:
+        dns_cache.refresh_due()
+
+# Fetches happen here unless core 1 is doing them (it falls back to here
+# if the fetch thread dies). Each fetch publishes a new snapshot, which
+# the render task draws at its next frame.
+def trains_job():
+    if wifi_connected and not fetch_worker.running:
+        fetch_trains()
+
+def alerts_job():
+    if wifi_connected and not fetch_worker.running:
+        fetch_alerts()
+
+def weather_job():
+    if wifi_connected and not fetch_worker.running:
+        fetch_weather()
+
+def updater_job():
+    """Check for software updates every CHECK_UPDATE_INTERVAL"""
+    global last_update_check
+    if wifi_connected and time.time() - last_update_check >= CHECK_UPDATE_INTERVAL:
+        log.info("Periodic update check...")
+        try:
+            auto_update.check_for_updates()
+        except Exception as e:
+            log.error("Update check failed: %s", e)
+        last_update_check = time.time()
+
+def rotation_job():
+    """Rotate between views based on mode"""
+    global current_direction, current_station_index
+    if station_rotation_enabled:
+        # Station rotation mode: cycle through stations
+        # Each station shows Inbound → Outbound before moving to next station
+        if ENABLE_SERVICE_ALERTS and len(active_alerts) > 0:
+            # With alerts: Inbound -> Outbound -> Alerts -> next station
+            if current_direction == "Inbound":
+                current_direction = "Outbound"
+            elif current_direction == "Outbound":
+                current_direction = "Alerts"
+            else:
+                # After alerts, move to next station
+                current_direction = "Inbound"
+                current_station_index = (current_station_index + 1) % len(ROTATION_STATIONS)
+                # Train data will be fetched on next UPDATE_INTERVAL
+        else:
+            # No alerts: Inbound -> Outbound -> next station
+            if current_direction == "Inbound":
+                current_direction = "Outbound"
+            else:
+                # After outbound, move to next station
+                current_direction = "Inbound"
+                current_station_index = (current_station_index + 1) % len(ROTATION_STATIONS)
+                # Train data will be fetched on next UPDATE_INTERVAL
+        
+        station = ROTATION_STATIONS[current_station_index]
+        log.debug("Station: %s - %s", station['name'], current_direction)
+    else:
+        # Direction rotation mode (original behavior)
+        if ENABLE_SERVICE_ALERTS and len(active_alerts) > 0:
+            # Cycle: Inbound -> Outbound -> Alerts -> Inbound
+            if current_direction == "Inbound":
+                current_direction = "Outbound"
+            elif current_direction == "Outbound":
+                current_direction = "Alerts"
+            else:
+                current_direction = "Inbound"
+        else:
+            # No alerts: just toggle Inbound <-> Outbound
+            current_direction = "Outbound" if current_direction == "Inbound" else "Inbound"
+        
+        log.debug("Switched to %s", current_direction)
+
+# Watchdog budgets (ms): how far each task may fall behind schedule (not
+# counting time other tasks held the loop), and the longest gap between
+# checkpoints while it runs. Tune them with max_stall_ms in /api/status.
+DRAW_BUDGET_MS = 2000     # Render, alert animation, rotation
+NETWORK_BUDGET_MS = 7000  # One request or WiFi connect poll
+FETCH_CORE_BUDGET_MS = 30000  # One pass of the core 1 fetch loop
+PORTAL_BUDGET_MS = 2000   # Blocking part of one portal request (section)
+
+def start_tasks():
+    """Register the board's periodic tasks with the supervisor"""
+    supervisor.add("render", render_frame, 1000 // max(1, RENDER_FPS), budget_ms=DRAW_BUDGET_MS)
+    if ENABLE_SERVICE_ALERTS:
+        supervisor.add("alert_anim", alert_animation_job, ALERT_SCROLL_MS, ALERT_SCROLL_MS, DRAW_BUDGET_MS)
+    supervisor.add("rotation", rotation_job, DISPLAY_ROTATION_TIME * 1000, DISPLAY_ROTATION_TIME * 1000, DRAW_BUDGET_MS)
+    if portal_server:
+        supervisor.add("events", events_job, EVENTS_INTERVAL_MS, budget_ms=DRAW_BUDGET_MS)
+    supervisor.add("wifi", wifi_job, WIFI_CHECK_INTERVAL * 1000, WIFI_CHECK_INTERVAL * 1000, NETWORK_BUDGET_MS)
+    supervisor.add("trains", trains_job, UPDATE_INTERVAL * 1000, UPDATE_INTERVAL * 1000, NETWORK_BUDGET_MS)
+    if ENABLE_SERVICE_ALERTS:
+        supervisor.add("alerts", alerts_job, ALERTS_UPDATE_INTERVAL * 1000, ALERTS_UPDATE_INTERVAL * 1000, NETWORK_BUDGET_MS)
+    if ENABLE_WEATHER:
+        supervisor.add("weather", weather_job, WEATHER_UPDATE_INTERVAL * 1000, WEATHER_UPDATE_INTERVAL * 1000, NETWORK_BUDGET_MS)
+    if ENABLE_AUTO_UPDATE:
+        supervisor.add("updater", updater_job, UPDATE_POLL_INTERVAL * 1000, UPDATE_POLL_INTERVAL * 1000, NETWORK_BUDGET_MS)
+    if log.file_path:
+        # Write new log records to flash
+        supervisor.add("logs", log.flush, log.flush_interval * 1000, log.flush_interval * 1000, DRAW_BUDGET_MS)
+    if fetch_worker.running:
+        supervisor.monitor("fetch_core", lambda: fetch_worker.beat_age_ms() if fetch_worker.running else None,
+                           FETCH_CORE_BUDGET_MS)
 
 # ===== MAIN LOOP =====
 async def main_loop():
-    """Async main loop that runs alongside mDNS"""
-    global current_direction, current_station_index
-    import uasyncio
+    """Boot (WiFi, update check, first fetch), then run the supervised tasks"""
+    global portal_server, last_update_check
 
-    print("Metra Transit Board - Interstate 75 W")
+    log.info("Metra Transit Board - Interstate 75 W")
     
     # Read version
     try:
         with open("version.txt", "r") as f:
             version = f.read().strip()
-            print(f"Version: {version}")
+            log.info("Version: %s", version)
     except:
-        print("Version: unknown")
+        log.info("Version: unknown")
     
     # Debug: Show rotation mode config
-    print(f"ROTATION_MODE config: '{ROTATION_MODE}'")
-    print(f"ROTATION_STATIONS count: {len(ROTATION_STATIONS)}")
-    print(f"Station rotation enabled: {station_rotation_enabled}")
+    log.info("ROTATION_MODE config: '%s'", ROTATION_MODE)
+    log.info("ROTATION_STATIONS count: %s", len(ROTATION_STATIONS))
+    log.info("Station rotation enabled: %s", station_rotation_enabled)
     
     if station_rotation_enabled:
-        print(f"Mode: Station Rotation ({len(ROTATION_STATIONS)} stations)")
+        log.info("Mode: Station Rotation (%s stations)", len(ROTATION_STATIONS))
         for i, station in enumerate(ROTATION_STATIONS):
             transit_type = station.get('transit_type', 'metra')
-            print(f"  {i+1}. {station['name']} - {station['line']} ({transit_type})")
+            log.info("  %s. %s - %s (%s)", i+1, station['name'], station['line'], transit_type)
     else:
-        print(f"Mode: Direction Rotation")
-        print(f"Station: {STATION_STOP_ID}")
-        print(f"Line(s): {LINE_1}" + (f" and {LINE_2}" if dual_line_mode else ""))
-    
-    # Initialize watchdog timer if enabled
-    wdt = None
-    if False:  # DISABLED FOR TESTING - was: if ENABLE_WATCHDOG:
-        try:
-            wdt = WDT(timeout=WATCHDOG_TIMEOUT)
-            print(f"Watchdog enabled: {WATCHDOG_TIMEOUT}ms timeout")
-        except Exception as e:
-            print(f"Warning: Could not enable watchdog: {e}")
-            wdt = None
+        log.info("Mode: Direction Rotation")
+        log.info("Station: %s", STATION_STOP_ID)
+        log.info("Line(s): %s%s", LINE_1, " and " + LINE_2 if dual_line_mode else "")
     
     # Connect to WiFi
     if not connect_wifi():
         # WiFi failed - enter setup portal so user can fix credentials
-        print("Initial WiFi connect failed. Entering setup portal...")
+        log.error("Initial WiFi connect failed. Entering setup portal...")
         try:
             import setup_portal
             setup_portal.run_server()  # Blocks until user saves config and device restarts
         except Exception as e:
-            print(f"Setup portal failed to start: {e}")
+            log.error("Setup portal failed to start: %s", e)
             # Show error screen and halt if portal cannot start
             draw_error_screen()
-            print("Cannot start without WiFi")
+            log.error("Cannot start without WiFi")
             return
     
     # Check for updates if enabled
     if ENABLE_AUTO_UPDATE:
-        print("\nChecking for updates...")
+        log.info("Checking for updates...")
         led_pattern_updating()  # LED pattern while checking
         try:
             auto_update.auto_update_on_startup()
         except Exception as e:
-            print(f"Update check failed: {e}")
+            log.error("Update check failed: %s", e)
             led_pattern_error()
     
     # Fetch initial train data
@@ -2183,259 +3348,32 @@ async def main_loop():
         fetch_weather()
 
     # Start config portal web server (non-blocking)
-    config_server = None
-    try:
-        import socket
-        config_server = socket.socket()
-        config_server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        config_server.bind(('0.0.0.0', 80))
-        config_server.listen(5)  # Increased backlog from 1 to 5
-        config_server.setblocking(False)
-        wlan = network.WLAN(network.STA_IF)
-        print(f"\nConfig portal available at http://{wlan.ifconfig()[0]}")
-    except Exception as e:
-        print(f"Could not start config portal: {e}")
-        config_server = None
+    portal_server = await start_portal_server()
 
     # Set LED to connected state before entering main loop
     led_connected()
     
-    last_update = time.time()
-    last_rotation = time.time()
     last_update_check = time.time()
-    last_weather_update = time.time()
-    last_alerts_update = time.time()
-    last_wifi_check = time.time()
-    wifi_check_interval = 30  # Check WiFi every 30 seconds
     
-    while True:
+    # Hand the periodic fetches to core 1 if enabled
+    if ENABLE_DUAL_CORE and fetch_worker.start(fetch_loop, stack_size=FETCH_STACK_SIZE):
+        log.info("Fetching on core 1")
+    
+    # Start the watchdog only now: WiFi setup, the startup update check and
+    # the setup portal above all block for longer than it allows
+    if ENABLE_WATCHDOG:
         try:
-            # Feed the watchdog
-            if wdt is not None:
-                wdt.feed()
-
-            current_time = time.time()
-            
-            # Check WiFi connection periodically and reconnect if needed
-            if current_time - last_wifi_check >= wifi_check_interval:
-                last_wifi_check = current_time
-                if not check_wifi_and_reconnect():
-                    # WiFi is down and couldn't reconnect
-                    # Continue loop but skip network operations
-                    led_blink(1, 200, 100, r=100, g=0, b=0)  # Red blink to indicate offline
-                    continue
-
-            # Handle config portal web requests (non-blocking)
-            if config_server:
-                try:
-                    cl, addr = config_server.accept()
-                    cl.settimeout(5.0)  # Reduced from 10 to 5 seconds
-                    try:
-                        request = cl.recv(2048).decode('utf-8')
-                        
-                        if 'GET / ' in request or 'GET /config' in request:
-                            # Use main branch for CDN - always gets latest
-                            ver = 'main'
-                            # Serve tiny loader HTML that pulls JS/CSS from CDN
-                            loader = f'''<!DOCTYPE html>
-<html><head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width,initial-scale=1.0,viewport-fit=cover">
-<title>Transit Board</title>
-<meta name="apple-mobile-web-app-capable" content="yes">
-<link rel="apple-touch-icon" href="https://cdn.jsdelivr.net/gh/sammcanany/ChicagoTransitBoard@{ver}/web/apple-touch-icon.png">
-<link rel="icon" type="image/svg+xml" href="https://cdn.jsdelivr.net/gh/sammcanany/ChicagoTransitBoard@{ver}/web/favicon.svg">
-<link rel="stylesheet" href="https://cdn.jsdelivr.net/gh/sammcanany/ChicagoTransitBoard@{ver}/web/styles.css">
-<script src="https://unpkg.com/lucide@latest/dist/umd/lucide.min.js"></script>
-</head><body>
-<div id="app"><div class="loading">Loading...</div></div>
-<script src="https://cdn.jsdelivr.net/gh/sammcanany/ChicagoTransitBoard@{ver}/web/config.js"></script>
-</body></html>'''
-                            cl.send('HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nConnection: close\r\n\r\n')
-                            cl.send(loader)
-                            
-                        elif 'GET /api/config' in request:
-                            # Return config as JSON
-                            import config_portal
-                            import json
-                            config = config_portal.get_current_config()
-                            cl.send('HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\nAccess-Control-Allow-Origin: *\r\n\r\n')
-                            cl.send(json.dumps(config))
-                            
-                        elif 'GET /api/status' in request:
-                            # Return status as JSON
-                            import config_portal
-                            import json
-                            status = config_portal.get_system_status()
-                            status_json = {
-                                'version': status['version'],
-                                'wifi_connected': status['wifi_connected'],
-                                'uptime': f"{status['uptime'] // 3600}h {(status['uptime'] % 3600) // 60}m",
-                                'memory_pct': int((status['free_memory'] / status['total_memory']) * 100)
-                            }
-                            cl.send('HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\nAccess-Control-Allow-Origin: *\r\n\r\n')
-                            cl.send(json.dumps(status_json))
-                            
-                        elif 'POST /api/save' in request:
-                            # Parse JSON body and save config
-                            import config_portal
-                            import json
-                            
-                            # Extract Content-Length to know how much to read
-                            content_length = 0
-                            for line in request.split('\r\n'):
-                                if line.startswith('Content-Length:'):
-                                    content_length = int(line.split(':')[1].strip())
-                                    break
-                            
-                            # Get the body
-                            body_start = request.find('\r\n\r\n')
-                            if body_start >= 0:
-                                body = request[body_start + 4:]
-                                # Read more data if body is incomplete
-                                while len(body) < content_length:
-                                    try:
-                                        chunk = cl.recv(1024).decode('utf-8')
-                                        if not chunk:
-                                            break
-                                        body += chunk
-                                    except:
-                                        break
-                            else:
-                                body = '{}'
-                            
-                            try:
-                                data = json.loads(body)
-                                # Convert JSON to form params format
-                                params = {}
-                                for k, v in data.items():
-                                    if isinstance(v, bool):
-                                        if v:
-                                            params[k] = 'true'
-                                    else:
-                                        params[k] = str(v)
-                                # Preserve WiFi settings
-                                params['wifi_ssid'] = WIFI_SSID
-                                params['wifi_password'] = WIFI_PASSWORD
-                                if config_portal.save_config(params):
-                                    cl.send('HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n\r\n{"success":true}')
-                                    cl.close()
-                                    sys.exit()
-                                else:
-                                    cl.send('HTTP/1.1 500 Error\r\nContent-Type: application/json\r\nConnection: close\r\n\r\n{"success":false}')
-                            except Exception as e:
-                                print(f"Save error: {e}")
-                                cl.send('HTTP/1.1 400 Bad Request\r\nContent-Type: application/json\r\nConnection: close\r\n\r\n{"error":"' + str(e) + '"}')
-                                
-                        elif 'OPTIONS ' in request:
-                            # Handle CORS preflight
-                            cl.send('HTTP/1.1 200 OK\r\nAccess-Control-Allow-Origin: *\r\nAccess-Control-Allow-Methods: GET, POST, OPTIONS\r\nAccess-Control-Allow-Headers: Content-Type\r\n\r\n')
-                            
-                        elif 'GET /restart' in request:
-                            cl.send('HTTP/1.1 200 OK\r\n\r\nRestarting...')
-                            cl.close()
-                            import machine
-                            machine.reset()
-                        else:
-                            cl.send('HTTP/1.1 404 Not Found\r\n\r\n')
-                    except Exception as e:
-                        if 'ETIMEDOUT' not in str(e):
-                            print(f"Web error: {e}")
-                    finally:
-                        try:
-                            cl.close()
-                        except:
-                            pass
-                except OSError:
-                    pass  # No connection waiting
-
-            # Check WiFi connection periodically
-            wlan = network.WLAN(network.STA_IF)
-            if not wlan.isconnected():
-                connect_wifi()
-            
-            # Update train data from API
-            if current_time - last_update >= UPDATE_INTERVAL:
-                if wifi_connected:
-                    fetch_trains()
-                last_update = current_time
-            
-            # Update service alerts periodically (less frequent than trains)
-            if ENABLE_SERVICE_ALERTS and wifi_connected and (current_time - last_alerts_update >= ALERTS_UPDATE_INTERVAL):
-                fetch_alerts()
-                last_alerts_update = current_time
-
-            # Update weather data periodically
-            if ENABLE_WEATHER and wifi_connected and (current_time - last_weather_update >= WEATHER_UPDATE_INTERVAL):
-                fetch_weather()
-                last_weather_update = current_time
-
-            # Check for software updates periodically
-            if ENABLE_AUTO_UPDATE and wifi_connected and (current_time - last_update_check >= CHECK_UPDATE_INTERVAL):
-                print("\nPeriodic update check...")
-                try:
-                    auto_update.check_for_updates()
-                except Exception as e:
-                    print(f"Update check failed: {e}")
-                last_update_check = current_time
-            
-            # Rotate between views based on mode
-            if current_time - last_rotation >= DISPLAY_ROTATION_TIME:
-                if station_rotation_enabled:
-                    # Station rotation mode: cycle through stations
-                    # Each station shows Inbound → Outbound before moving to next station
-                    if ENABLE_SERVICE_ALERTS and len(active_alerts) > 0:
-                        # With alerts: Inbound -> Outbound -> Alerts -> next station
-                        if current_direction == "Inbound":
-                            current_direction = "Outbound"
-                        elif current_direction == "Outbound":
-                            current_direction = "Alerts"
-                        else:
-                            # After alerts, move to next station
-                            current_direction = "Inbound"
-                            current_station_index = (current_station_index + 1) % len(ROTATION_STATIONS)
-                            # Train data will be fetched on next UPDATE_INTERVAL
-                    else:
-                        # No alerts: Inbound -> Outbound -> next station
-                        if current_direction == "Inbound":
-                            current_direction = "Outbound"
-                        else:
-                            # After outbound, move to next station
-                            current_direction = "Inbound"
-                            current_station_index = (current_station_index + 1) % len(ROTATION_STATIONS)
-                            # Train data will be fetched on next UPDATE_INTERVAL
-                    
-                    station = ROTATION_STATIONS[current_station_index]
-                    print(f"Station: {station['name']} - {current_direction}")
-                else:
-                    # Direction rotation mode (original behavior)
-                    if ENABLE_SERVICE_ALERTS and len(active_alerts) > 0:
-                        # Cycle: Inbound -> Outbound -> Alerts -> Inbound
-                        if current_direction == "Inbound":
-                            current_direction = "Outbound"
-                        elif current_direction == "Outbound":
-                            current_direction = "Alerts"
-                        else:
-                            current_direction = "Inbound"
-                    else:
-                        # No alerts: just toggle Inbound <-> Outbound
-                        current_direction = "Outbound" if current_direction == "Inbound" else "Inbound"
-                    
-                    print(f"Switched to {current_direction}")
-                
-                last_rotation = current_time
-            
-            # Update display
-            draw_display()
-
-            await uasyncio.sleep_ms(500)
-
-        except KeyboardInterrupt:
-            print("Stopped")
-            break
+            supervisor.watch(WDT(timeout=WATCHDOG_TIMEOUT), WATCHDOG_TIMEOUT)
+            if ENABLE_AUTO_UPDATE:
+                auto_update.checkpoint = supervisor.checkpoint
+                auto_update.VERSION_TIMEOUT = supervisor.timeout_s(auto_update.VERSION_TIMEOUT)
+                auto_update.DOWNLOAD_TIMEOUT = supervisor.timeout_s(auto_update.DOWNLOAD_TIMEOUT)
+            log.info("Watchdog enabled: %sms timeout", WATCHDOG_TIMEOUT)
         except Exception as e:
-            print(f"Error: {e}")
-            await uasyncio.sleep(5)
+            log.warning("Could not enable watchdog: %s", e)
+    
+    start_tasks()
+    await supervisor.run()
 
 async def main():
     """Main entry point"""
@@ -2454,4 +3392,8 @@ if __name__ == "__main__":
     else:
         # Normal operation - run async main
         import uasyncio
-        uasyncio.run(main())
+        try:
+            uasyncio.run(main())
+        except KeyboardInterrupt:
+            log.info("Stopped")
+            log.flush()
@@ -0,0 +1,160 @@
+# Metrics for Chicago Transit Board
+# Counters and fixed-bucket histograms in preallocated integer arrays, cheap
+# enough to leave on, rendered in Prometheus text format for /metrics
+
+import gc
+from array import array
+
+# Values wrap here so they stay small ints (no heap allocation on update).
+# Prometheus sees a wrap as a counter reset, which rate() already handles.
+WRAP = (1 << 30) - 1
+
+PREFIX = "transitboard_"
+
+_registry = []
+
+def _label(name, value):
+    return '{%s="%s"}' % (name, value) if name else ""
+
+class Counter:
+    """Monotonic counter, optionally one per value of a single label.
+
+    Label values are fixed up front; inc() takes the value's index, so
+    recording an event never allocates.
+    """
+
+    def __init__(self, name, help, label=None, values=None):
+        self.name = PREFIX + name
+        self.help = help
+        self.label = label
+        self.values = values or ("",)
+        self.counts = array("L", [0] * len(self.values))
+        _registry.append(self)
+
+    def inc(self, i=0, n=1):
+        self.counts[i] = (self.counts[i] + n) & WRAP
+
+    def render(self):
+        yield "# HELP %s %s\n# TYPE %s counter\n" % (self.name, self.help, self.name)
+        for i in range(len(self.values)):
+            yield "%s%s %d\n" % (self.name, _label(self.label, self.values[i]), self.counts[i])
+
+class Histogram:
+    """Fixed-bucket histogram (upper bounds in `bounds`), optionally per label value"""
+
+    def __init__(self, name, help, bounds, label=None, values=None):
+        self.name = PREFIX + name
+        self.help = help
+        self.label = label
+        self.values = values or ("",)
+        self.bounds = array("l", bounds)
+        self.width = len(bounds) + 1  # Last bucket is +Inf
+        rows = len(self.values)
+        self.buckets = array("L", [0] * (rows * self.width))
+        self.sums = array("L", [0] * rows)
+        self.counts = array("L", [0] * rows)
+        _registry.append(self)
+
+    def observe(self, value, i=0):
+        bounds = self.bounds
+        n = self.width - 1
+        b = 0
+        while b < n and value > bounds[b]:
+            b += 1
+        k = i * self.width + b
+        self.buckets[k] = (self.buckets[k] + 1) & WRAP
+        self.sums[i] = (self.sums[i] + value) & WRAP
+        self.counts[i] = (self.counts[i] + 1) & WRAP
+
+    def render(self):
+        yield "# HELP %s %s\n# TYPE %s histogram\n" % (self.name, self.help, self.name)
+        for i in range(len(self.values)):
+            prefix = '%s_bucket{%s' % (self.name, '%s="%s",' % (self.label, self.values[i]) if self.label else "")
+            total = 0
+            for b in range(self.width):
+                total += self.buckets[i * self.width + b]
+                le = "+Inf" if b == self.width - 1 else str(self.bounds[b])
+                yield '%sle="%s"} %d\n' % (prefix, le, total)
+            labels = _label(self.label, self.values[i])
+            yield "%s_sum%s %d\n%s_count%s %d\n" % (self.name, labels, self.sums[i], self.name, labels, self.counts[i])
+
+class Collector:
+    """Value read only at scrape time, e.g. from an existing stats dict.
+
+    `read` returns a number, or a list of (label value, number) pairs, or
+    None to leave the metric out.
+    """
+
+    def __init__(self, name, help, read, type="gauge", label=None):
+        self.name = PREFIX + name
+        self.help = help
+        self.read = read
+        self.type = type
+        self.label = label
+        _registry.append(self)
+
+    def render(self):
+        try:
+            value = self.read()
+        except Exception:
+            return
+        if value is None:
+            return
+        yield "# HELP %s %s\n# TYPE %s %s\n" % (self.name, self.help, self.name, self.type)
+        if isinstance(value, list):
+            for label_value, number in value:
+                yield "%s%s %s\n" % (self.name, _label(self.label, label_value), number)
+        else:
+            yield "%s %s\n" % (self.name, value)
+
+class GcMonitor:
+    """Counts garbage collections by watching gc.mem_alloc() fall between samples.
+
+    MicroPython has no collection counter, so call sample() regularly
+    (every frame); collections between two samples count as one.
+    """
+
+    def __init__(self, counter):
+        self.counter = counter
+        self.last = array("L", [0])
+        self.enabled = hasattr(gc, "mem_alloc")
+
+    def sample(self):
+        """Returns True if a collection happened since the last sample"""
+        if not self.enabled:
+            return False
+        used = gc.mem_alloc()
+        collected = used < self.last[0]
+        if collected:
+            self.counter.inc()
+        self.last[0] = used
+        return collected
+
+def largest_free_block(limit=12):
+    """Largest allocatable block in bytes, found by trial allocation.
+
+    Only call at scrape time: it allocates (and frees) up to `limit`
+    buffers. Returns None where gc.mem_free() isn't available.
+    """
+    if not hasattr(gc, "mem_free"):
+        return None
+    low = 0
+    high = gc.mem_free()
+    for _ in range(limit):
+        if high - low <= 64:
+            break
+        mid = (low + high) // 2
+        try:
+            block = bytearray(mid)
+            del block
+            low = mid
+        except MemoryError:
+            high = mid
+    gc.collect()
+    return low
+
+def render():
+    """Every registered metric as text exposition chunks (send them one by one)"""
+    for metric in _registry:
+        for chunk in metric.render():
+            yield chunk
@@ -0,0 +1,177 @@
+# Retained-Mode Display Scene for Chicago Transit Board
+# Keeps track of what is already on the LED panel so a frame only redraws
+# the regions whose inputs changed, and only pushes to the panel when
+# something was actually drawn
+
+import time
+
+_UNSET = object()
+
+def _overlaps(a, b):
+    """Check if two (x, y, w, h) rectangles intersect"""
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+            a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+class Scene:
+    """Region-based frame builder.
+
+    Each frame: begin(view), then region(...) for every region of that
+    view in paint order, then commit(). A region is redrawn when its key
+    (a tuple of the inputs it depends on) differs from the key it was last
+    drawn with; the draw function is called as draw(*key) with the
+    display clipped to the region's rectangle.
+    """
+
+    def __init__(self, display, i75, background):
+        self.display = display
+        self.i75 = i75
+        self.background = background
+        self.view = None
+        self.brightness = None
+        self._keys = {}       # name -> key last drawn
+        self._rects = {}      # name -> rect last drawn
+        self._pending = []
+        self._full = True
+        self._push = False
+        self._start = 0
+
+        # Stats
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+        self.regions_drawn = 0
+        self.draw_us_last = 0
+        self.draw_us_max = 0
+        self.draw_us_total = 0
+
+    def invalidate(self):
+        """Force a full redraw on the next frame (e.g. after drawing outside the scene)"""
+        self.view = None
+
+    def set_brightness(self, level):
+        """Apply panel brightness, only touching the hardware when it changes"""
+        if level == self.brightness:
+            return
+        self.brightness = level
+        try:
+            self.i75.set_brightness(level)
+        except AttributeError:
+            pass  # Newer firmware doesn't have this method
+        self._push = True
+
+    def begin(self, view):
+        """Start a frame for the given view; switching views redraws everything"""
+        self._start = time.ticks_us()
+        if view != self.view:
+            self.view = view
+            self._full = True
+        self._pending = []
+
+    def region(self, name, x, y, w, h, key, draw):
+        """Declare a region for this frame (in paint order)"""
+        self._pending.append((name, (x, y, w, h), key, draw))
+
+    def commit(self):
+        """Redraw changed regions and push the frame if anything changed.
+
+        Returns True if the panel was updated.
+        """
+        display = self.display
+        pending = self._pending
+        full = self._full
+        count = len(pending)
+        dirty = [full] * count
+        damaged = []
+
+        if not full:
+            for i in range(count):
+                name, rect, key, _ = pending[i]
+                if self._keys.get(name, _UNSET) != key:
+                    dirty[i] = True
+
+            # Regions that were on screen last frame but aren't declared now
+            declared = [p[0] for p in pending]
+            for name in list(self._rects):
+                if name not in declared:
+                    damaged.append(self._rects.pop(name))
+                    self._keys.pop(name, None)
+
+            # Clearing a region wipes anything under it, so overlapping
+            # regions have to be repainted too
+            grow = True
+            while grow:
+                grow = False
+                for i in range(count):
+                    if dirty[i]:
+                        continue
+                    rect = pending[i][1]
+                    hit = False
+                    for rect2 in damaged:
+                        if _overlaps(rect, rect2):
+                            hit = True
+                            break
+                    if not hit:
+                        for j in range(count):
+                            if dirty[j] and _overlaps(rect, pending[j][1]):
+                                hit = True
+                                break
+                    if hit:
+                        dirty[i] = True
+                        grow = True
+
+        if full:
+            display.set_pen(self.background)
+            display.clear()
+            self._keys = {}
+            self._rects = {}
+        else:
+            display.set_pen(self.background)
+            for rect in damaged:
+                display.set_clip(*rect)
+                display.clear()
+            if damaged:
+                display.remove_clip()
+
+        drawn = 0
+        for i in range(count):
+            if not dirty[i]:
+                continue
+            name, rect, key, draw = pending[i]
+            display.set_clip(*rect)
+            if not full:
+                display.set_pen(self.background)
+                display.clear()
+            draw(*key)
+            display.remove_clip()
+            self._keys[name] = key
+            self._rects[name] = rect
+            drawn += 1
+
+        self._pending = []
+        self._full = False
+
+        if drawn or damaged or self._push:
+            self.i75.update()
+            self._push = False
+            self.frames_drawn += 1
+            self.regions_drawn += drawn
+            elapsed = time.ticks_diff(time.ticks_us(), self._start)
+            self.draw_us_last = elapsed
+            self.draw_us_total += elapsed
+            if elapsed > self.draw_us_max:
+                self.draw_us_max = elapsed
+            return True
+
+        self.frames_skipped += 1
+        return False
+
+    def get_stats(self):
+        """Frame statistics for /api/status"""
+        drawn = self.frames_drawn
+        return {
+            "frames_drawn": drawn,
+            "frames_skipped": self.frames_skipped,
+            "regions_drawn": self.regions_drawn,
+            "draw_us_last": self.draw_us_last,
+            "draw_us_max": self.draw_us_max,
+            "draw_us_avg": self.draw_us_total // drawn if drawn else 0,
+        }
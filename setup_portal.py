@@ -1,53 +1,126 @@
 # WiFi Setup Portal for Chicago Transit Board
-# Creates an Access Point and web server for initial configuration
+# Creates an Access Point with a captive-portal DNS server and a web server
+# for initial configuration, both running as uasyncio tasks
 
 import network
 import socket
 import time
 import machine
 import select
+import struct
+import uasyncio
+import handoff
+import httpd
 
 # AP Configuration
 AP_SSID = "ChicagoTransitBoard"
 AP_PASSWORD = "setup1234"  # Change this for security
 AP_IP = "192.168.4.1"
 
+SCAN_INTERVAL = 60  # Seconds between background WiFi scans
+RESCAN_REFRESH = 3  # Seconds before a page shown during a scan reloads
+
+DNS_PORT = 53
+HTTP_MAX_CLIENTS = 8  # Pages stream through one small buffer, so clients are cheap
+DNS_POLL_MS = 10  # How often the DNS task checks for queries while idle
+DNS_TTL = 60
+
 # Pre-build IP bytes for DNS responses
 IP_BYTES = bytes([int(x) for x in AP_IP.split('.')])
 
-def handle_dns_query(dns_socket):
-    """Handle a single DNS query - returns our IP for all queries (captive portal)"""
-    try:
-        data, addr = dns_socket.recvfrom(512)
-        
-        # Build DNS response - return our IP for any query
-        response = bytearray()
-        response.extend(data[:2])  # Transaction ID
-        response.extend([0x81, 0x80])  # Flags: standard response, no error
-        response.extend(data[4:6])  # Questions count
-        response.extend(data[4:6])  # Answers count (same as questions)
-        response.extend([0x00, 0x00])  # Authority RRs
-        response.extend([0x00, 0x00])  # Additional RRs
-        
-        # Copy the question section
+# Every reply is the query's ID and question plus this fixed answer:
+# a pointer to the question's name, type A, class IN, TTL and our address
+DNS_ANSWER = b"\xc0\x0c\x00\x01\x00\x01" + struct.pack(">IH", DNS_TTL, 4) + IP_BYTES
+
+# Common captive portal detection URLs that should redirect
+CAPTIVE_URLS = (
+    '/generate_204',        # Android
+    '/gen_204',             # Android
+    '/hotspot-detect.html', # Apple iOS/macOS
+    '/library/test/success.html',  # Apple
+    '/ncsi.txt',            # Windows
+    '/connecttest.txt',     # Windows
+    '/redirect',            # Windows
+    '/success.txt',         # Various
+    '/canonical.html',      # Firefox
+)
+
+class DnsServer:
+    """Answers every A query with AP_IP so phones open the portal (captive DNS).
+
+    Replies are assembled in one preallocated buffer. The server polls its
+    socket from its own task, so it answers while HTTP clients are still
+    being served, however slow they are.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.poller = select.poll()
+        self.poller.register(sock, select.POLLIN)
+        self.buf = bytearray(512)
+        self.queries = 0
+        self.answered = 0
+        self.errors = 0
+
+    def reply(self, query):
+        """Build the reply to `query` in self.buf; returns its length (0 to drop it)"""
+        n = len(query)
+        if n < 17 or query[2] & 0x80:
+            return 0  # Too short, or a response rather than a query
+        # Skip the question's name (a run of labels) to its type and class
         pos = 12
-        while pos < len(data) and data[pos] != 0:
-            pos += data[pos] + 1
-        pos += 5
-        response.extend(data[12:pos])
-        
-        # Add answer section
-        response.extend([0xc0, 0x0c])  # Pointer to domain name
-        response.extend([0x00, 0x01])  # Type: A
-        response.extend([0x00, 0x01])  # Class: IN
-        response.extend([0x00, 0x00, 0x00, 0x3c])  # TTL: 60s
-        response.extend([0x00, 0x04])  # Data length: 4
-        response.extend(IP_BYTES)
-        
-        dns_socket.sendto(bytes(response), addr)
-        print(f"DNS: {addr[0]} -> {AP_IP}")
-    except Exception as e:
-        print(f"DNS error: {e}")
+        while pos < n and query[pos]:
+            pos += query[pos] + 1
+        end = pos + 5
+        if end > n or end + len(DNS_ANSWER) > len(self.buf):
+            return 0
+        qtype = query[pos + 1] << 8 | query[pos + 2]
+        answer = qtype == 1 or qtype == 255  # A or ANY; others get no records
+        buf = self.buf
+        buf[0:2] = query[0:2]  # Transaction ID
+        buf[2:12] = b"\x81\x80\x00\x01\x00\x01\x00\x00\x00\x00" if answer else b"\x81\x80\x00\x01\x00\x00\x00\x00\x00\x00"
+        buf[12:end] = query[12:end]  # The question
+        if answer:
+            buf[end:end + len(DNS_ANSWER)] = DNS_ANSWER
+            end += len(DNS_ANSWER)
+        return end
+
+    def answer_pending(self):
+        """Answer every query waiting on the socket"""
+        while True:
+            try:
+                query, addr = self.sock.recvfrom(512)
+            except OSError:
+                return  # Nothing left (EAGAIN)
+            self.queries += 1
+            n = self.reply(query)
+            if not n:
+                continue
+            try:
+                self.sock.sendto(memoryview(self.buf)[:n], addr)
+                self.answered += 1
+            except OSError as e:
+                self.errors += 1
+                print(f"DNS error: {e}")
+
+    async def serve(self):
+        while True:
+            if self.poller.poll(0):
+                self.answer_pending()
+                await uasyncio.sleep_ms(0)
+            else:
+                await uasyncio.sleep_ms(DNS_POLL_MS)
+
+    def get_stats(self):
+        return {"queries": self.queries, "answered": self.answered, "errors": self.errors}
+
+def dns_socket(port=DNS_PORT, host='0.0.0.0'):
+    """Non-blocking UDP socket for DnsServer"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setblocking(False)
+    sock.bind((host, port))
+    return sock
 
 def create_ap():
     """Create Access Point for setup"""
@@ -70,377 +143,138 @@ def create_ap():
     
     return ap
 
-def html_page(error="", networks=[]):
-    """Generate setup HTML page"""
-    error_html = f'<div class="error">{error}</div>' if error else ""
-    
-    # Generate network options
-    network_options = ""
-    if networks:
-        for ssid, rssi, _security in networks:
-            # Signal strength indicator (using ASCII for compatibility)
-            if rssi > -50:
-                signal = "****"
-            elif rssi > -60:
-                signal = "*** "
-            elif rssi > -70:
-                signal = "**  "
-            else:
-                signal = "*   "
+# Pages are HTML templates on flash, streamed through one small buffer so
+# serving a page never needs it in RAM whole; {{name}} marks a slot
+PAGE_TEMPLATE = "setup_portal.html"
+SUCCESS_TEMPLATE = "setup_success.html"
+CHUNK = 256
 
-            network_options += f'<option value="{ssid}">{ssid} ({signal})</option>\n'
-    
-    return f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Chicago Transit Board - WiFi Setup</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 20px;
-        }}
-        
-        .container {{
-            background: white;
-            max-width: 500px;
-            width: 100%;
-            padding: 40px;
-            border-radius: 20px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-        }}
-        
-        .header {{
-            text-align: center;
-            margin-bottom: 30px;
-        }}
-        
-        .logo {{
-            width: 80px;
-            height: 80px;
-            background: linear-gradient(135deg, #009B3A 0%, #007A2E 100%);
-            border-radius: 20px;
-            margin: 0 auto 20px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 40px;
-            color: white;
-            font-weight: bold;
-        }}
-        
-        h1 {{
-            color: #2d3748;
-            font-size: 24px;
-            font-weight: 700;
-            margin-bottom: 8px;
-        }}
-        
-        .subtitle {{
-            color: #718096;
-            font-size: 14px;
-        }}
-        
-        .info {{
-            background: #EBF8FF;
-            border-left: 4px solid #3182CE;
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 25px;
-            font-size: 14px;
-            color: #2C5282;
-        }}
-        
-        .error {{
-            background: #FFF5F5;
-            border-left: 4px solid #E53E3E;
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 25px;
-            font-size: 14px;
-            color: #C53030;
-        }}
-        
-        .form-group {{
-            margin-bottom: 25px;
-        }}
-        
-        label {{
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: #2d3748;
-            font-size: 14px;
-        }}
-        
-        input, select {{
-            width: 100%;
-            padding: 12px 16px;
-            border: 2px solid #e2e8f0;
-            border-radius: 10px;
-            font-size: 15px;
-            transition: all 0.3s;
-            background: white;
-        }}
-        
-        input:focus, select:focus {{
-            outline: none;
-            border-color: #667eea;
-            box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-        }}
-        
-        .help {{
-            font-size: 12px;
-            color: #718096;
-            margin-top: 6px;
-        }}
-        
-        button {{
-            width: 100%;
-            padding: 14px;
-            border: none;
-            border-radius: 10px;
-            font-size: 16px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s;
-        }}
-        
-        .btn-primary {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            margin-bottom: 12px;
-        }}
-        
-        .btn-primary:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 10px 20px rgba(102, 126, 234, 0.3);
-        }}
-        
-        .btn-secondary {{
-            background: #edf2f7;
-            color: #4a5568;
-        }}
-        
-        .btn-secondary:hover {{
-            background: #e2e8f0;
-        }}
-        
-        .signal {{
-            font-size: 12px;
-            margin-left: 5px;
-        }}
-        
-        .excellent {{ color: #38a169; }}
-        .good {{ color: #48bb78; }}
-        .fair {{ color: #ecc94b; }}
-        .weak {{ color: #f56565; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <div class="logo">CTB</div>
-            <h1>Chicago Transit Board</h1>
-            <div class="subtitle">WiFi Configuration</div>
-        </div>
-        
-        <div class="info">
-            <strong>Step 1: Connect to WiFi</strong><br>
-            Select your network and enter the password. You can configure Metra settings later by editing config.py on the board.
-        </div>
-        
-        {error_html}
-        
-        <form method="POST" action="/save">
-            <div class="form-group">
-                <label>WiFi Network</label>
-                <select name="ssid" id="ssid" required onchange="checkManual()">
-                    <option value="">-- Select Network --</option>
-                    {network_options}
-                    <option value="__manual__">Enter Manually...</option>
-                </select>
-                <input type="text" name="ssid_manual" id="ssid_manual" placeholder="Network Name" style="display:none; margin-top:10px;">
-                <div class="help">2.4GHz networks only (5GHz not supported)</div>
-            </div>
-            
-            <div class="form-group">
-                <label>WiFi Password</label>
-                <input type="password" name="password" required placeholder="Enter your WiFi password">
-            </div>
-            
-            <button type="submit" class="btn-primary">Connect and Save</button>
-            <button type="button" class="btn-secondary" onclick="location.reload()">Rescan Networks</button>
-        </form>
-    </div>
-    
-    <script>
-        function checkManual() {{
-            var select = document.getElementById('ssid');
-            var manual = document.getElementById('ssid_manual');
-            if (select.value === '__manual__') {{
-                manual.style.display = 'block';
-                manual.required = true;
-                select.required = false;
-            }} else {{
-                manual.style.display = 'none';
-                manual.required = false;
-                select.required = true;
-            }}
-        }}
-    </script>
-</body>
-</html>"""
-
-def success_page():
-    """Page shown after successful save"""
-    return """<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>WiFi Connected!</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 20px;
-        }
-        
-        .container {
-            background: white;
-            max-width: 500px;
-            width: 100%;
-            padding: 40px;
-            border-radius: 20px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            text-align: center;
-        }
-        
-        .checkmark {
-            width: 80px;
-            height: 80px;
-            background: linear-gradient(135deg, #48bb78 0%, #38a169 100%);
-            border-radius: 50%;
-            margin: 0 auto 30px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 50px;
-            color: white;
-        }
-        
-        h1 {
-            color: #2d3748;
-            font-size: 28px;
-            margin-bottom: 20px;
-        }
-        
-        .success-box {
-            background: #F0FFF4;
-            border: 2px solid #9AE6B4;
-            padding: 25px;
-            border-radius: 12px;
-            margin-bottom: 30px;
-        }
-        
-        .success-box h2 {
-            color: #22543D;
-            font-size: 20px;
-            margin-bottom: 10px;
-        }
-        
-        .success-box p {
-            color: #2F855A;
-            line-height: 1.6;
-        }
-        
-        .next-steps {
-            text-align: left;
-            background: #f7fafc;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        }
-        
-        .next-steps h3 {
-            color: #2d3748;
-            font-size: 16px;
-            margin-bottom: 15px;
-        }
-        
-        .next-steps ol {
-            margin-left: 20px;
-            color: #4a5568;
-            line-height: 1.8;
-        }
-        
-        .next-steps code {
-            background: #edf2f7;
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-size: 13px;
-        }
-        
-        .countdown {
-            color: #718096;
-            font-size: 14px;
-            margin-top: 20px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="checkmark">&#10003;</div>
-        <h1>WiFi Connected!</h1>
-        
-        <div class="success-box">
-            <h2>Setup Complete</h2>
-            <p>Your Chicago Transit Board is now connected to WiFi.</p>
-        </div>
-        
-        <div class="next-steps">
-            <h3>Next Steps:</h3>
-            <ol>
-                <li>Edit <code>config.py</code> on the board to add your Metra API token and station settings</li>
-                <li>Or see <code>config.example.py</code> for all available options</li>
-                <li>Restart the board to start showing train data</li>
-            </ol>
-        </div>
-        
-        <div class="countdown">This setup network will shut down in 5 seconds...</div>
-    </div>
-</body>
-</html>"""
-
-def scan_networks():
-    """Scan for available WiFi networks"""
-    import network
-    
-    sta = network.WLAN(network.STA_IF)
-    sta.active(True)
-    
+# Served if PAGE_TEMPLATE is missing, so WiFi can still be set up
+FALLBACK_PAGE = """<!DOCTYPE html><html><head><title>WiFi Setup</title>
+<meta name="viewport" content="width=device-width, initial-scale=1"></head><body>
+<h1>Chicago Transit Board - WiFi Setup</h1>{{error}}
+<form method="POST" action="/save"><input type="hidden" name="ssid" value="__manual__">
+<p><input type="text" name="ssid_manual" placeholder="Network Name" required></p>
+<p><input type="password" name="password" placeholder="WiFi Password" required></p>
+<button type="submit">Connect and Save</button></form></body></html>"""
+
+_buf = bytearray(CHUNK)
+_slots = {}  # Template path -> [(offset, slot name, marker length), ...]
+
+def _slot_index(path):
+    """Where each {{slot}} is in a template (found once, a line at a time)"""
+    slots = _slots.get(path)
+    if slots is None:
+        slots = []
+        pos = 0
+        with open(path, "rb") as f:
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                start = line.find(b"{{")
+                while start >= 0:
+                    end = line.find(b"}}", start)
+                    if end < 0:
+                        break
+                    slots.append((pos + start, line[start + 2:end].decode(), end + 2 - start))
+                    start = line.find(b"{{", end)
+                pos += len(line)
+        _slots[path] = slots
+    return slots
+
+def _copy(f, length):
+    """Yield up to `length` bytes of f, a buffer at a time"""
+    view = memoryview(_buf)
+    while length > 0:
+        n = f.readinto(view[:min(CHUNK, length)])
+        if not n:
+            return
+        yield view[:n]
+        length -= n
+
+def _fill(value):
+    """A slot value: a string, or an iterable of strings"""
+    if isinstance(value, str):
+        yield value
+    else:
+        for part in value:
+            yield part
+
+def render(path, values, fallback=""):
+    """Chunks of a template with its slots filled from `values`.
+
+    Chunks from flash are views of one shared buffer: send each before
+    asking for the next. If the template is missing, `fallback` (a string
+    with the same slots) is rendered instead.
+    """
+    try:
+        slots = _slot_index(path)
+        f = open(path, "rb")
+    except OSError as e:
+        print(f"Template {path} unavailable: {e}")
+        rest = fallback
+        while "{{" in rest:
+            head, rest = rest.split("{{", 1)
+            name, rest = rest.split("}}", 1)
+            yield head
+            for part in _fill(values.get(name, "")):
+                yield part
+        yield rest
+        return
+    with f:
+        pos = 0
+        for offset, name, size in slots:
+            for chunk in _copy(f, offset - pos):
+                yield chunk
+            f.seek(offset + size)
+            pos = offset + size
+            for part in _fill(values.get(name, "")):
+                yield part
+        for chunk in _copy(f, 1 << 30):
+            yield chunk
+
+def _escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+def network_options(networks):
+    """<option> lines for the network list, one at a time"""
+    for ssid, rssi, _security in networks:
+        # Signal strength indicator (using ASCII for compatibility)
+        if rssi > -50:
+            signal = "****"
+        elif rssi > -60:
+            signal = "*** "
+        elif rssi > -70:
+            signal = "**  "
+        else:
+            signal = "*   "
+        ssid = _escape(ssid)
+        yield f'<option value="{ssid}">{ssid} ({signal})</option>\n'
+
+def setup_page(scans, error="", rescan=False):
+    """Chunks of the setup page, listing the networks in `scans` (a ScanCache).
+
+    The page reloads itself once a scan it would be waiting for (a rescan,
+    or the first scan) has had time to finish.
+    """
+    refresh = ""
+    if rescan or scans.scanned_at is None:
+        refresh = f'<meta http-equiv="refresh" content="{RESCAN_REFRESH};url=/">'
+    return render(PAGE_TEMPLATE, {
+        "refresh": refresh,
+        "error": f'<div class="error">{error}</div>' if error else "",
+        "networks": network_options(scans.networks),
+        "scanned": scans.status(),
+    }, FALLBACK_PAGE)
+
+async def send_page(resp, chunks, status=200):
+    """Send an HTML response, a chunk at a time"""
+    await resp.start(status, 'text/html')
+    await resp.stream(chunks)
+
+def scan_networks(sta):
+    """Scan for available WiFi networks (blocks for a couple of seconds)"""
     print("Scanning for WiFi networks...")
     networks = sta.scan()
     
@@ -462,10 +296,68 @@ def scan_networks():
             result.append((ssid, rssi, security))
             seen_ssids.add(ssid)
     
-    sta.active(False)
     print(f"Found {len(result)} networks")
     return result
 
+class ScanCache:
+    """Nearby networks, rescanned in the background so pages never wait on a scan.
+
+    Scans run every SCAN_INTERVAL seconds (or soon after rescan()) on the
+    second core. If that thread can't run, the server loop calls poll(),
+    which scans on its own core - still on the timer, never per request.
+    """
+
+    def __init__(self, sta):
+        self.sta = sta
+        self.networks = []
+        self.scanned_at = None  # time.time() of the last scan
+        self.scanning = False
+        self.requested = False
+        self.scans = 0
+        self.worker = handoff.Worker("WiFi scan")
+
+    def due(self):
+        if self.scanning:
+            return False
+        return self.requested or self.scanned_at is None or time.time() - self.scanned_at >= SCAN_INTERVAL
+
+    def scan(self):
+        self.scanning = True
+        self.requested = False
+        try:
+            self.networks = scan_networks(self.sta)
+            self.scans += 1
+        except Exception as e:
+            print(f"WiFi scan failed: {e}")
+        finally:
+            self.scanned_at = time.time()
+            self.scanning = False
+
+    def _loop(self, worker):
+        while worker.running:
+            worker.beat()
+            if self.due():
+                self.scan()
+            time.sleep(0.25)
+
+    def start(self):
+        """Scan in the background from now on"""
+        self.worker.start(self._loop)
+
+    def poll(self):
+        """Scan if one is due and the background thread isn't doing it"""
+        if not self.worker.running and self.due():
+            self.scan()
+
+    def rescan(self):
+        self.requested = True
+
+    def status(self):
+        """Text for the page: how fresh the list is"""
+        if self.scanning or self.scanned_at is None:
+            return " &middot; scanning..."
+        return " &middot; scanned %ds ago" % (time.time() - self.scanned_at)
+
 def parse_form_data(data):
     """Parse URL-encoded form data"""
     params = {}
@@ -541,192 +433,84 @@ ENABLE_ALERT_ICONS = True
         print(f"Error saving config: {e}")
         return False
 
-def run_server():
-    """Run the web server with captive portal support"""
-    ap = create_ap()
+async def handle_request(req, resp, scans):
+    """Serve one request to the setup portal"""
+    method = req.method
+    path = req.path
+    print(f"Request: {method} {path}")
     
-    # Create DNS socket (UDP port 53) for captive portal
-    dns_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    dns_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    dns_socket.setblocking(False)
-    dns_socket.bind(('0.0.0.0', 53))
-    print("DNS server running on port 53...")
+    if any(url in path for url in CAPTIVE_URLS):
+        # For captive portal to trigger, we need to NOT return the expected response
+        await resp.send('', 302, None, f'Location: http://{AP_IP}/\r\n'
+                        'Cache-Control: no-cache, no-store, must-revalidate\r\n')
     
-    # Scan for networks once at startup
-    print("\nScanning for available networks...")
-    available_networks = scan_networks()
+    elif method == 'GET' and path == '/rescan':
+        # Scan in the background; the page reloads when it's done
+        scans.rescan()
+        await send_page(resp, setup_page(scans, rescan=True))
     
-    # Create HTTP socket (TCP port 80)
-    http_socket = socket.socket()
-    http_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    http_socket.setblocking(False)
-    http_socket.bind(('0.0.0.0', 80))
-    http_socket.listen(1)
+    elif method == 'GET' and (path == '/' or path.startswith('/setup')):
+        await send_page(resp, setup_page(scans))
     
-    print("Web server running (captive portal enabled)...")
-    
-    # Common captive portal detection URLs that should redirect
-    CAPTIVE_URLS = [
-        '/generate_204',        # Android
-        '/gen_204',             # Android
-        '/hotspot-detect.html', # Apple iOS/macOS
-        '/library/test/success.html',  # Apple
-        '/ncsi.txt',            # Windows
-        '/connecttest.txt',     # Windows
-        '/redirect',            # Windows
-        '/success.txt',         # Various
-        '/canonical.html',      # Firefox
-    ]
+    elif method == 'POST' and path == '/save':
+        params = parse_form_data(req.body.decode('utf-8'))
+        ssid = params.get('ssid', '')
+        if ssid == '__manual__':
+            ssid = params.get('ssid_manual', 'N/A')
+        password = params.get('password', '')
+        print(f"Received WiFi config: SSID={ssid}, Password={'*' * len(password)}")
+        
+        # Save configuration
+        if save_config(params):
+            await send_page(resp, render(SUCCESS_TEMPLATE, {}, "<h1>WiFi Connected!</h1>"))
+            resp.writer.close()
+            await resp.writer.wait_closed()
+            print("\n⏳ Restarting in 5 seconds...")
+            await uasyncio.sleep(5)
+            machine.reset()
+        else:
+            await send_page(resp, setup_page(scans, "Failed to save WiFi configuration. Please try again."), 500)
     
-    # Use select/poll for non-blocking I/O
-    poller = select.poll()
-    poller.register(dns_socket, select.POLLIN)
-    poller.register(http_socket, select.POLLIN)
+    elif method == 'GET':
+        # Redirect any unknown request to setup page (captive portal catch-all)
+        await resp.send('', 302, None, f'Location: http://{AP_IP}/\r\n')
     
-    while True:
-        try:
-            # Wait for activity on either socket (100ms timeout)
-            events = poller.poll(100)
-            
-            for sock, event in events:
-                # Handle DNS query (MicroPython returns the socket object directly)
-                if sock == dns_socket:
-                    handle_dns_query(dns_socket)
-                
-                # Handle HTTP connection
-                elif sock == http_socket:
-                    try:
-                        cl, addr = http_socket.accept()
-                        print(f'\nClient connected from {addr}')
-                        handle_http_client(cl, addr, CAPTIVE_URLS)
-                    except OSError:
-                        pass
-                        
-        except Exception as e:
-            print(f"Server error: {e}")
-            time.sleep(0.1)
+    else:
+        await resp.send('', 404, None)
 
-def handle_http_client(cl, addr, CAPTIVE_URLS):
-    """Handle a single HTTP client connection"""
-    try:
-        # Read headers first
-        cl.settimeout(5.0)
-        request = b''
-        while b'\r\n\r\n' not in request:
-            chunk = cl.recv(1024)
-            if not chunk:
-                break
-            request += chunk
-
-        # Check for Content-Length and read body if present
-        headers_end = request.find(b'\r\n\r\n')
-        if headers_end > 0:
-            headers = request[:headers_end].decode('utf-8')
-            body_start = request[headers_end + 4:]
-
-            # Find Content-Length
-            content_length = 0
-            for line in headers.split('\r\n'):
-                if line.lower().startswith('content-length:'):
-                    content_length = int(line.split(':')[1].strip())
-                    break
+async def serve(scans, dns_port=DNS_PORT, http_port=80):
+    """Run the DNS and web servers; returns (DnsServer, httpd.Server) once both are up"""
+    dns = DnsServer(dns_socket(dns_port))
+    uasyncio.create_task(dns.serve())
+    print(f"DNS server running on port {dns_port}...")
+    server = await httpd.Server(lambda req, resp: handle_request(req, resp, scans), http_port,
+                                max_inflight=HTTP_MAX_CLIENTS).start()
+    print("Web server running (captive portal enabled)...")
+    return dns, server
 
-            # Read remaining body if needed
-            while len(body_start) < content_length:
-                chunk = cl.recv(1024)
-                if not chunk:
-                    break
-                body_start += chunk
+async def _run(scans):
+    await serve(scans)
+    while True:
+        scans.poll()
+        await uasyncio.sleep_ms(250)
 
-            request = (request[:headers_end + 4] + body_start)
+def run_server():
+    """Run the captive portal until the board restarts (never returns).
 
-        request = request.decode('utf-8')
-        
-        # Parse request
-        lines = request.split('\r\n')
-        if len(lines) > 0:
-            method_line = lines[0]
-            print(f"Request: {method_line}")
-            
-            # Extract the path from the request
-            parts = method_line.split(' ')
-            path = parts[1] if len(parts) > 1 else '/'
-            
-            # Check if this is a captive portal detection request
-            is_captive_check = any(url in path for url in CAPTIVE_URLS)
-            
-            if is_captive_check:
-                # For captive portal to trigger, we need to NOT return the expected response
-                print(f"Captive portal check detected: {path}")
-                
-                # Return a 302 redirect - this triggers captive portal popup
-                cl.send('HTTP/1.1 302 Found\r\n')
-                cl.send('Location: http://192.168.4.1/\r\n')
-                cl.send('Cache-Control: no-cache, no-store, must-revalidate\r\n')
-                cl.send('Connection: close\r\n\r\n')
-            
-            elif 'GET / ' in method_line or 'GET /setup' in method_line:
-                # Rescan networks on page load
-                networks = scan_networks()
-                response = html_page(networks=networks)
-                cl.send('HTTP/1.1 200 OK\r\n')
-                cl.send('Content-Type: text/html\r\n')
-                cl.send('Connection: close\r\n\r\n')
-                cl.sendall(response)
-            
-            elif 'POST /save' in method_line:
-                # Extract form data
-                body = request.split('\r\n\r\n', 1)[1] if '\r\n\r\n' in request else ''
-                print(f"Form body: {body}")
-                params = parse_form_data(body)
-                print(f"Parsed params: {params}")
-
-                ssid = params.get('ssid', '')
-                if ssid == '__manual__':
-                    ssid = params.get('ssid_manual', 'N/A')
-                password = params.get('password', '')
-                print(f"Received WiFi config: SSID={ssid}, Password={'*' * len(password)}")
-                
-                # Save configuration
-                if save_config(params):
-                    response = success_page()
-                    cl.send('HTTP/1.1 200 OK\r\n')
-                    cl.send('Content-Type: text/html\r\n')
-                    cl.send('Connection: close\r\n\r\n')
-                    cl.sendall(response)
-                    cl.close()
-                    
-                    print("\n⏳ Restarting in 5 seconds...")
-                    time.sleep(5)
-                    machine.reset()
-                else:
-                    networks = scan_networks()
-                    response = html_page(error="Failed to save WiFi configuration. Please try again.", networks=networks)
-                    cl.send('HTTP/1.1 500 Internal Server Error\r\n')
-                    cl.send('Content-Type: text/html\r\n')
-                    cl.send('Connection: close\r\n\r\n')
-                    cl.sendall(response)
-            
-            else:
-                # Redirect any unknown request to setup page (captive portal catch-all)
-                if 'GET' in method_line:
-                    print(f"Unknown GET, redirecting to setup: {path}")
-                    cl.send('HTTP/1.1 302 Found\r\n')
-                    cl.send('Location: http://192.168.4.1/\r\n')
-                    cl.send('Connection: close\r\n\r\n')
-                else:
-                    # 404 for non-GET
-                    cl.send('HTTP/1.1 404 Not Found\r\n')
-                    cl.send('Connection: close\r\n\r\n')
-        
-        cl.close()
-        
-    except Exception as e:
-        print(f"Error handling request: {e}")
-        try:
-            cl.close()
-        except:
-            pass
+    Starts a fresh event loop, so any of the board's own tasks that were
+    running stop here (close their servers first to free the ports).
+    """
+    ap = create_ap()
+    
+    # Scan for networks in the background from now on; the STA interface
+    # stays up for scanning until the board restarts
+    sta = network.WLAN(network.STA_IF)
+    sta.active(True)
+    scans = ScanCache(sta)
+    scans.start()
+    
+    uasyncio.new_event_loop()
+    uasyncio.run(_run(scans))
 
 if __name__ == "__main__":
     print("Starting setup portal...")
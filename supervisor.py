@@ -0,0 +1,381 @@
+# Task Supervisor for Chicago Transit Board
+# Runs each periodic job (WiFi, fetches, rotation, rendering, ...) as
+# its own uasyncio task on a deadline schedule, with per-task timing stats,
+# and feeds the hardware watchdog only while every task keeps to its budget
+
+import time
+import _thread
+import log
+
+# Jobs that run less often than this should check the wall clock themselves
+# (ticks_diff() only covers about 6 days)
+MAX_INTERVAL_MS = 24 * 3600 * 1000
+
+DEFAULT_BUDGET_MS = 5000
+WDT_MARGIN_MS = 1500  # Blocking calls give up at least this long before the watchdog fires
+
+class Task:
+    """A job that Supervisor runs every interval_ms.
+
+    Runs are scheduled against absolute deadlines (due, due + interval, ...)
+    so time spent in the job doesn't accumulate as drift. If a run finishes
+    after its next deadline has already passed, that deadline is dropped
+    and the schedule restarts from now instead of running back-to-back.
+
+    budget_ms is how far the task may fall behind its schedule, not
+    counting time other tasks held the event loop; while it runs, it is
+    the longest allowed gap between checkpoints (Supervisor.checkpoint()).
+    """
+
+    def __init__(self, name, func, interval_ms, delay_ms=0, budget_ms=DEFAULT_BUDGET_MS):
+        self.name = name
+        self.func = func
+        self.interval_ms = min(interval_ms, MAX_INTERVAL_MS)
+        self.budget_ms = budget_ms
+        self.due = time.ticks_add(time.ticks_ms(), delay_ms)
+        self.last_beat_ms = time.ticks_ms()
+        self.blocked_at_beat = 0  # Supervisor.blocked_ms when the task last beat
+        self.runs = 0
+        self.errors = 0
+        self.last_error = None
+        self.overruns = 0     # Deadlines dropped because a run took too long
+        self.run_us_last = 0  # Time spent in func (blocking work, i.e. CPU on core 0)
+        self.run_us_max = 0
+        self.run_us_total = 0
+        self.late_ms_last = 0 # How long after its deadline a run started
+        self.late_ms_max = 0
+        self.late_ms_total = 0
+        self.stalls = 0       # Watchdog checks that found it over budget
+        self.max_stall_ms = 0 # Worst gap measured against the budget
+
+    def beat(self, blocked_ms=0):
+        """Mark the task as alive"""
+        self.last_beat_ms = time.ticks_ms()
+        self.blocked_at_beat = blocked_ms
+
+    def beat_age_ms(self):
+        return time.ticks_diff(time.ticks_ms(), self.last_beat_ms)
+
+    def get_stats(self):
+        runs = self.runs
+        return {
+            "interval_ms": self.interval_ms,
+            "runs": runs,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "overruns": self.overruns,
+            "run_us_last": self.run_us_last,
+            "run_us_max": self.run_us_max,
+            "run_us_avg": self.run_us_total // runs if runs else 0,
+            "late_ms_last": self.late_ms_last,
+            "late_ms_max": self.late_ms_max,
+            "late_ms_avg": self.late_ms_total // runs if runs else 0,
+            "beat_age_ms": self.beat_age_ms(),
+            "budget_ms": self.budget_ms,
+            "max_stall_ms": self.max_stall_ms,
+            "stalls": self.stalls,
+        }
+
+class Section:
+    """One use of Supervisor.section(); see there"""
+
+    def __init__(self, supervisor, task):
+        self.supervisor = supervisor
+        self.task = task
+        self.nested = False
+        self.start_us = 0
+
+    def __enter__(self):
+        sup = self.supervisor
+        # Inside a task run (or another section) the time is already charged
+        self.nested = (sup.current is not None or sup.thread is None
+                       or _thread.get_ident() != sup.thread)
+        if not self.nested:
+            sup.current = self.task
+            sup.run_start_ms = time.ticks_ms()
+            self.start_us = time.ticks_us()
+            self.task.beat(sup.blocked_ms)
+        return self
+
+    def __exit__(self, *exc):
+        if self.nested:
+            return False
+        sup = self.supervisor
+        task = self.task
+        sup.current = None
+        sup.blocked_ms += time.ticks_diff(time.ticks_ms(), sup.run_start_ms)
+        elapsed = time.ticks_diff(time.ticks_us(), self.start_us)
+        task.runs += 1
+        task.run_us_last = elapsed
+        task.run_us_total += elapsed
+        if elapsed > task.run_us_max:
+            task.run_us_max = elapsed
+        task.beat(sup.blocked_ms)
+        return False
+
+class Monitor:
+    """A heartbeat kept outside the supervisor (e.g. the core 1 fetch loop).
+
+    age_ms() returns milliseconds since its last beat, or None while
+    there is nothing to watch.
+    """
+
+    def __init__(self, name, age_ms, budget_ms):
+        self.name = name
+        self.age_ms = age_ms
+        self.budget_ms = budget_ms
+        self.stalls = 0
+        self.max_stall_ms = 0
+
+    def get_stats(self):
+        return {"budget_ms": self.budget_ms, "max_stall_ms": self.max_stall_ms, "stalls": self.stalls}
+
+class Supervisor:
+    """Owns the board's periodic tasks.
+
+    Each task sleeps until exactly its next deadline, so the event loop
+    only wakes when something is due. A job that raises is logged and
+    counted, and runs again at its next deadline.
+
+    With a watchdog attached (watch()), it is fed only while every task
+    and monitor is within budget, so a hung task resets the board but a
+    slow one that keeps calling checkpoint() does not.
+
+    Blocking work that runs outside any task (web handlers, the benchmark)
+    goes in a section() so it is charged and watched the same way.
+    """
+
+    def __init__(self):
+        self.tasks = []
+        self.sections = {}      # Name -> Task for section() stats and budget
+        self.monitors = []
+        self.started_ms = None
+        self.uptime_ms = 0      # Since run(), added up a step at a time (see uptime())
+        self.uptime_mark = 0
+        self.current = None     # Task whose (blocking) run is in progress
+        self.run_start_ms = 0
+        self.blocked_ms = 0     # Total time task runs have held the event loop
+        self.wdt = None
+        self.wdt_timeout_ms = 0
+        self.feed_ms = 0
+        self.last_feed_ms = 0
+        self.feeds = 0
+        self.withheld = 0       # Feeds skipped because something was over budget
+        self.stalled = None     # Name of what is over budget, if anything
+        self.thread = None      # Thread the tasks run on (core 0)
+        self.checkpoint_hook = None  # Called on each checkpoint (e.g. bench memory sampling)
+        self._handles = []
+        self._stopped = None
+
+    def add(self, name, func, interval_ms, delay_ms=0, budget_ms=DEFAULT_BUDGET_MS):
+        """Register func (a function or async function) to run every interval_ms"""
+        task = Task(name, func, interval_ms, delay_ms, budget_ms)
+        self.tasks.append(task)
+        return task
+
+    def uptime(self):
+        """Milliseconds since run(). Every task run adds the time since the
+        previous call, so unlike ticks_diff() from the start it keeps
+        counting past the ticks period (about 6 days)."""
+        if self.started_ms is None:
+            return 0
+        now = time.ticks_ms()
+        self.uptime_ms += time.ticks_diff(now, self.uptime_mark)
+        self.uptime_mark = now
+        return self.uptime_ms
+
+    def find(self, name):
+        for task in self.tasks:
+            if task.name == name:
+                return task
+        return None
+
+    def section(self, name, budget_ms=DEFAULT_BUDGET_MS):
+        """Context manager around blocking work done outside a task, e.g.
+
+            with supervisor.section("portal"):
+                body = json.dumps(build())
+
+        While it runs, the time counts as held by name rather than against
+        the tasks waiting on the loop, checkpoint() beats it, and the gap
+        between beats must stay within budget_ms. Don't await inside it.
+        """
+        task = self.sections.get(name)
+        if task is None:
+            task = self.sections[name] = Task(name, None, 0, budget_ms=budget_ms)
+        return Section(self, task)
+
+    def monitor(self, name, age_ms, budget_ms):
+        """Also require an outside heartbeat (age_ms() in ms) to stay within budget_ms"""
+        self.monitors.append(Monitor(name, age_ms, budget_ms))
+
+    def watch(self, wdt, timeout_ms):
+        """Feed wdt (a started machine.WDT) while everything is within budget"""
+        self.wdt = wdt
+        self.wdt_timeout_ms = timeout_ms
+        self.feed_ms = max(100, timeout_ms // 4)
+        self.last_feed_ms = time.ticks_ms()
+
+    def timeout_s(self, seconds):
+        """Socket timeout for a blocking call, capped to end before the watchdog fires"""
+        if self.wdt is None:
+            return seconds
+        return min(seconds, max(1, (self.wdt_timeout_ms - WDT_MARGIN_MS) // 1000))
+
+    def in_loop(self):
+        """Whether the caller is on the thread the tasks run on (or they
+        haven't started yet), rather than e.g. the core 1 fetch loop"""
+        return self.thread is None or _thread.get_ident() == self.thread
+
+    def checkpoint(self):
+        """Heartbeat from inside a long run (between requests, retries, ...).
+
+        Beats the running task and feeds the watchdog, so a run may take
+        longer than the watchdog timeout as long as each step between
+        checkpoints stays within the task's budget. Calls from other
+        threads (the core 1 fetch loop) are ignored.
+        """
+        if not self.in_loop():
+            return
+        if self.checkpoint_hook is not None:
+            self.checkpoint_hook()
+        if self.wdt is not None:
+            self.feed()  # Measures the gap since the last beat first
+        if self.current is not None:
+            self.current.beat(self.blocked_ms)
+
+    def _over_budget(self):
+        """Name of the first task or monitor over its budget, or None"""
+        now = time.ticks_ms()
+        running = self.current
+        # A task that isn't running can't be blamed for time the loop spent
+        # in other tasks' runs, including the one in progress
+        blocked = self.blocked_ms
+        if running is not None:
+            blocked += time.ticks_diff(now, self.run_start_ms)
+        stalled = None
+        tasks = self.tasks
+        if running is not None and running.func is None:
+            tasks = tasks + [running]  # A section
+        for task in tasks:
+            if task is running:
+                stall = time.ticks_diff(now, task.last_beat_ms)
+            else:
+                stall = (time.ticks_diff(now, task.last_beat_ms) - task.interval_ms
+                         - (blocked - task.blocked_at_beat))
+            if stall > task.max_stall_ms:
+                task.max_stall_ms = stall
+            if stall > task.budget_ms:
+                task.stalls += 1
+                stalled = stalled or task.name
+        for mon in self.monitors:
+            stall = mon.age_ms()
+            if stall is None:
+                continue
+            if stall > mon.max_stall_ms:
+                mon.max_stall_ms = stall
+            if stall > mon.budget_ms:
+                mon.stalls += 1
+                stalled = stalled or mon.name
+        return stalled
+
+    def feed(self):
+        """Feed the watchdog if nothing is over budget"""
+        stalled = self._over_budget()
+        if stalled is None:
+            self.wdt.feed()
+            self.feeds += 1
+            self.last_feed_ms = time.ticks_ms()
+        else:
+            self.withheld += 1
+            if stalled != self.stalled:
+                log.warning("Watchdog not fed: %s is over budget", stalled)
+                log.flush()  # A reset may follow; keep the reason
+        self.stalled = stalled
+
+    async def _watchdog(self):
+        import uasyncio
+        while True:
+            self.feed()
+            await uasyncio.sleep_ms(self.feed_ms)
+
+    async def _run(self, task):
+        import uasyncio
+        while True:
+            await uasyncio.sleep_ms(max(0, time.ticks_diff(task.due, time.ticks_ms())))
+            self.run_start_ms = time.ticks_ms()
+            late = time.ticks_diff(self.run_start_ms, task.due)
+            start = time.ticks_us()
+            self.current = task
+            task.beat(self.blocked_ms)
+            try:
+                result = task.func()
+                if hasattr(result, "send"):
+                    self.current = None  # Awaiting doesn't hold the loop
+                    await result
+            except Exception as e:
+                task.errors += 1
+                task.last_error = str(e)
+                log.error("Task %s failed: %s", task.name, e)
+            if self.current is task:
+                self.current = None
+                self.blocked_ms += time.ticks_diff(time.ticks_ms(), self.run_start_ms)
+            elapsed = time.ticks_diff(time.ticks_us(), start)
+            task.runs += 1
+            task.run_us_last = elapsed
+            task.run_us_total += elapsed
+            if elapsed > task.run_us_max:
+                task.run_us_max = elapsed
+            task.late_ms_last = late
+            task.late_ms_total += late
+            if late > task.late_ms_max:
+                task.late_ms_max = late
+            task.beat(self.blocked_ms)
+            self.uptime()
+
+            now = time.ticks_ms()
+            task.due = time.ticks_add(task.due, task.interval_ms)
+            if time.ticks_diff(task.due, now) < 0:
+                task.overruns += 1
+                task.due = now
+
+    async def run(self):
+        """Start every registered task (and the watchdog feeder) and wait until stop()"""
+        import uasyncio
+        self.started_ms = self.uptime_mark = time.ticks_ms()
+        self.thread = _thread.get_ident()
+        self._stopped = uasyncio.Event()
+        for task in self.tasks:
+            self._handles.append(uasyncio.create_task(self._run(task)))
+        if self.wdt is not None:
+            self._handles.append(uasyncio.create_task(self._watchdog()))
+        await self._stopped.wait()
+
+    def stop(self):
+        for handle in self._handles:
+            handle.cancel()
+        self._handles = []
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def get_stats(self):
+        """Per-task stats for /api/status; cpu_pct is each task's share of uptime"""
+        elapsed_us = self.uptime() * 1000
+        tasks = {}
+        for task in self.tasks + list(self.sections.values()):
+            stats = task.get_stats()
+            stats["cpu_pct"] = round(task.run_us_total * 100 / elapsed_us, 1) if elapsed_us else 0
+            tasks[task.name] = stats
+        for mon in self.monitors:
+            tasks[mon.name] = mon.get_stats()
+        return tasks
+
+    def get_watchdog_stats(self):
+        """Watchdog state for /api/status"""
+        return {
+            "enabled": self.wdt is not None,
+            "timeout_ms": self.wdt_timeout_ms,
+            "feeds": self.feeds,
+            "withheld": self.withheld,
+            "stalled": self.stalled,
+        }
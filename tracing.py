@@ -0,0 +1,148 @@
+# Span Tracing for Chicago Transit Board
+# Records how long WiFi, DNS, fetches, parsers, drawing and portal requests
+# take into a fixed-size ring buffer, exported as Chrome trace-event JSON
+
+import time
+from array import array
+
+# Spans older than this can't be placed reliably (ticks_us wraps every ~17
+# minutes and ticks_diff only covers half of that), so export drops them
+MAX_AGE_MS = 500000
+INSTANT = 0xFFFFFFFF  # Duration stored for mark() events
+
+enabled = False     # Set once by setup(); when False, traced() adds nothing
+recording = False   # Can be paused/resumed at runtime while enabled
+
+_names = []         # Span name table; a span stores its index
+_size = 0
+_pos = 0            # Next slot to write
+_count = 0          # Spans recorded since the last clear (may exceed _size)
+_name_ids = None
+_start_us = None
+_start_ms = None
+_dur_us = None
+
+def setup(enable, size=512):
+    """Allocate the ring buffer. Call before any traced() function is defined."""
+    global enabled, recording, _size, _name_ids, _start_us, _start_ms, _dur_us
+    enabled = bool(enable)
+    recording = enabled
+    if not enabled:
+        return
+    _size = size
+    _name_ids = array("H", [0] * size)
+    _start_us = array("L", [0] * size)
+    _start_ms = array("L", [0] * size)
+    _dur_us = array("L", [0] * size)
+    clear()
+
+def name(label):
+    """Index for a span name (register names once, at import time)"""
+    if label in _names:
+        return _names.index(label)
+    _names.append(label)
+    return len(_names) - 1
+
+def begin():
+    """Start time for end(), or -1 when not recording"""
+    if not recording:
+        return -1
+    return time.ticks_us()
+
+def end(span, start):
+    """Record span `span` (from name()) that began at begin()'s `start`"""
+    global _pos, _count
+    if start < 0 or not recording:
+        return
+    i = _pos
+    _name_ids[i] = span
+    _start_us[i] = start
+    _start_ms[i] = time.ticks_ms()
+    _dur_us[i] = time.ticks_diff(time.ticks_us(), start)
+    _pos = i + 1 if i + 1 < _size else 0
+    _count += 1
+
+def mark(span):
+    """Record an instant event (a zero-length span)"""
+    global _pos, _count
+    if not recording:
+        return
+    i = _pos
+    _name_ids[i] = span
+    _start_us[i] = time.ticks_us()
+    _start_ms[i] = time.ticks_ms()
+    _dur_us[i] = INSTANT
+    _pos = i + 1 if i + 1 < _size else 0
+    _count += 1
+
+def traced(label):
+    """Decorator: record a span around every call.
+
+    When tracing is disabled at boot the function is returned unchanged,
+    so there's no overhead at all.
+    """
+    def wrap(func):
+        if not enabled:
+            return func
+        span = name(label)
+
+        def wrapper(*args, **kwargs):
+            if not recording:
+                return func(*args, **kwargs)
+            start = time.ticks_us()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end(span, start)
+        return wrapper
+    return wrap
+
+def pause():
+    global recording
+    recording = False
+
+def resume():
+    global recording
+    recording = enabled
+
+def clear():
+    global _pos, _count
+    _pos = 0
+    _count = 0
+
+def get_stats():
+    """Tracing state for /api/status"""
+    return {
+        "enabled": enabled,
+        "recording": recording,
+        "buffer": _size,
+        "spans": _count,
+        "dropped": max(0, _count - _size),
+    }
+
+def chrome_trace():
+    """Chrome trace-event JSON (chrome://tracing, Perfetto) in chunks, oldest span first"""
+    yield '{"displayTimeUnit":"ms","traceEvents":['
+    if not enabled:
+        yield "]}"
+        return
+    now_us = time.ticks_us()
+    now_ms = time.ticks_ms()
+    stored = min(_count, _size)
+    first = (_pos - stored) % _size if _size else 0
+    sep = ""
+    for k in range(stored):
+        i = (first + k) % _size
+        if time.ticks_diff(now_ms, _start_ms[i]) > MAX_AGE_MS:
+            continue
+        # Timestamps count back from "now"; only the differences matter
+        ts = MAX_AGE_MS * 1000 - time.ticks_diff(now_us, _start_us[i])
+        label = _names[_name_ids[i]]
+        dur = _dur_us[i]
+        if dur != INSTANT:
+            event = '{"name":"%s","ph":"X","ts":%d,"dur":%d,"pid":1,"tid":1}' % (label, ts, dur)
+        else:
+            event = '{"name":"%s","ph":"i","s":"g","ts":%d,"pid":1,"tid":1}' % (label, ts)
+        yield sep + event
+        sep = ","
+    yield "]}"
@@ -16,8 +16,28 @@ import json
 FILES_TO_UPLOAD = [
     "main.py",
     "setup_portal.py",
+    "setup_portal.html",
+    "setup_success.html",
+    "loader.html",
     "config_portal.py",
     "auto_update.py",
+    "dns_cache.py",
+    "scene.py",
+    "atlas.py",
+    "handoff.py",
+    "bench.py",
+    "metrics.py",
+    "tracing.py",
+    "log.py",
+    "supervisor.py",
+    "httpd.py",
+    "webassets.py",
+]
+
+# Build artifacts uploaded only if they've been generated
+OPTIONAL_FILES = [
+    "atlas.bin",  # python host/build_atlas.py
+    "web.bin",    # python host/build_web.py
 ]
 
 # Cache file to store file hashes
@@ -211,9 +231,10 @@ def main():
     files_to_upload = []
     skipped_files = []
 
-    for filename in FILES_TO_UPLOAD:
+    for filename in FILES_TO_UPLOAD + OPTIONAL_FILES:
         if not os.path.exists(filename):
-            print(f"Missing: {filename}")
+            if filename not in OPTIONAL_FILES:
+                print(f"Missing: {filename}")
             continue
 
         if file_needs_upload(filename, cache):
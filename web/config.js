@@ -6,6 +6,9 @@
 
     let config = {};
     let status = {};
+    let live = { arrivals: {}, alerts: {}, metrics: {} };  // State pushed over /api/events
+    let events = null;
+    let pollTimer = null;
     let currentPage = 'main-page';
     let pageStack = [];
 
@@ -119,6 +122,7 @@
             
             render();
             if (typeof lucide !== 'undefined') lucide.createIcons();
+            startEvents();
         } catch (error) {
             document.getElementById('app').innerHTML = `
                 <div class="error">
@@ -154,6 +158,7 @@
                         <div class="status-item"><div class="status-label">Memory</div><div class="status-value" id="status-memory">${s.memory_pct||0}%</div></div>
                     </div>
                 </div>
+                <div class="status-card board-mirror" id="board-mirror"><div class="mirror-title">Connecting...</div></div>
                 <div class="menu-list">
                     <div class="menu-item" onclick="TC.nav('wifi')">
                         <div class="menu-icon" style="background:#e3f2fd;color:#1976d2;"><i data-lucide="wifi"></i></div>
@@ -690,33 +695,87 @@
         if (v) { const p = v.split('|'); document.getElementById('station' + num + '_station_id').value = p[0]; }
     }
 
+    function showStatus(s) {
+        // Update status display only if on main page
+        const wifiEl = document.getElementById('status-wifi');
+        if (wifiEl) {
+            wifiEl.textContent = s.wifi_connected ? 'Online' : 'Offline';
+            wifiEl.className = 'status-value' + (s.wifi_connected ? ' online' : '');
+        }
+        const versionEl = document.getElementById('status-version');
+        if (versionEl) versionEl.textContent = s.version || '?';
+        
+        const uptimeEl = document.getElementById('status-uptime');
+        if (uptimeEl) uptimeEl.textContent = s.uptime || '0m';
+        
+        const memoryEl = document.getElementById('status-memory');
+        if (memoryEl) memoryEl.textContent = (s.memory_pct || 0) + '%';
+    }
+
     async function updateStatus() {
         try {
-            console.log('Updating status...', new Date().toLocaleTimeString());
             const res = await fetchWithRetry('/api/status');
-            const s = await res.json();
-            
-            // Update status display only if on main page
-            const wifiEl = document.getElementById('status-wifi');
-            if (wifiEl) {
-                wifiEl.textContent = s.wifi_connected ? 'Online' : 'Offline';
-                wifiEl.className = 'status-value' + (s.wifi_connected ? ' online' : '');
-            }
-            const versionEl = document.getElementById('status-version');
-            if (versionEl) versionEl.textContent = s.version || '?';
-            
-            const uptimeEl = document.getElementById('status-uptime');
-            if (uptimeEl) uptimeEl.textContent = s.uptime || '0m';
-            
-            const memoryEl = document.getElementById('status-memory');
-            if (memoryEl) memoryEl.textContent = (s.memory_pct || 0) + '%';
-            
-            console.log('Status updated:', s.uptime, s.memory_pct + '%');
+            Object.assign(status, await res.json());
+            showStatus(status);
         } catch(e) {
             console.error('Status update failed:', e);
         }
     }
 
+    function startPolling() {
+        if (!pollTimer) pollTimer = setInterval(updateStatus, 5000);
+        const el = document.getElementById('board-mirror');
+        if (el) el.style.display = 'none';
+    }
+
+    // Live status and a mirror of the display over one Server-Sent Events
+    // stream. Each event carries only the fields that changed. Falls back to
+    // polling /api/status if the browser has no EventSource or the board
+    // turns the stream away (it serves a few at a time).
+    function startEvents() {
+        if (typeof EventSource === 'undefined') { startPolling(); return; }
+        events = new EventSource('/api/events');
+        events.addEventListener('status', e => { Object.assign(status, JSON.parse(e.data)); showStatus(status); });
+        events.addEventListener('arrivals', e => { Object.assign(live.arrivals, JSON.parse(e.data)); showMirror(); });
+        events.addEventListener('alerts', e => { Object.assign(live.alerts, JSON.parse(e.data)); showMirror(); });
+        events.addEventListener('metrics', e => { Object.assign(live.metrics, JSON.parse(e.data)); });
+        events.onerror = () => {
+            // EventSource reconnects by itself unless the response was refused
+            if (events.readyState === EventSource.CLOSED) { events = null; startPolling(); }
+        };
+    }
+
+    function escapeHtml(text) {
+        return String(text).replace(/[&<>"]/g, ch => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[ch]));
+    }
+
+    function mirrorRows(trains) {
+        if (!trains || !trains.length) return '<div class="mirror-row">No trains</div>';
+        return trains.slice(0, 3).map(t =>
+            `<div class="mirror-row"><span>${escapeHtml(t.route)}</span><span>${t.min ? t.min + ' min' : 'Due'}</span></div>`
+        ).join('');
+    }
+
+    function showMirror() {
+        const el = document.getElementById('board-mirror');
+        if (!el) return;
+        const a = live.arrivals;
+        const view = a.view || 'Inbound';
+        let html = `<div class="mirror-title">${escapeHtml(view)}</div>`;
+        if (view === 'Alerts') {
+            const alerts = live.alerts.alerts || [];
+            html += alerts.length
+                ? alerts.map(x => `<div class="mirror-row">${escapeHtml(x.header || x.description)}</div>`).join('')
+                : '<div class="mirror-row">No alerts</div>';
+        } else {
+            const key = view === 'Outbound' ? 'outbound' : 'inbound';
+            const station = a.station != null && a.station_cache ? a.station_cache[a.station] : null;
+            html += mirrorRows(station ? station[key] : a['line1_' + key]);
+            if (!station && a['line2_' + key] && a['line2_' + key].length) html += mirrorRows(a['line2_' + key]);
+        }
+        el.innerHTML = html;
+    }
+
     async function save() {
         const data = {};
         // Only send non-empty values and checkboxes that are checked
@@ -765,9 +824,6 @@
         }
     }
 
-    // Auto-update status every 5 seconds for live stats
-    setInterval(updateStatus, 5000);
-
     window.TC = { 
         nav, back, 
         toggleRotationMode, toggleSecondary, toggleSleep, updateTransitType,
@@ -0,0 +1,99 @@
+# Web Assets for Chicago Transit Board
+# Serves the portal UI packed into web.bin by host/build_web.py from flash:
+# pre-gzipped, content-hashed files sent a chunk at a time with ETags
+
+import struct
+import log
+import httpd
+
+PACK_FILE = "web.bin"
+MAGIC = b"CTBW"
+VERSION = 1
+CHUNK = 1024
+
+# Entry flags - must match host/build_web.py
+GZIP = 1
+IMMUTABLE = 2
+
+# Hashed names change with their content, so browsers can keep them forever;
+# the loader page keeps its name and is revalidated on every load
+CACHE_FOREVER = "Cache-Control: public, max-age=31536000, immutable\r\n"
+CACHE_REVALIDATE = "Cache-Control: no-cache\r\n"
+
+class Asset:
+    def __init__(self, content_type, etag, flags, offset, length):
+        self.content_type = content_type
+        self.etag = etag
+        self.flags = flags
+        self.offset = offset
+        self.length = length
+
+class Assets:
+    """Index of web.bin; the file bodies stay on flash until requested"""
+
+    def __init__(self, path, head):
+        self.path = path
+        self.files = {}  # URL path -> Asset
+        self.served = 0
+        self.not_modified = 0
+        self._parse(head)
+
+    def _parse(self, head):
+        pos = 0
+        while pos < len(head):
+            texts = []
+            for _ in range(3):
+                size = head[pos]
+                texts.append(bytes(head[pos + 1:pos + 1 + size]).decode())
+                pos += 1 + size
+            flags, offset, length = struct.unpack_from("<BII", head, pos)
+            pos += 9
+            self.files[texts[0]] = Asset(texts[1], texts[2], flags, offset, length)
+
+    def find(self, path):
+        return self.files.get(path)
+
+    async def send(self, request, response, asset, headers=""):
+        """Send an asset as stored (gzipped bodies keep Content-Encoding: gzip;
+        every browser accepts it), or 304 if the client already has it"""
+        headers = "ETag: %s\r\n%s%s" % (
+            asset.etag, CACHE_FOREVER if asset.flags & IMMUTABLE else CACHE_REVALIDATE, headers)
+        if httpd.etag_matches(request, asset.etag):
+            self.not_modified += 1
+            await response.send("", 304, None, headers)
+            return
+        if asset.flags & GZIP:
+            headers += "Content-Encoding: gzip\r\n"
+        self.served += 1
+        buf = bytearray(CHUNK)
+        view = memoryview(buf)
+        with open(self.path, "rb") as f:
+            f.seek(asset.offset)
+            await response.start(200, asset.content_type, headers, asset.length)
+            left = asset.length
+            while left:
+                n = f.readinto(view[:min(CHUNK, left)])
+                if not n:
+                    raise OSError("%s is truncated" % self.path)
+                await response.write(view[:n])
+                left -= n
+
+    def get_stats(self):
+        return {"files": len(self.files), "served": self.served, "not_modified": self.not_modified}
+
+def load(path=PACK_FILE):
+    """Read the index of the asset pack. Returns None if it isn't there or is invalid."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(8)
+            if len(header) < 8 or header[:4] != MAGIC or header[4] != VERSION:
+                log.warning("%s is not a v1 asset pack", path)
+                return None
+            head = f.read(struct.unpack_from("<H", header, 6)[0])
+    except OSError:
+        return None
+    try:
+        return Assets(path, head)
+    except Exception as e:
+        log.warning("Could not load %s: %s", path, e)
+        return None